@@ -0,0 +1,66 @@
+"""bench_compression.py
+------------------------------------------------------------------------------
+Kompressions-Benchmark: Dateigröße, Speicher- und Ladezeit des Textformats
+unkomprimiert und mit gzip, bz2 und lzma.
+
+Start:
+    python -m benchmarks.bench_compression --items 1000000 --level 6
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, List, Optional, Tuple
+
+from benchmarks.run import synthetic_items
+from shopping_list.persistence import COMPRESSION_SUFFIXES, CompressedTxtFileHandler, TxtFileHandler
+
+
+def timed_call(func: Callable[[], object], repeat: int) -> float:
+    """Beste von `repeat` Laufzeiten in Sekunden."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare_formats(size: int, level: Optional[int] = None, repeat: int = 3) -> List[Tuple[str, int, float, float]]:
+    """(Format, Bytes, Speicherzeit, Ladezeit) für txt und jede Kompression."""
+    items = synthetic_items(size)
+    variants = [("txt", ".txt", TxtFileHandler())] + [
+        (compression, ".txt" + suffix, CompressedTxtFileHandler(compression, level))
+        for suffix, compression in COMPRESSION_SUFFIXES.items()
+    ]
+    results = []
+    with tempfile.TemporaryDirectory(prefix="shopping-bench-") as directory:
+        for label, suffix, handler in variants:
+            path = os.path.join(directory, "liste" + suffix)
+            save_seconds = timed_call(lambda: handler.save(items, path), repeat)
+            load_seconds = timed_call(lambda: TxtFileHandler().load(path), repeat)
+            results.append((label, os.path.getsize(path), save_seconds, load_seconds))
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100_000, help="Anzahl synthetischer Items")
+    parser.add_argument("--level", type=int, default=None, help="Kompressionsstufe (Standard je Verfahren)")
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen je Messung (Minimum zählt)")
+    args = parser.parse_args(argv)
+
+    results = compare_formats(args.items, args.level, args.repeat)
+    plain_bytes = results[0][1]
+    print(f"{args.items} Items")
+    print(f"{'Format':<8} {'Bytes':>14} {'Anteil':>8} {'Speichern':>11} {'Laden':>9}")
+    for label, size, save_seconds, load_seconds in results:
+        print(f"{label:<8} {size:>14,} {size / plain_bytes:>7.1%} {save_seconds:>10.3f}s {load_seconds:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""bench_memory.py
+------------------------------------------------------------------------------
+Speicher-Benchmark: Bytes pro Item für eine synthetische Liste.
+
+Vergleicht
+- "vorher": Item-Klassen mit Instanz-Dict und nicht internierten Namen
+  (so wie die Modelle vor der Umstellung auf __slots__ aussahen),
+- "nachher": die aktuellen Modelle über ItemFactory.create_item
+  (__slots__ + internierte Namen),
+- ItemStore: spaltenorientierter Speicher.
+
+Start:
+    python -m benchmarks.bench_memory --items 1000000
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from shopping_list.factories import ItemFactory
+from shopping_list.store import ItemStore
+
+PRODUCTS = ["Milch", "Brot", "Butter", "Käse", "Äpfel", "Tomaten", "Nudeln", "Reis", "Eier", "Joghurt"]
+
+
+class _DictCountedItem:
+    def __init__(self, name: str, price_per_unit: float, quantity: int):
+        self.name = name
+        self.price_per_unit = price_per_unit
+        self.quantity = quantity
+
+
+class _DictWeightedItem:
+    def __init__(self, name: str, price_per_unit: float, weight: float):
+        self.name = name
+        self.price_per_unit = price_per_unit
+        self.weight = weight
+
+
+def synthetic_rows(count: int) -> List[Tuple[bytes, bool, float, float]]:
+    """Rohdaten wie aus einer Exportdatei: Namen liegen noch als Bytes vor."""
+    return [
+        (PRODUCTS[i % len(PRODUCTS)].encode("utf-8"), i % 3 == 0, float(i % 7 + 1), 0.5 + (i % 50) / 10)
+        for i in range(count)
+    ]
+
+
+def build_dict_items(rows) -> list:
+    # Jede Zeile erzeugt ein eigenes String-Objekt, wie beim Parsen einer Datei.
+    return [
+        _DictWeightedItem(raw.decode("utf-8"), price, amount)
+        if weighted
+        else _DictCountedItem(raw.decode("utf-8"), price, int(amount))
+        for raw, weighted, amount, price in rows
+    ]
+
+
+def build_slotted_items(rows) -> list:
+    return [
+        ItemFactory.create_item(raw.decode("utf-8"), weighted, amount, price)
+        for raw, weighted, amount, price in rows
+    ]
+
+
+def build_store(rows) -> ItemStore:
+    store = ItemStore()
+    for raw, weighted, amount, price in rows:
+        store.append(raw.decode("utf-8"), weighted, amount, price)
+    return store
+
+
+def measure(build: Callable, rows) -> int:
+    """Netto-Speicher (Bytes) der von `build` erzeugten und noch lebenden Objekte."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build(rows)
+        current, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1_000_000, help="Anzahl synthetischer Items")
+    args = parser.parse_args(argv)
+
+    rows = synthetic_rows(args.items)
+    print(f"{args.items} Items")
+    for label, build in (
+        ("vorher (dict, ohne intern)", build_dict_items),
+        ("nachher (__slots__, intern)", build_slotted_items),
+        ("ItemStore (Spalten)", build_store),
+    ):
+        used = measure(build, rows)
+        print(f"{label:<30} {used / args.items:8.1f} Bytes/Item")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""bench_sync.py
+------------------------------------------------------------------------------
+Lasttest für den Sync-Server: viele gleichzeitige Clients schicken Batches
+(Merge und Entfernen) an wenige gemeinsame Listen und spiegeln diese.
+
+Gemessen werden Operationen pro Sekunde, die Latenz bis zur Bestätigung
+(p50/p95/p99) und wie viele Delta-Nachrichten die Abonnenten bekommen haben
+(weniger als Batches = der Server hat unter Last zusammengefasst).
+
+Ohne --port startet der Server im selben Prozess (Port frei gewählt).
+
+Start:
+    python -m benchmarks.bench_sync --clients 500 --batches 50 --batch-size 20
+    python -m shopping_list.sync --port 8765 &
+    python -m benchmarks.bench_sync --port 8765
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from shopping_list.persistence import iter_rows
+from shopping_list.sync import DEFAULT_HOST, SyncClient, SyncServer
+
+# Verschiedene Produktnamen je Liste; kleiner Pool = viele Merges in bestehende Items
+PRODUCT_POOL = 500
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def _run_client(
+    client: SyncClient, list_name: str, batches: int, batch_size: int, rng: random.Random, latencies: List[float]
+) -> int:
+    """Schickt `batches` Batches nacheinander; liefert die Anzahl der Operationen."""
+    ops_sent = 0
+    for _ in range(batches):
+        rows = [
+            [False, f"Artikel {rng.randrange(PRODUCT_POOL)}", rng.randint(1, 3), 0.99] for _ in range(batch_size)
+        ]
+        ops = [{"op": "merge", "items": rows}]
+        ops_sent += len(rows)
+        if rng.random() < 0.2:
+            names = [f"Artikel {rng.randrange(PRODUCT_POOL)}" for _ in range(max(1, batch_size // 10))]
+            ops.append({"op": "remove", "names": names})
+            ops_sent += len(names)
+        start = time.perf_counter()
+        await client.batch(list_name, ops)
+        latencies.append(time.perf_counter() - start)
+    return ops_sent
+
+
+async def load_test(
+    clients: int = 200,
+    batches: int = 20,
+    batch_size: int = 20,
+    lists: int = 4,
+    host: str = DEFAULT_HOST,
+    port: Optional[int] = None,
+    seed: int = 0,
+    mirror: bool = False,
+) -> Dict[str, Any]:
+    """Führt den Lasttest aus und liefert die Kennzahlen.
+
+    `mirror=True` lässt alle Clients ihre Liste spiegeln (kostet im selben Prozess viel Zeit).
+    """
+    server = None
+    if port is None:
+        server = SyncServer(host, 0)
+        await server.start()
+        port = server.port
+
+    rng = random.Random(seed)
+    list_names = [f"Lasttest {i}" for i in range(lists)]
+    connections = [await SyncClient.connect(host, port) for _ in range(clients)]
+    try:
+        # Die ersten Clients jeder Liste spiegeln sie (Prüfung am Ende), die übrigen verfolgen nur die seq.
+        for index, client in enumerate(connections):
+            await client.subscribe(list_names[index % lists], mirror=mirror or index < lists)
+
+        latencies: List[float] = []
+        start = time.perf_counter()
+        counts = await asyncio.gather(
+            *(
+                _run_client(
+                    client, list_names[index % lists], batches, batch_size, random.Random(rng.random()), latencies
+                )
+                for index, client in enumerate(connections)
+            )
+        )
+        seconds = time.perf_counter() - start
+
+        # Am Ende müssen alle Spiegel einer Liste denselben Stand haben (und den des Servers).
+        # Ein leerer Batch ändert nichts und liefert den aktuellen Stand.
+        final = {name: await connections[0].batch(name, []) for name in list_names}
+        states: Dict[str, set] = {name: set() for name in list_names}
+        for index, client in enumerate(connections):
+            name = list_names[index % lists]
+            await client.wait_for(name, final[name])
+            if name in client.lists:
+                states[name].add(tuple(iter_rows(client.lists[name])))
+        if server is not None:
+            for name in list_names:
+                states[name].add(tuple(iter_rows(server.lists[name].items)))
+        consistent = all(len(state) == 1 for state in states.values())
+    finally:
+        for client in connections:
+            await client.close()
+        if server is not None:
+            await server.close()
+
+    latencies.sort()
+    total_ops = sum(counts)
+    return {
+        "clients": clients,
+        "batches": clients * batches,
+        "ops": total_ops,
+        "seconds": seconds,
+        "ops_per_s": total_ops / seconds if seconds > 0 else float("inf"),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "deltas_per_client": sum(client.deltas_received for client in connections) / clients,
+        "consistent": consistent,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200, help="Gleichzeitige Verbindungen")
+    parser.add_argument("--batches", type=int, default=20, help="Batches je Client")
+    parser.add_argument("--batch-size", type=int, default=20, help="Zeilen je Merge-Batch")
+    parser.add_argument("--lists", type=int, default=4, help="Anzahl gemeinsamer Listen")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Adresse des Servers")
+    parser.add_argument("--port", type=int, default=None, help="Port eines laufenden Servers (sonst im Prozess)")
+    parser.add_argument("--mirror", action="store_true", help="Alle Clients spiegeln ihre Liste")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(
+        load_test(args.clients, args.batches, args.batch_size, args.lists, args.host, args.port, mirror=args.mirror)
+    )
+    print(
+        f"{result['clients']} Clients, {result['batches']} Batches, {result['ops']} Operationen "
+        f"in {result['seconds']:.2f} s -> {result['ops_per_s']:,.0f} Ops/s"
+    )
+    print(
+        f"Latenz p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms; "
+        f"{result['deltas_per_client']:.1f} Delta-Nachrichten je Client"
+    )
+    if not result["consistent"]:
+        print("WARNUNG: Die Spiegel der Clients weichen voneinander ab.")
+
+
+if __name__ == "__main__":
+    main()
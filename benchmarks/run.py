@@ -0,0 +1,319 @@
+"""run.py
+------------------------------------------------------------------------------
+Benchmark-Suite (nur Standardbibliothek).
+
+Misst für synthetische Listen verschiedener Größe Laufzeit und Spitzen-
+Speicher (tracemalloc) von:
+- ItemFactory.create_item
+- TxtFileHandler.save / load, unkomprimiert und mit gzip
+  (Dateigrößen aller Kompressionen: benchmarks/bench_compression.py)
+- MergeService.merge (ohne GUI)
+- ShoppingListTab._merge_and_add_items, _handle_name_collision, _refresh_list
+  (mit verstecktem Tk-Fenster; ohne Display werden sie übersprungen)
+
+Die Ergebnisse werden als JSON geschrieben und mit einer gespeicherten
+Baseline verglichen. Liegt ein Wert über der Schwelle, endet das Skript mit
+Exit-Code 1.
+
+Beispiele:
+    python -m benchmarks.run --sizes 1000 10000 --output results.json
+    python -m benchmarks.run --update-baseline
+    python -m benchmarks.run --time-threshold 0.25 --memory-threshold 0.1
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from shopping_list.factories import ItemFactory
+from shopping_list.merge import MergeService
+from shopping_list.models import ShoppingItem, ShoppingList
+from shopping_list.persistence import CompressedTxtFileHandler, TxtFileHandler
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+PRODUCTS = ["Milch", "Brot", "Butter", "Käse", "Äpfel", "Tomaten", "Nudeln", "Reis", "Eier", "Joghurt"]
+
+# Ein Benchmark bekommt die Listengröße, erledigt das Setup und liefert die zu messende Funktion.
+Benchmark = Callable[[int], Callable[[], object]]
+BENCHMARKS: Dict[str, Benchmark] = {}
+TK_BENCHMARKS = set()
+
+
+def benchmark(name: str, needs_tk: bool = False) -> Callable[[Benchmark], Benchmark]:
+    def register(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = func
+        if needs_tk:
+            TK_BENCHMARKS.add(name)
+        return func
+
+    return register
+
+
+# ----------------------------------------------------------------------
+# Synthetische Daten
+# ----------------------------------------------------------------------
+def synthetic_rows(size: int, distinct: Optional[int] = None) -> List[Tuple[str, bool, float, float]]:
+    """Zeilen (name, ist_gewichtsartikel, menge, preis); `distinct` begrenzt die Anzahl Merge-Schlüssel."""
+    distinct = distinct or size
+    rows = []
+    for i in range(size):
+        key = i % distinct
+        weighted = key % 3 == 0
+        rows.append((
+            f"{PRODUCTS[key % len(PRODUCTS)]} {key // len(PRODUCTS)}",
+            weighted,
+            1.25 if weighted else float(key % 5 + 1),
+            0.49 + (key % 40) / 10,
+        ))
+    return rows
+
+
+def synthetic_items(size: int, distinct: Optional[int] = None) -> List[ShoppingItem]:
+    return [ItemFactory.create_item(*row) for row in synthetic_rows(size, distinct)]
+
+
+_temp_files: List[str] = []
+
+
+def _temp_path(suffix: str) -> str:
+    handle, path = tempfile.mkstemp(suffix=suffix, prefix="shopping-bench-")
+    os.close(handle)
+    _temp_files.append(path)
+    return path
+
+
+@atexit.register
+def _remove_temp_files() -> None:
+    for path in _temp_files:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# ----------------------------------------------------------------------
+# Benchmarks ohne GUI
+# ----------------------------------------------------------------------
+@benchmark("factory.create_item")
+def bench_create_item(size: int):
+    rows = synthetic_rows(size)
+    create = ItemFactory.create_item
+    return lambda: [create(*row) for row in rows]
+
+
+@benchmark("txt.save")
+def bench_txt_save(size: int):
+    items = synthetic_items(size)
+    path = _temp_path(".txt")
+    return lambda: TxtFileHandler().save(items, path)
+
+
+@benchmark("txt.load")
+def bench_txt_load(size: int):
+    path = _temp_path(".txt")
+    TxtFileHandler().save(synthetic_items(size), path)
+    return lambda: TxtFileHandler().load(path)
+
+
+@benchmark("txt.gz.save")
+def bench_txt_gz_save(size: int):
+    items = synthetic_items(size)
+    path = _temp_path(".txt.gz")
+    return lambda: CompressedTxtFileHandler("gzip").save(items, path)
+
+
+@benchmark("txt.gz.load")
+def bench_txt_gz_load(size: int):
+    path = _temp_path(".txt.gz")
+    CompressedTxtFileHandler("gzip").save(synthetic_items(size), path)
+    return lambda: TxtFileHandler().load(path)
+
+
+@benchmark("merge_service.merge")
+def bench_merge_service(size: int):
+    # Hälfte der Items wird gemergt, die andere Hälfte angehängt.
+    existing = synthetic_items(size // 2)
+    incoming = synthetic_items(size, distinct=size)
+
+    def run():
+        service = MergeService(ShoppingList(existing))
+        service.merge(incoming)
+
+    return run
+
+
+# ----------------------------------------------------------------------
+# Benchmarks mit (verstecktem) Tk-Fenster
+# ----------------------------------------------------------------------
+_tk_root = None
+
+
+def _new_tab():
+    import tkinter as tk
+
+    from shopping_list.gui import ShoppingListTab
+
+    global _tk_root
+    if _tk_root is None:
+        _tk_root = tk.Tk()
+        _tk_root.withdraw()
+    return ShoppingListTab(_tk_root, TxtFileHandler())
+
+
+@benchmark("tab._merge_and_add_items", needs_tk=True)
+def bench_tab_merge(size: int):
+    tab = _new_tab()
+    tab._merger.merge(synthetic_items(size // 2))
+    tab._refresh_list()
+    incoming = synthetic_items(size, distinct=size)
+    return lambda: tab._merge_and_add_items(incoming)
+
+
+@benchmark("tab._handle_name_collision", needs_tk=True)
+def bench_tab_name_collision(size: int):
+    tab = _new_tab()
+    # Gleicher Name, unterschiedliche Preise: jedes Item kollidiert und wird umbenannt.
+    tab._merger.merge(ItemFactory.create_item("Milch", False, 1, 0.01 * (i + 1)) for i in range(size))
+    probes = [ItemFactory.create_item("Milch", False, 1, 0.0) for _ in range(1000)]
+    return lambda: [tab._handle_name_collision(item) for item in probes]
+
+
+@benchmark("tab._refresh_list", needs_tk=True)
+def bench_tab_refresh(size: int):
+    tab = _new_tab()
+    tab._merger.merge(synthetic_items(size))
+    return tab._refresh_list
+
+
+# ----------------------------------------------------------------------
+# Messung, Vergleich, Ausgabe
+# ----------------------------------------------------------------------
+def tk_available() -> bool:
+    try:
+        import tkinter as tk
+
+        root = tk.Tk()
+        root.destroy()
+        return True
+    except Exception:
+        return False
+
+
+def measure(name: str, size: int, repeat: int, with_memory: bool) -> Dict[str, object]:
+    bench = BENCHMARKS[name]
+    timings = []
+    for _ in range(repeat):
+        run = bench(size)
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+        del run
+
+    result: Dict[str, object] = {"benchmark": name, "size": size, "seconds": min(timings)}
+    if with_memory:
+        run = bench(size)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result["peak_bytes"] = peak
+    return result
+
+
+def compare(
+    results: List[Dict[str, object]],
+    baseline: List[Dict[str, object]],
+    time_threshold: float,
+    memory_threshold: float,
+) -> List[str]:
+    """Liefert eine Meldung pro Wert, der die Baseline um mehr als die Schwelle überschreitet."""
+    reference = {(entry["benchmark"], entry["size"]): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        base = reference.get((entry["benchmark"], entry["size"]))
+        if base is None:
+            continue
+        for key, threshold in (("seconds", time_threshold), ("peak_bytes", memory_threshold)):
+            if key not in entry or not base.get(key):
+                continue
+            ratio = entry[key] / base[key]
+            if ratio > 1 + threshold:
+                regressions.append(
+                    f"{entry['benchmark']} @ {entry['size']}: {key} {base[key]:.4g} -> {entry[key]:.4g} "
+                    f"({(ratio - 1) * 100:+.0f} %, erlaubt {threshold * 100:+.0f} %)"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Listengrößen")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="nur diese Benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen (gemeldet wird das Minimum)")
+    parser.add_argument("--no-memory", action="store_true", help="Spitzen-Speicher nicht messen")
+    parser.add_argument("--output", help="Ergebnisse als JSON hierhin schreiben")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline-Datei (JSON)")
+    parser.add_argument("--update-baseline", action="store_true", help="Ergebnisse als neue Baseline speichern")
+    parser.add_argument("--time-threshold", type=float, default=0.2, help="erlaubte Verschlechterung Laufzeit")
+    parser.add_argument("--memory-threshold", type=float, default=0.2, help="erlaubte Verschlechterung Speicher")
+    args = parser.parse_args(argv)
+
+    names = args.only or list(BENCHMARKS)
+    if any(name in TK_BENCHMARKS for name in names) and not tk_available():
+        skipped = [name for name in names if name in TK_BENCHMARKS]
+        print(f"Kein Display für Tk – übersprungen: {', '.join(skipped)}")
+        names = [name for name in names if name not in TK_BENCHMARKS]
+
+    results = []
+    for size in args.sizes:
+        for name in names:
+            entry = measure(name, size, args.repeat, not args.no_memory)
+            results.append(entry)
+            peak = f"{entry['peak_bytes'] / 1e6:10.1f} MB" if "peak_bytes" in entry else ""
+            print(f"{name:<30} {size:>9} {entry['seconds']:10.4f} s {peak}")
+
+    report = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline gespeichert: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Keine Baseline vorhanden (mit --update-baseline anlegen).")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.time_threshold, args.memory_threshold)
+    for message in regressions:
+        print(f"REGRESSION: {message}")
+    if not regressions:
+        print("Keine Regressionen gegenüber der Baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""background.py
+------------------------------------------------------------------------------
+Hintergrund-Jobs (z.B. Import/Export großer Dateien).
+
+Problem:
+Laden und Speichern liefen direkt im Tk-Hauptthread. Bei großen Dateien friert
+das Fenster ein und wird vom Betriebssystem als "reagiert nicht" markiert.
+
+Lösung:
+Die Arbeit läuft in einem Thread-Pool. Ergebnisse (z.B. Batches geladener
+Items) landen in einer begrenzten Queue, die der Hauptthread per `after()`
+abfragt. Dieses Modul kennt kein tkinter; die GUI übernimmt das Polling.
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+# Wie viele Ergebnisse höchstens auf den Hauptthread warten, bevor der Worker pausiert.
+MAX_PENDING_RESULTS = 8
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Gemeinsamer Thread-Pool für alle Hintergrund-Jobs der Anwendung."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="shopping-list-io")
+        return _executor
+
+
+class JobCancelled(Exception):
+    """Wird im Worker ausgelöst, wenn der Job abgebrochen wurde."""
+
+
+class BackgroundJob:
+    """Führt `work(job)` in einem Worker-Thread aus.
+
+    Der Worker meldet Zwischenergebnisse mit `emit()` und Fortschritt mit
+    `set_progress()` und ruft regelmäßig `check_cancelled()` auf. Der
+    Hauptthread holt Ergebnisse mit `drain()` ab und fragt `finished` ab.
+    """
+
+    def __init__(self, work: Callable[["BackgroundJob"], Any], executor: Optional[ThreadPoolExecutor] = None):
+        self._results: "queue.Queue[Any]" = queue.Queue(maxsize=MAX_PENDING_RESULTS)
+        self._cancel_event = threading.Event()
+        self.progress: Optional[float] = None
+        self._future: Future = (executor or get_executor()).submit(work, self)
+
+    # ------------------------------------------------------------------
+    # Worker-Seite
+    # ------------------------------------------------------------------
+    def emit(self, payload: Any) -> None:
+        """Übergibt ein Zwischenergebnis; blockiert, solange die Queue voll ist."""
+        while True:
+            self.check_cancelled()
+            try:
+                self._results.put(payload, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def set_progress(self, fraction: float) -> None:
+        self.progress = fraction
+
+    def check_cancelled(self) -> None:
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    # ------------------------------------------------------------------
+    # Hauptthread-Seite
+    # ------------------------------------------------------------------
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def drain(self, max_results: int) -> List[Any]:
+        """Holt höchstens `max_results` Zwischenergebnisse ab, ohne zu blockieren."""
+        results: List[Any] = []
+        while len(results) < max_results:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                break
+        return results
+
+    @property
+    def finished(self) -> bool:
+        """True, wenn der Worker fertig ist und alle Ergebnisse abgeholt wurden."""
+        return self._future.done() and self._results.empty()
+
+    def result(self) -> Any:
+        """Rückgabewert von `work`; löst die Exception des Workers erneut aus."""
+        return self._future.result()
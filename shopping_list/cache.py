@@ -0,0 +1,331 @@
+"""cache.py
+------------------------------------------------------------------------------
+Cache für geparste Importdateien.
+
+Problem:
+Dieselben Stammkatalog-Dateien werden täglich dutzendfach in neue Tabs
+importiert. Jedes Mal wird jede Zeile neu geparst.
+
+Lösung:
+- ParsedFileCache merkt sich die geparsten Zeilen (ist_gewichtsartikel, name,
+  menge, einzelpreis) einer Datei unter ihrem Inhalts-Hash (BLAKE2b).
+- Pfad, Größe und mtime zeigen, ob eine Datei seit dem letzten Mal unverändert
+  ist; nur dann wird der gespeicherte Hash ohne erneutes Lesen übernommen.
+  Passt der Stat nicht, wird der Hash neu berechnet: Eine nur "angefasste"
+  Datei trifft so weiterhin, eine geänderte nie.
+- Im Speicher liegt ein LRU mit Größenbudget (Zeilen als spaltenorientierter
+  ItemStore), auf der Platte liegen die Zeilen im kompakten Binärformat
+  (BinaryFileHandler, <hash>.slb) plus ein kleiner Index (index.json). Der
+  Plattencache hat ebenfalls ein Budget; beim Aufräumen verschwinden auch die
+  Index-Einträge gelöschter Zeilen und nicht mehr vorhandener Quelldateien.
+- CachingFileHandler legt den Cache vor eine beliebige Lade-Strategie: Bei
+  einem Treffer werden die Items direkt aus den Zeilen erzeugt, ohne Textparser.
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .factories import ItemFactory
+from .instrumentation import count, timed
+from .models import ShoppingItem
+from .persistence import BINARY_SUFFIX, BinaryFileHandler, FileHandler
+from .session import default_session_dir
+from .store import ItemStore
+
+# (Größe, mtime in ns) einer Datei
+FileStat = Tuple[int, int]
+
+CACHE_DIRNAME = "cache"
+INDEX_FILENAME = "index.json"
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+DEFAULT_DISK_BUDGET = 1024 * 1024 * 1024
+_HASH_CHUNK = 1024 * 1024
+# Items pro create_items-Aufruf bei einem Treffer
+LOAD_BATCH_SIZE = 5000
+
+
+def file_stat(filename: str) -> FileStat:
+    st = os.stat(filename)
+    return st.st_size, st.st_mtime_ns
+
+
+def content_hash(filename: str) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParsedFileCache:
+    """Zweistufiger Cache (Speicher-LRU + Platte) für geparste Dateien.
+
+    Args:
+        directory: Verzeichnis des Plattencaches; None = nur im Speicher
+        memory_budget: Obergrenze (geschätzte Bytes) für den Speicher-LRU
+        disk_budget: Obergrenze (Bytes) für die .slb-Dateien auf der Platte
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        disk_budget: int = DEFAULT_DISK_BUDGET,
+    ):
+        self.directory = directory
+        self.memory_budget = memory_budget
+        self.disk_budget = disk_budget
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, ItemStore]" = OrderedDict()
+        self._memory_used = 0
+        # absoluter Pfad -> [größe, mtime_ns, hash]
+        self._index: Dict[str, list] = {}
+        if directory is not None:
+            self._index = self._load_index()
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILENAME)  # type: ignore[arg-type]
+
+    def _load_index(self) -> Dict[str, list]:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                return dict(json.load(f))
+        except FileNotFoundError:
+            return {}
+        except (IOError, ValueError, TypeError) as e:
+            # Ein kaputter Index kostet nur Hash-Berechnungen, keine falschen Treffer.
+            print(f"Fehler beim Laden des Cache-Index: {e}")
+            return {}
+
+    def _save_index(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)  # type: ignore[arg-type]
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_path, self._index_path)
+
+    def _digest(self, path: str, stat: FileStat) -> str:
+        """Inhalts-Hash; bei unverändertem Stat aus dem Index, sonst neu berechnet."""
+        with self._lock:
+            known = self._index.get(path)
+        if known is not None and (known[0], known[1]) == stat:
+            return known[2]
+        return content_hash(path)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest + BINARY_SUFFIX)  # type: ignore[arg-type]
+
+    # ------------------------------------------------------------------
+    # Abfragen und Speichern
+    # ------------------------------------------------------------------
+    @timed("ParsedFileCache.get")
+    def get(self, filename: str) -> Optional[ItemStore]:
+        """Die geparsten Zeilen von `filename`, falls der Inhalt bekannt ist."""
+        path = os.path.abspath(filename)
+        stat = file_stat(path)
+        digest = self._digest(path, stat)
+
+        with self._lock:
+            rows = self._memory.get(digest)
+            if rows is not None:
+                self._memory.move_to_end(digest)
+                self._remember(path, stat, digest)
+                count("cache.memory_hit")
+                return rows
+
+        rows = self._read_blob(digest)
+        if rows is None:
+            count("cache.miss")
+            return None
+        with self._lock:
+            self._put_memory(digest, rows)
+            self._remember(path, stat, digest)
+        count("cache.disk_hit")
+        return rows
+
+    def put(self, filename: str, stat: FileStat, rows: ItemStore) -> None:
+        """Legt die Zeilen ab; `stat` ist der Stand der Datei vor dem Parsen.
+
+        Hat sich die Datei während des Parsens geändert, wird nichts gespeichert.
+        """
+        path = os.path.abspath(filename)
+        if file_stat(path) != stat:
+            return
+        digest = content_hash(path)
+        if self.directory is not None and not os.path.exists(self._blob_path(digest)):
+            self._write_blob(digest, rows)
+        with self._lock:
+            self._put_memory(digest, rows)
+            self._remember(path, stat, digest)
+
+    def clear(self) -> None:
+        """Leert den Speicher-LRU (der Plattencache bleibt)."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+
+    def _remember(self, path: str, stat: FileStat, digest: str) -> None:
+        if self._index.get(path) == [stat[0], stat[1], digest]:
+            return
+        self._index[path] = [stat[0], stat[1], digest]
+        if self.directory is None:
+            return
+        try:
+            self._save_index()
+        except (IOError, OSError) as e:
+            print(f"Fehler beim Speichern des Cache-Index: {e}")
+
+    def _put_memory(self, digest: str, rows: ItemStore) -> None:
+        cost = rows.nbytes
+        if cost > self.memory_budget:
+            return
+        if digest in self._memory:
+            self._memory.move_to_end(digest)
+            return
+        self._memory[digest] = rows
+        self._memory_used += cost
+        while self._memory_used > self.memory_budget:
+            _old_digest, old_rows = self._memory.popitem(last=False)
+            self._memory_used -= old_rows.nbytes
+
+    # ------------------------------------------------------------------
+    # Plattencache
+    # ------------------------------------------------------------------
+    def _read_blob(self, digest: str) -> Optional[ItemStore]:
+        if self.directory is None:
+            return None
+        path = self._blob_path(digest)
+        try:
+            rows = ItemStore()
+            with BinaryFileHandler().open(path) as reader:
+                for is_weighted, name, amount, price in reader.iter_rows():
+                    rows.append(name, is_weighted, amount, price)
+        except FileNotFoundError:
+            return None
+        except (IOError, ValueError) as e:
+            print(f"Fehler beim Laden aus dem Cache: {e}")
+            return None
+        # Zuletzt benutzt: bestimmt die Reihenfolge beim Aufräumen.
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Gerade von einem anderen Aufräumlauf gelöscht; die Zeilen sind schon gelesen.
+            pass
+        return rows
+
+    def _write_blob(self, digest: str, rows: ItemStore) -> None:
+        os.makedirs(self.directory, exist_ok=True)  # type: ignore[arg-type]
+        path = self._blob_path(digest)
+        tmp_path = path + ".tmp"
+        try:
+            BinaryFileHandler().save_stream(rows, tmp_path)
+            os.replace(tmp_path, path)
+        except (IOError, OSError) as e:
+            print(f"Fehler beim Speichern in den Cache: {e}")
+            return
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Löscht die am längsten unbenutzten Einträge, bis das Budget passt.
+
+        Danach fliegen auch die Index-Einträge raus, deren Zeilen gelöscht wurden
+        oder deren Quelldatei es nicht mehr gibt.
+        """
+        blobs = []
+        for entry in os.listdir(self.directory):  # type: ignore[arg-type]
+            if entry.endswith(BINARY_SUFFIX):
+                try:
+                    st = os.stat(os.path.join(self.directory, entry))  # type: ignore[arg-type]
+                except FileNotFoundError:
+                    continue
+                blobs.append((st.st_mtime_ns, st.st_size, entry))
+        used = sum(size for _mtime, size, _entry in blobs)
+        kept = set()
+        for _mtime, size, entry in sorted(blobs):
+            if used > self.disk_budget:
+                try:
+                    os.remove(os.path.join(self.directory, entry))  # type: ignore[arg-type]
+                except FileNotFoundError:
+                    pass
+                used -= size
+            else:
+                kept.add(entry[:-len(BINARY_SUFFIX)])
+        self._prune_index(kept)
+
+    def _prune_index(self, digests: Set[str]) -> None:
+        with self._lock:
+            stale = [
+                path for path, entry in self._index.items() if entry[2] not in digests or not os.path.exists(path)
+            ]
+            if not stale:
+                return
+            for path in stale:
+                del self._index[path]
+            try:
+                self._save_index()
+            except (IOError, OSError) as e:
+                print(f"Fehler beim Speichern des Cache-Index: {e}")
+
+
+_default_cache: Optional[ParsedFileCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> ParsedFileCache:
+    """Gemeinsamer Cache der Anwendung (im Sitzungsverzeichnis)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ParsedFileCache(os.path.join(default_session_dir(), CACHE_DIRNAME))
+        return _default_cache
+
+
+class CachingFileHandler(FileHandler):
+    """Legt einen ParsedFileCache vor eine andere Lade-Strategie (Decorator).
+
+    Speichern wird unverändert durchgereicht.
+    """
+
+    def __init__(self, inner: FileHandler, cache: Optional[ParsedFileCache] = None):
+        self.inner = inner
+        self.cache = cache if cache is not None else default_cache()
+
+    def save(self, items: List[ShoppingItem], filename: str) -> None:
+        self.inner.save(items, filename)
+
+    def save_stream(self, items: Iterable[ShoppingItem], filename: str) -> None:
+        self.inner.save_stream(items, filename)
+
+    def load(self, filename: str) -> List[ShoppingItem]:
+        return list(self.iter_load(filename))
+
+    def iter_load(self, filename: str) -> Iterator[ShoppingItem]:
+        rows = self.cache.get(filename)
+        if rows is not None:
+            names, flags, amounts, prices = rows.columns()
+            for start in range(0, len(rows), LOAD_BATCH_SIZE):
+                end = start + LOAD_BATCH_SIZE
+                yield from ItemFactory.create_items(
+                    names[start:end], flags[start:end], amounts[start:end], prices[start:end]
+                )
+            return
+
+        stat = file_stat(filename)
+        parsed = ItemStore()
+        for item in self.inner.iter_load(filename):
+            # Zeile sofort festhalten: Der Aufrufer darf das Item danach ändern (Merge).
+            parsed.append_item(item)
+            yield item
+        # Nur vollständig gelesene Dateien landen im Cache (Abbruch = kein Eintrag).
+        self.cache.put(filename, stat, parsed)
@@ -0,0 +1,349 @@
+"""catalog.py
+------------------------------------------------------------------------------
+Preiskatalog für die schnelle Eingabe neuer Artikel.
+
+Problem:
+Im Dialog "Neues Item" wird jeder Artikel samt Preis von Hand eingetippt,
+obwohl dieselben Produkte schon tausendfach erfasst oder importiert wurden.
+
+Lösung:
+- PriceCatalog merkt sich pro Produktname (casefold) die zuletzt gesehene
+  Schreibweise, die Art (Stück/Gewicht), den letzten Einzelpreis und wie oft
+  das Produkt vorkam. Gefüllt wird er ausdrücklich (`record`) nur mit Items,
+  die der Benutzer eingibt oder importiert – nicht beim Laden von Tabs oder
+  beim Nachspielen des Journals, sonst würde ein alter Stand den letzten
+  Preis überschreiben.
+- Aufgenommene Items landen in einem Puffer (pro Name ein Eintrag). Ein
+  Hintergrund-Thread schreibt ihn gebündelt per Upsert in eine SQLite-Datei,
+  in kleinen Transaktionen, damit Abfragen aus der GUI nie lange warten. Ist
+  der Puffer voll, wartet `record` (läuft im Import-Thread) auf den Schreiber.
+- Vor der Datenbank liegt ein LRU der zuletzt abgefragten Produkte sowie ein
+  kleiner LRU der letzten Präfix-Anfragen (Autovervollständigung beim Tippen).
+  Treffer kosten nur einen Dictionary-Zugriff, unabhängig von der Größe des
+  Katalogs; Fehlgriffe kosten eine Indexabfrage in SQLite. Noch nicht
+  geschriebene Produkte findet `lookup` direkt im Puffer.
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .instrumentation import count, timed
+from .models import ShoppingItem, WeightedItem
+from .session import default_session_dir
+
+CATALOG_FILENAME = "catalog.sqlite"
+# Produkte im Speicher-LRU
+DEFAULT_CAPACITY = 4096
+# Zwischengespeicherte Präfix-Anfragen
+COMPLETION_CACHE_SIZE = 256
+# Verschiedene Namen im Puffer, ab denen `record` auf den Schreiber wartet
+FLUSH_THRESHOLD = 50_000
+# Sammelzeit des Schreibers (Sekunden)
+FLUSH_DELAY = 0.5
+# Zeilen je Schreib-Transaktion (dazwischen kommen Abfragen zum Zug)
+FLUSH_CHUNK = 2000
+# Höchstens so viele Kandidaten werden pro Präfix-Anfrage nach Häufigkeit sortiert
+COMPLETION_SCAN_LIMIT = 1000
+DEFAULT_COMPLETION_LIMIT = 10
+# Größer als jedes Zeichen: obere Grenze für Präfix-Bereiche
+_MAX_CHAR = "\U0010ffff"
+
+
+def default_catalog_path() -> str:
+    return os.path.join(default_session_dir(), CATALOG_FILENAME)
+
+
+def fold(name: str) -> str:
+    """Schlüssel eines Produkts (wie in search.py: Groß/Klein egal)."""
+    return name.casefold()
+
+
+# (Name, ist_gewichtsartikel, letzter Preis, Anzahl) eines gepufferten Produkts
+_Row = Tuple[str, bool, float, int]
+
+
+class CatalogEntry(NamedTuple):
+    name: str
+    is_weighted: bool
+    price: float
+    """Zuletzt gesehener Einzelpreis."""
+    uses: int
+
+
+class PriceCatalog:
+    """Produkte mit letztem Preis: SQLite auf der Platte, LRU im Speicher.
+
+    Alle Methoden sind thread-sicher (Importe laufen im Hintergrund).
+    Fehler der Datenbank werden gemeldet, aber nie weitergereicht: Der Katalog
+    ist nur eine Eingabehilfe.
+
+    Args:
+        path: SQLite-Datei; None = nur im Speicher (z.B. ohne Sitzung)
+        capacity: Obergrenze für Produkte im Speicher-LRU
+        flush_threshold: Obergrenze für verschiedene Namen im Schreibpuffer
+        flush_delay: Sammelzeit des Schreib-Threads in Sekunden
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS products (
+            key         TEXT PRIMARY KEY,
+            name        TEXT NOT NULL,
+            is_weighted INTEGER NOT NULL,
+            price       REAL NOT NULL,
+            uses        INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        capacity: int = DEFAULT_CAPACITY,
+        flush_threshold: int = FLUSH_THRESHOLD,
+        flush_delay: float = FLUSH_DELAY,
+    ):
+        self.path = path
+        self.capacity = capacity
+        self.flush_threshold = flush_threshold
+        self.flush_delay = flush_delay
+        # _lock schützt Puffer und LRUs, _db_lock die Verbindung.
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._hot: "OrderedDict[str, Optional[CatalogEntry]]" = OrderedDict()
+        self._completions: "OrderedDict[Tuple[str, int], List[CatalogEntry]]" = OrderedDict()
+        # Schlüssel -> (Name, ist_gewichtsartikel, letzter Preis, Anzahl)
+        self._pending: Dict[str, _Row] = {}
+        # Gerade vom Schreiber übernommen, aber noch nicht vollständig geschrieben
+        self._flushing: Dict[str, _Row] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._flush_lock = threading.Lock()
+        # Zählt geschriebene Blöcke: Eine Abfrage, die währenddessen lief, landet nicht im LRU.
+        self._generation = 0
+        self._closing = False
+
+    # ------------------------------------------------------------------
+    # Verbindung
+    # ------------------------------------------------------------------
+    def _connection(self) -> sqlite3.Connection:
+        """Nur mit gehaltenem _db_lock aufrufen."""
+        if self._conn is None:
+            if self.path is not None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path or ":memory:", check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Schreibt den Puffer und schließt die Datenbank."""
+        with self._lock:
+            self._closing = True
+            self._cond.notify_all()
+            flusher = self._flusher
+        if flusher is not None:
+            flusher.join()
+        self._flush()
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------
+    # Erfassen
+    # ------------------------------------------------------------------
+    def record(self, items: Sequence[ShoppingItem]) -> None:
+        """Nimmt vom Benutzer eingegebene oder importierte Items auf.
+
+        Blockiert nur, wenn der Puffer voll ist (bis der Schreiber ihn übernommen hat).
+        """
+        # Zählen und "letztes Item je Name" laufen in C; die Schleife geht nur über verschiedene Namen.
+        uses = Counter(item.name for item in items)
+        latest = {item.name: item for item in items}
+        with self._lock:
+            pending = self._pending
+            for name, item in latest.items():
+                key = fold(name)
+                known = pending.get(key)
+                pending[key] = (
+                    name,
+                    isinstance(item, WeightedItem),
+                    item.price_per_unit,
+                    uses[name] + (known[3] if known is not None else 0),
+                )
+            if self._flusher is None and not self._closing:
+                self._flusher = threading.Thread(target=self._run, name="shopping-list-catalog", daemon=True)
+                self._flusher.start()
+            self._cond.notify_all()
+            while len(self._pending) >= self.flush_threshold and not self._closing:
+                self._cond.wait()
+
+    def flush(self) -> None:
+        """Schreibt alle gepufferten Items sofort in die Datenbank."""
+        self._flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if self._closing:
+                    return
+                # Weitere Items sammeln, außer der Puffer ist schon voll.
+                deadline = time.monotonic() + self.flush_delay
+                while len(self._pending) < self.flush_threshold and not self._closing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self._flush()
+
+    @timed("PriceCatalog.flush")
+    def _flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending and not self._flushing:
+                    return
+                for key, row in self._pending.items():
+                    self._flushing[key] = _combined(row, self._flushing.get(key))
+                rows = list(self._flushing.items())
+                self._pending = {}
+                self._cond.notify_all()
+            self._write(rows)
+
+    def _write(self, rows: List[Tuple[str, _Row]]) -> None:
+        try:
+            for start in range(0, len(rows), FLUSH_CHUNK):
+                chunk = rows[start:start + FLUSH_CHUNK]
+                with self._db_lock:
+                    conn = self._connection()
+                    with conn:
+                        conn.executemany(
+                            """
+                            INSERT INTO products (key, name, is_weighted, price, uses) VALUES (?, ?, ?, ?, ?)
+                            ON CONFLICT(key) DO UPDATE SET
+                                name = excluded.name,
+                                is_weighted = excluded.is_weighted,
+                                price = excluded.price,
+                                uses = uses + excluded.uses
+                            """,
+                            [(key, name, int(weighted), price, uses) for key, (name, weighted, price, uses) in chunk],
+                        )
+                with self._lock:
+                    for key, _row in chunk:
+                        self._flushing.pop(key, None)
+                        self._hot.pop(key, None)
+                    self._completions.clear()
+                    self._generation += 1
+        except sqlite3.Error as e:
+            # Nicht geschriebene Zeilen werden verworfen, damit der Puffer begrenzt bleibt.
+            print(f"Fehler beim Speichern des Preiskatalogs: {e}")
+            with self._lock:
+                self._flushing.clear()
+
+    # ------------------------------------------------------------------
+    # Abfragen
+    # ------------------------------------------------------------------
+    def lookup(self, name: str) -> Optional[CatalogEntry]:
+        """Eintrag für `name` (Groß/Klein egal) oder None."""
+        key = fold(name.strip())
+        with self._lock:
+            buffered = self._buffered(key)
+            generation = self._generation
+            if key in self._hot:
+                self._hot.move_to_end(key)
+                count("catalog.hit")
+                stored = self._hot[key]
+                return _merged(stored, buffered) if buffered is not None else stored
+        count("catalog.miss")
+        try:
+            with self._db_lock:
+                row = (
+                    self._connection()
+                    .execute("SELECT name, is_weighted, price, uses FROM products WHERE key = ?", (key,))
+                    .fetchone()
+                )
+        except sqlite3.Error as e:
+            print(f"Fehler beim Lesen des Preiskatalogs: {e}")
+            return _merged(None, buffered) if buffered is not None else None
+        stored = CatalogEntry(row[0], bool(row[1]), row[2], row[3]) if row is not None else None
+        with self._lock:
+            # Auch "unbekannt" merken: Beim Tippen wird derselbe Name oft mehrfach geprüft.
+            if generation == self._generation:
+                self._hot[key] = stored
+                if len(self._hot) > self.capacity:
+                    self._hot.popitem(last=False)
+        return _merged(stored, buffered) if buffered is not None else stored
+
+    def complete(self, prefix: str, limit: int = DEFAULT_COMPLETION_LIMIT) -> List[CatalogEntry]:
+        """Bis zu `limit` Produkte, deren Name mit `prefix` beginnt (häufigste zuerst).
+
+        Noch nicht geschriebene Produkte erscheinen erst nach dem nächsten Schreiben.
+        """
+        key = fold(prefix.strip())
+        if not key:
+            return []
+        with self._lock:
+            generation = self._generation
+            cached = self._completions.get((key, limit))
+            if cached is not None:
+                self._completions.move_to_end((key, limit))
+                return cached
+        try:
+            with self._db_lock:
+                rows = (
+                    self._connection()
+                    .execute(
+                        "SELECT name, is_weighted, price, uses FROM products "
+                        "WHERE key >= ? AND key < ? ORDER BY key LIMIT ?",
+                        (key, key + _MAX_CHAR, COMPLETION_SCAN_LIMIT),
+                    )
+                    .fetchall()
+                )
+        except sqlite3.Error as e:
+            print(f"Fehler beim Lesen des Preiskatalogs: {e}")
+            return []
+        entries = [
+            CatalogEntry(name, bool(is_weighted), price, uses)
+            for name, is_weighted, price, uses in heapq.nlargest(limit, rows, key=lambda row: row[3])
+        ]
+        with self._lock:
+            if generation == self._generation:
+                self._completions[(key, limit)] = entries
+                if len(self._completions) > COMPLETION_CACHE_SIZE:
+                    self._completions.popitem(last=False)
+        return entries
+
+    def _buffered(self, key: str) -> Optional[_Row]:
+        """Noch nicht geschriebener Stand eines Produkts (nur mit gehaltenem _lock)."""
+        pending = self._pending.get(key)
+        flushing = self._flushing.get(key)
+        return _combined(pending, flushing) if pending is not None else flushing
+
+    def __len__(self) -> int:
+        """Anzahl der Produkte (schreibt vorher den Puffer)."""
+        self._flush()
+        with self._db_lock:
+            return self._connection().execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+
+def _combined(newer: _Row, older: Optional[_Row]) -> _Row:
+    if older is None:
+        return newer
+    return newer[0], newer[1], newer[2], newer[3] + older[3]
+
+
+def _merged(stored: Optional[CatalogEntry], buffered: _Row) -> CatalogEntry:
+    """Gespeicherter Eintrag plus noch nicht geschriebene Änderungen."""
+    name, is_weighted, price, uses = buffered
+    return CatalogEntry(name, is_weighted, price, uses + (stored.uses if stored is not None else 0))
@@ -0,0 +1,117 @@
+"""cli.py
+------------------------------------------------------------------------------
+Kommandozeile für Batch-Jobs ohne GUI (kein tkinter).
+
+Beispiel:
+    python -m shopping_list.cli merge out.txt in1.txt in2.txt ...
+
+Die Eingabedateien werden in einem Prozess-Pool geparst und danach in
+Dateireihenfolge mit denselben Merge- und Kollisionsregeln wie in der GUI
+zusammengeführt (MergeService). Das Ergebnis wird mit TxtFileHandler geschrieben,
+bei Endung .gz/.bz2/.xz komprimiert (Stufe über --level).
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .factories import ItemFactory
+from .merge import MergeService
+from .persistence import (
+    COMPRESSION_ERRORS,
+    CompressedTxtFileHandler,
+    TxtFileHandler,
+    handler_for_file,
+    iter_rows,
+)
+
+ParsedRow = Tuple[str, bool, float, float]
+
+
+def load_rows(filename: str) -> List[ParsedRow]:
+    """Lädt eine Datei als (name, ist_gewichtsartikel, menge, preis)-Zeilen (läuft im Worker)."""
+    handler = handler_for_file(filename, TxtFileHandler())
+    return [
+        (name, is_weighted, amount, price)
+        for is_weighted, name, amount, price in iter_rows(handler.iter_load(filename))
+    ]
+
+
+def _iter_parsed_files(filenames: Sequence[str], workers: int) -> Iterator[List[ParsedRow]]:
+    if workers <= 1 or len(filenames) <= 1:
+        for filename in filenames:
+            yield load_rows(filename)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        # map() liefert die Ergebnisse in Eingabereihenfolge -> deterministischer Merge
+        yield from executor.map(load_rows, filenames)
+
+
+def merge_files(
+    output: str, inputs: Sequence[str], workers: Optional[int] = None, level: Optional[int] = None
+) -> Tuple[int, int, float]:
+    """Führt alle Eingabedateien zusammen und schreibt das Ergebnis nach `output`.
+
+    `level` ist die Kompressionsstufe, falls `output` komprimiert geschrieben wird.
+
+    Returns:
+        (gelesene Items, Items im Ergebnis, Dauer in Sekunden)
+    """
+    start = time.perf_counter()
+    service = MergeService()
+    read = 0
+
+    workers = workers or min(len(inputs), os.cpu_count() or 1)
+    for rows in _iter_parsed_files(inputs, workers):
+        read += len(rows)
+        service.merge(ItemFactory.create_item(*row) for row in rows)
+
+    handler = handler_for_file(output, TxtFileHandler())
+    if isinstance(handler, CompressedTxtFileHandler):
+        handler.level = level
+    handler.save(service.items, output)
+    return read, len(service.items), time.perf_counter() - start
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m shopping_list.cli", description="Einkaufslisten ohne GUI verarbeiten"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    merge_cmd = commands.add_parser("merge", help="Mehrere Listen zu einer zusammenführen")
+    merge_cmd.add_argument("output", help="Zieldatei")
+    merge_cmd.add_argument("inputs", nargs="+", help="Eingabedateien (werden in dieser Reihenfolge gemergt)")
+    merge_cmd.add_argument("-j", "--workers", type=int, default=None, help="Anzahl Worker-Prozesse")
+    merge_cmd.add_argument(
+        "-l", "--level", type=int, default=None, help="Kompressionsstufe für .gz/.bz2/.xz (gzip/bz2 1-9, xz 0-9)"
+    )
+
+    args = parser.parse_args(argv)
+
+    try:
+        read, written, seconds = merge_files(args.output, args.inputs, args.workers, args.level)
+    except (IOError, ValueError, sqlite3.Error, *COMPRESSION_ERRORS) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 1
+
+    rate = read / seconds if seconds > 0 else float("inf")
+    print(
+        f"{read} Items aus {len(args.inputs)} Dateien -> {written} Items in {args.output} "
+        f"({seconds:.2f} s, {rate:,.0f} Items/s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""consolidation.py
+------------------------------------------------------------------------------
+Gesamtliste über alle Tabs ("Alle Listen").
+
+Problem:
+Die kombinierte Einkaufsliste bekam man bisher nur, indem man jeden Tab
+exportierte und alles in einen neuen Tab importierte – mit vollem Merge bei
+jeder Änderung.
+
+Lösung:
+- Consolidator fasst die Items aller angemeldeten Listen nach denselben Regeln
+  wie der MergeService zusammen (Name, Typ, Preis innerhalb der Toleranz) und
+  merkt sich pro Zeile die Menge je Quelle (Aufschlüsselung).
+- Er folgt den ListEvents der Quellen und ändert nur die betroffene Zeile.
+- Die Zeilen bleiben sortiert (Name, Typ, Preis). Die Schlüssel liegen in
+  Blöcken begrenzter Größe (bisect über die Block-Maxima), damit Einfügen und
+  Entfernen auch bei sehr vielen Zeilen nicht die ganze Liste verschieben.
+- Änderungen an der Gesamtliste werden selbst wieder als ListEvents gemeldet,
+  sodass die Anzeige wie ein normaler Tab inkrementell nachzieht.
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from .factories import ItemFactory
+from .merge import PRICE_TOLERANCE, price_bucket
+from .models import (
+    INSERT,
+    REMOVE,
+    RESET,
+    UPDATE,
+    ListEvent,
+    ListListener,
+    ShoppingItem,
+    ShoppingList,
+    WeightedItem,
+    item_type_key,
+)
+
+_RowKey = Tuple[str, str, str, Tuple[int, int]]
+
+
+def _amount(item: ShoppingItem) -> float:
+    return item.weight if isinstance(item, WeightedItem) else item.quantity  # type: ignore[attr-defined]
+
+
+class _SortedKeys:
+    """Sortierte Schlüssel in Blöcken; Einfügen/Entfernen liefern die Position."""
+
+    LOAD = 512
+
+    def __init__(self) -> None:
+        self._blocks: List[List[Any]] = []
+        self._maxes: List[Any] = []
+        self._offsets: Optional[List[int]] = None
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _offset(self, block: int) -> int:
+        if self._offsets is None:
+            self._offsets = [0] + list(accumulate(len(b) for b in self._blocks))
+        return self._offsets[block]
+
+    def _locate(self, key: Any) -> Tuple[int, int]:
+        block = bisect_left(self._maxes, key)
+        if block == len(self._blocks):
+            block -= 1
+        return block, bisect_left(self._blocks[block], key)
+
+    def add(self, key: Any) -> int:
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            self._offsets = None
+            return 0
+
+        block, pos = self._locate(key)
+        index = self._offset(block) + pos
+        entries = self._blocks[block]
+        entries.insert(pos, key)
+        self._maxes[block] = entries[-1]
+        if len(entries) > 2 * self.LOAD:
+            self._blocks[block:block + 1] = [entries[:self.LOAD], entries[self.LOAD:]]
+            self._maxes[block:block + 1] = [entries[self.LOAD - 1], entries[-1]]
+        self._len += 1
+        self._offsets = None
+        return index
+
+    def index(self, key: Any) -> int:
+        block, pos = self._locate(key)
+        return self._offset(block) + pos
+
+    def remove(self, key: Any) -> int:
+        block, pos = self._locate(key)
+        index = self._offset(block) + pos
+        entries = self._blocks[block]
+        del entries[pos]
+        if entries:
+            self._maxes[block] = entries[-1]
+        else:
+            del self._blocks[block]
+            del self._maxes[block]
+        self._len -= 1
+        self._offsets = None
+        return index
+
+    def __iter__(self) -> Iterator[Any]:
+        for entries in self._blocks:
+            yield from entries
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError(index)
+        self._offset(0)
+        block = bisect_left(self._offsets, index + 1) - 1  # type: ignore[arg-type]
+        return self._blocks[block][index - self._offsets[block]]  # type: ignore[index]
+
+
+class ConsolidatedRow:
+    """Eine Zeile der Gesamtliste: ein zusammengefasstes Item plus Mengen je Quelle."""
+
+    __slots__ = ("key", "item", "per_source", "members")
+
+    def __init__(self, key: _RowKey, item: ShoppingItem):
+        self.key = key
+        self.item = item
+        # id(quelle) -> [quelle, menge, anzahl items]
+        self.per_source: Dict[int, List[Any]] = {}
+        self.members = 0
+
+    def breakdown(self) -> List[Tuple[Hashable, float]]:
+        """(Quelle, Menge) für jede Quelle, die zu dieser Zeile beiträgt."""
+        return [(source, amount) for source, amount, _count in self.per_source.values()]
+
+
+class Consolidator:
+    """Fasst mehrere ShoppingLists (Quellen) laufend zu einer sortierten Gesamtliste zusammen.
+
+    Als Sequenz liefert er die zusammengefassten Items (für VirtualListView).
+    """
+
+    def __init__(self) -> None:
+        self._keys = _SortedKeys()
+        self._rows: Dict[_RowKey, ConsolidatedRow] = {}
+        self._buckets: Dict[Tuple[str, str, int], ConsolidatedRow] = {}
+        self._members: Dict[int, Dict[int, ConsolidatedRow]] = {}
+        self._unsubscribe: Dict[int, Callable[[], None]] = {}
+        self._listeners: Tuple[ListListener, ...] = ()
+        self._total = 0.0
+        self._odd_rows = 0
+
+    # ------------------------------------------------------------------
+    # Lesen
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __getitem__(self, index: int) -> ShoppingItem:
+        return self._rows[self._keys[index]].item
+
+    def row(self, index: int) -> ConsolidatedRow:
+        return self._rows[self._keys[index]]
+
+    def total(self) -> float:
+        return self._total
+
+    def subscribe(self, listener: ListListener) -> Callable[[], None]:
+        """Meldet Änderungen der Gesamtliste (Positionen beziehen sich auf die Sortierung)."""
+        self._listeners += (listener,)
+
+        def unsubscribe() -> None:
+            self._listeners = tuple(entry for entry in self._listeners if entry is not listener)
+
+        return unsubscribe
+
+    def _emit(self, kind: str, index: int, row: ConsolidatedRow, amount_delta: float, total_delta: float) -> None:
+        event = ListEvent(kind, index, (row.item,), amount_delta, total_delta)
+        for listener in self._listeners:
+            listener(event)
+
+    # ------------------------------------------------------------------
+    # Quellen
+    # ------------------------------------------------------------------
+    def attach(self, source: Hashable, items: ShoppingList) -> None:
+        """Nimmt alle Items von `items` auf und folgt ab jetzt ihren Änderungen."""
+        self.detach(source)
+        self._members[id(source)] = {}
+        for item in items:
+            self._add(source, item)
+
+        def on_change(event: ListEvent) -> None:
+            if event.kind == INSERT:
+                for item in event.items:
+                    self._add(source, item)
+            elif event.kind == REMOVE:
+                for item in event.items:
+                    self._remove(source, item)
+            elif event.kind == UPDATE:
+                for item in event.items:
+                    self._update(source, item, event.amount_delta)
+            elif event.kind == RESET:
+                self._remove_source(source)
+                self._members[id(source)] = {}
+                for item in event.items:
+                    self._add(source, item)
+
+        self._unsubscribe[id(source)] = items.subscribe(on_change)
+
+    def detach(self, source: Hashable) -> None:
+        """Entfernt alle Beiträge einer Quelle."""
+        unsubscribe = self._unsubscribe.pop(id(source), None)
+        if unsubscribe is None:
+            return
+        unsubscribe()
+        self._remove_source(source)
+
+    def close(self) -> None:
+        """Meldet alle Quellen ab."""
+        for unsubscribe in self._unsubscribe.values():
+            unsubscribe()
+        self._unsubscribe.clear()
+
+    def _remove_source(self, source: Hashable) -> None:
+        members = self._members.pop(id(source), {})
+        # Die Items wurden ggf. schon aus der Quelle entfernt; ihre Menge ist aber noch aktuell.
+        for row in set(members.values()):
+            contribution = row.per_source.get(id(source))
+            if contribution is not None:
+                self._change(row, source, -contribution[1], -contribution[2])
+
+    # ------------------------------------------------------------------
+    # Einzelne Items
+    # ------------------------------------------------------------------
+    def _find_row(self, item: ShoppingItem) -> Optional[ConsolidatedRow]:
+        bucket = price_bucket(item.price_per_unit)
+        if bucket is None:
+            return None
+        type_key = item_type_key(item)
+        for neighbour in (bucket - 1, bucket, bucket + 1):
+            row = self._buckets.get((item.name, type_key, neighbour))
+            if row is not None and abs(row.item.price_per_unit - item.price_per_unit) < PRICE_TOLERANCE:
+                return row
+        return None
+
+    def _add(self, source: Hashable, item: ShoppingItem) -> None:
+        row = self._find_row(item)
+        if row is None:
+            type_key = item_type_key(item)
+            bucket = price_bucket(item.price_per_unit)
+            if bucket is None:
+                # Nicht-endliche Preise werden (wie beim Merge) nie zusammengefasst.
+                self._odd_rows += 1
+                sort_bucket = (1, self._odd_rows)
+            else:
+                sort_bucket = (0, bucket)
+            key = (item.name.casefold(), item.name, type_key, sort_bucket)
+            row = ConsolidatedRow(key, ItemFactory.create_item(item.name, type_key == "W", 0, item.price_per_unit))
+            self._rows[key] = row
+            if bucket is not None:
+                self._buckets[(item.name, type_key, bucket)] = row
+            self._keys.add(key)
+        self._members[id(source)][id(item)] = row
+        self._change(row, source, _amount(item), 1)
+
+    def _remove(self, source: Hashable, item: ShoppingItem) -> None:
+        row = self._members[id(source)].pop(id(item), None)
+        if row is not None:
+            self._change(row, source, -_amount(item), -1)
+
+    def _update(self, source: Hashable, item: ShoppingItem, amount_delta: float) -> None:
+        row = self._members[id(source)].get(id(item))
+        if row is not None:
+            self._change(row, source, amount_delta, 0)
+
+    def _change(self, row: ConsolidatedRow, source: Hashable, amount_delta: float, member_delta: int) -> None:
+        """Bucht eine Mengenänderung einer Quelle auf `row` und meldet sie."""
+        created = row.members == 0
+        old_total = row.item.calculate_total()
+        row.item.add_amount(amount_delta)
+        total_delta = row.item.calculate_total() - old_total
+
+        contribution = row.per_source.get(id(source))
+        if contribution is None:
+            contribution = row.per_source[id(source)] = [source, 0, 0]
+        contribution[1] += amount_delta
+        contribution[2] += member_delta
+        if contribution[2] == 0:
+            del row.per_source[id(source)]
+        row.members += member_delta
+
+        self._total += total_delta
+        if row.members == 0:
+            index = self._keys.remove(row.key)
+            del self._rows[row.key]
+            _folded, name, type_key, (kind, bucket) = row.key
+            if kind == 0:
+                self._buckets.pop((name, type_key, bucket), None)
+            if not self._rows:
+                self._total = 0.0
+            self._emit(REMOVE, index, row, amount_delta, total_delta)
+        elif created:
+            self._emit(INSERT, self._keys.index(row.key), row, amount_delta, total_delta)
+        else:
+            self._emit(UPDATE, self._keys.index(row.key), row, amount_delta, total_delta)
+
+    def rows(self) -> Iterator[ConsolidatedRow]:
+        """Alle Zeilen in Sortierreihenfolge."""
+        for key in self._keys:
+            yield self._rows[key]
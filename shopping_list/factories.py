@@ -9,18 +9,63 @@ und sie soll auch nicht wissen, welche konkreten Klassen (Weighted vs Counted) e
 
 Lösung:
 Die Factory übernimmt diese Entscheidung. Das entkoppelt die GUI von den Modellen.
+
+Für Importe gibt es eine Batch-Variante (`create_items`/`create_store`): Sie
+bekommt Spalten statt einzelner Werte, prüft alle Zeilen in einem Durchlauf
+und meldet sämtliche fehlerhaften Zeilen auf einmal (ItemValidationError).
 ------------------------------------------------------------------------------
 """
 
 from __future__ import annotations
 
+import sys
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .instrumentation import timed
 from .models import ShoppingItem, CountedItem, WeightedItem
+from .store import ItemStore
+
+# Höchstens so viele Einzelfehler landen in der Fehlermeldung (alle stehen in `errors`)
+MAX_REPORTED_ERRORS = 10
+
+
+class ItemValidationError(ValueError):
+    """Ungültige Zeilen beim Batch-Erzeugen.
+
+    Attributes:
+        errors: (Zeilennummer, Beschreibung) für jede fehlerhafte Zeile
+    """
+
+    def __init__(self, errors: List[Tuple[int, str]]):
+        self.errors = errors
+        details = "; ".join(f"Zeile {row}: {message}" for row, message in errors[:MAX_REPORTED_ERRORS])
+        more = f" (und {len(errors) - MAX_REPORTED_ERRORS} weitere)" if len(errors) > MAX_REPORTED_ERRORS else ""
+        super().__init__(f"{len(errors)} ungültige Zeile(n): {details}{more}")
+
+
+def _row_errors(name: Any, is_weighted: Any, amount: Any, price: Any) -> List[str]:
+    """Alle Probleme einer einzelnen Zeile (leer = gültig)."""
+    problems = []
+    if not isinstance(name, str):
+        problems.append(f"Name {name!r} ist kein Text")
+    try:
+        amount_val = float(amount)
+        if not is_weighted:
+            int(amount_val)
+    except (TypeError, ValueError, OverflowError):
+        problems.append(f"Menge {amount!r} ist keine gültige Zahl")
+    try:
+        float(price)
+    except (TypeError, ValueError, OverflowError):
+        problems.append(f"Preis {price!r} ist keine Zahl")
+    return problems
 
 
 class ItemFactory:
     """Erzeugungslogik für ShoppingItem-Objekte."""
 
     @staticmethod
+    @timed("ItemFactory.create_item")
     def create_item(name: str, is_weighted: bool, amount: float, price: float) -> ShoppingItem:
         """Erzeugt ein Item abhängig von der Art (Gewicht vs. Stück).
 
@@ -33,6 +78,91 @@ class ItemFactory:
         Returns:
             Ein Objekt vom Typ ShoppingItem (bzw. einer Unterklasse).
         """
+        # Gleiche Produktnamen ("Milch", "Brot") teilen sich ein String-Objekt.
+        name = sys.intern(name)
         if is_weighted:
             return WeightedItem(name=name, price_per_unit=float(price), weight=float(amount))
         return CountedItem(name=name, price_per_unit=float(price), quantity=int(amount))
+
+    @staticmethod
+    @timed("ItemFactory.create_items")
+    def create_items(
+        names: Sequence[str],
+        is_weighted: Sequence[Any],
+        amounts: Sequence[Any],
+        prices: Sequence[Any],
+        row_numbers: Optional[Sequence[int]] = None,
+    ) -> List[ShoppingItem]:
+        """Erzeugt viele Items aus Spalten (gleiche Umrechnung wie `create_item`).
+
+        Mengen und Preise dürfen Zahlen oder Zahl-Strings sein; Stückzahlen werden
+        über float() in int umgerechnet.
+
+        Args:
+            names, is_weighted, amounts, prices: gleich lange Spalten
+            row_numbers: Zeilennummern für Fehlermeldungen (Standard: 1, 2, ...)
+
+        Raises:
+            ItemValidationError: mit allen fehlerhaften Zeilen; es wird dann kein Item erzeugt.
+        """
+        ItemFactory._check_lengths(names, is_weighted, amounts, prices)
+        intern = sys.intern
+        try:
+            # Schneller Weg: ein Durchlauf ohne Prüfungen pro Zeile; Fehler fallen als Exception auf.
+            return [
+                WeightedItem(intern(name), float(price), float(amount))
+                if weighted
+                else CountedItem(intern(name), float(price), int(float(amount)))
+                for name, weighted, amount, price in zip(names, is_weighted, amounts, prices)
+            ]
+        except (TypeError, ValueError, OverflowError):
+            raise ItemFactory._validation_error(names, is_weighted, amounts, prices, row_numbers) from None
+
+    @staticmethod
+    @timed("ItemFactory.create_store")
+    def create_store(
+        names: Sequence[str],
+        is_weighted: Sequence[Any],
+        amounts: Sequence[Any],
+        prices: Sequence[Any],
+        store: Optional[ItemStore] = None,
+        row_numbers: Optional[Sequence[int]] = None,
+    ) -> ItemStore:
+        """Wie `create_items`, schreibt die Zeilen aber direkt in einen ItemStore (Spalten).
+
+        Bei Fehlern bleibt `store` unverändert.
+        """
+        ItemFactory._check_lengths(names, is_weighted, amounts, prices)
+        if store is None:
+            store = ItemStore()
+        try:
+            flags = [bool(weighted) for weighted in is_weighted]
+            amount_values = [
+                float(amount) if weighted else float(int(float(amount))) for weighted, amount in zip(flags, amounts)
+            ]
+            price_values = [float(price) for price in prices]
+            name_values = [sys.intern(name) for name in names]
+        except (TypeError, ValueError, OverflowError):
+            raise ItemFactory._validation_error(names, is_weighted, amounts, prices, row_numbers) from None
+        store.extend_columns(name_values, flags, amount_values, price_values)
+        return store
+
+    @staticmethod
+    def _check_lengths(*columns: Sequence[Any]) -> None:
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("Die Spalten sind unterschiedlich lang: " + ", ".join(str(len(c)) for c in columns))
+
+    @staticmethod
+    def _validation_error(
+        names: Sequence[str],
+        is_weighted: Sequence[Any],
+        amounts: Sequence[Any],
+        prices: Sequence[Any],
+        row_numbers: Optional[Sequence[int]],
+    ) -> ItemValidationError:
+        errors: List[Tuple[int, str]] = []
+        for pos, row in enumerate(zip(names, is_weighted, amounts, prices)):
+            problems = _row_errors(*row)
+            if problems:
+                errors.append((row_numbers[pos] if row_numbers is not None else pos + 1, ", ".join(problems)))
+        return ItemValidationError(errors)
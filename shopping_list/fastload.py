@@ -0,0 +1,170 @@
+"""fastload.py
+------------------------------------------------------------------------------
+Paralleles Laden großer Exportdateien (TYP|NAME|MENGE|PREIS).
+
+Problem:
+TxtFileHandler parst mehrere GB große Sammel-Exporte Zeile für Zeile auf einem
+einzigen Kern.
+
+Lösung:
+- Die Datei wird per mmap eingeblendet und in Chunks zerlegt, deren Grenzen
+  immer direkt hinter einem Zeilenumbruch liegen.
+- Die Chunks werden in einem Prozess-Pool geparst (gleiche Regeln wie
+  `persistence.split_line`), die Ergebnisse in Dateireihenfolge zusammengeführt.
+- Jeder Chunk kommt als Spaltenblock samt Zeilennummern zurück und läuft
+  danach durch denselben Weg wie beim sequentiellen Laden
+  (`TxtFileHandler._iter_columns`). Ungültige Zeilen werden deshalb genauso
+  gesammelt und mit Zeilennummer gemeldet.
+- Es sind nur wenige Chunks gleichzeitig unterwegs, damit der Speicherbedarf
+  nicht mit der Dateigröße wächst.
+
+Kleine Dateien werden weiterhin sequentiell geladen, dort lohnt sich der
+Start der Worker-Prozesse nicht.
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import io
+import mmap
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterator, List, Optional, Tuple, Union
+
+from .persistence import ColumnBlock, TxtFileHandler, detect_compression, split_line
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+MIN_PARALLEL_SIZE = 4 * 1024 * 1024
+
+
+def chunk_boundaries(filename: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """Zerlegt die Datei in (start, ende)-Bereiche, die an Zeilenumbrüchen enden."""
+    size = os.path.getsize(filename)
+    if size == 0:
+        return []
+
+    boundaries: List[Tuple[int, int]] = []
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = min(start + chunk_size, size)
+            if end < size:
+                newline = mm.find(b"\n", end - 1)
+                end = size if newline == -1 else newline + 1
+            boundaries.append((start, end))
+            start = end
+    return boundaries
+
+
+def parse_chunk(filename: str, start: int, end: int) -> Tuple[ColumnBlock, int]:
+    """Parst einen Byte-Bereich der Datei (läuft im Worker-Prozess).
+
+    Returns:
+        Spaltenblock mit Zeilennummern relativ zum Chunk (ab 1) und die Anzahl
+        Zeilen im Chunk. Zahlen werden schon hier umgerechnet; Werte, die keine
+        Zahl sind, bleiben Text und werden beim Erzeugen der Items gemeldet.
+    """
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode("utf-8")
+
+    names: List[str] = []
+    flags: List[bool] = []
+    amounts: List[Union[float, str]] = []
+    prices: List[Union[float, str]] = []
+    row_numbers: List[int] = []
+    line_number = 0
+    # newline=None: gleiche Zeilenumbruch-Behandlung wie open() im Textmodus
+    for raw in io.StringIO(text, newline=None):
+        line_number += 1
+        fields = split_line(raw)
+        if fields is None:
+            continue
+        is_weighted, name, amount, price = fields
+        flags.append(is_weighted)
+        names.append(name)
+        amounts.append(_to_float(amount))
+        prices.append(_to_float(price))
+        row_numbers.append(line_number)
+    return (names, flags, amounts, prices, row_numbers), line_number
+
+
+def _to_float(value: str) -> Union[float, str]:
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def iter_column_blocks_parallel(
+    filename: str,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[ColumnBlock]:
+    """Liefert die Datei als Spaltenblöcke (ein Block je Chunk) in Dateireihenfolge.
+
+    Die Zeilennummern beziehen sich auf die ganze Datei.
+    """
+    boundaries = chunk_boundaries(filename, chunk_size)
+    if not boundaries:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    pending: Deque[Future] = deque()
+    try:
+        chunks = iter(boundaries)
+        for start, end in chunks:
+            pending.append(executor.submit(parse_chunk, filename, start, end))
+            if len(pending) >= 2 * workers:
+                break
+
+        lines_before = 0
+        while pending:
+            (names, flags, amounts, prices, row_numbers), line_count = pending.popleft().result()
+            next_chunk = next(chunks, None)
+            if next_chunk is not None:
+                pending.append(executor.submit(parse_chunk, filename, *next_chunk))
+            if names:
+                row_numbers = [lines_before + row for row in row_numbers]
+                yield names, flags, amounts, prices, row_numbers
+            lines_before += line_count
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class ParallelTxtFileHandler(TxtFileHandler):
+    """TxtFileHandler mit Fast-Load-Modus für große Dateien.
+
+    Nur das Zerlegen in Spaltenblöcke läuft parallel; `load` (sammelt alle
+    ungültigen Zeilen) und `iter_load` stammen unverändert von TxtFileHandler.
+
+    Args:
+        workers: Anzahl Worker-Prozesse (Standard: Anzahl CPU-Kerne)
+        chunk_size: Zielgröße eines Chunks in Bytes
+        min_parallel_size: Ab dieser Dateigröße wird parallel geladen
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        min_parallel_size: int = MIN_PARALLEL_SIZE,
+    ):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.min_parallel_size = min_parallel_size
+
+    def _iter_columns(self, filename: str) -> Iterator[ColumnBlock]:
+        if not self._use_parallel(filename):
+            return super()._iter_columns(filename)
+        return iter_column_blocks_parallel(filename, self.workers, self.chunk_size)
+
+    def _use_parallel(self, filename: str) -> bool:
+        try:
+            # Komprimierte Dateien lassen sich nicht in Byte-Bereiche zerlegen.
+            return os.path.getsize(filename) >= self.min_parallel_size and detect_compression(filename) is None
+        except OSError:
+            # Fehlerbehandlung übernimmt der sequentielle Pfad.
+            return False
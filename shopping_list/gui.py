@@ -8,28 +8,204 @@ Features:
 - Komma-Support (2,5 -> 2.5)
 - Intelligentes Importieren (Merge bei Duplikaten)
 - Userfreundliche Fehlermeldungen bei ungültigen Zahleneingaben
+- Import/Export im Hintergrund (Fortschrittsanzeige, Abbrechen)
+- Schreibgeschützte Gesamtliste "Alle Listen" (Consolidator)
+- Suche über alle Tabs während der Eingabe (SearchIndex)
+- Diagnose-Menü: Laufzeitmessung (p50/p95) und cProfile auf Abruf
 ------------------------------------------------------------------------------
 """
 
 from __future__ import annotations
 
+import os
+import sqlite3
 import tkinter as tk
 from tkinter import messagebox, filedialog, ttk, simpledialog
-from typing import List
+from typing import Any, Callable, Iterable, List, Optional
 
-from .models import ShoppingItem, WeightedItem
+from . import instrumentation
+from .models import INSERT, REMOVE, RESET, UPDATE, ListEvent, ShoppingItem, ShoppingList, WeightedItem
 from .factories import ItemFactory
-from .persistence import FileHandler
+from .listview import VirtualListView
+from .merge import MergeService
+from .history import History
+from .search import SearchHit, SearchIndex
+from .consolidation import Consolidator
+from .background import BackgroundJob, JobCancelled
+from .persistence import (
+    BINARY_SUFFIX,
+    COMPRESSION_SUFFIXES,
+    SQLITE_SUFFIXES,
+    FileHandler,
+    SqliteFileHandler,
+    TxtFileHandler,
+    handler_for_file,
+    iter_batches,
+)
+from .journal import Workspace
+from .cache import CachingFileHandler
+from .catalog import PriceCatalog
+
+# Items pro Merge-Schritt beim Import
+IMPORT_BATCH_SIZE = 5000
+# Polling-Intervall für Hintergrund-Jobs und maximale Batches pro Tick
+JOB_POLL_INTERVAL_MS = 50
+MAX_RESULTS_PER_POLL = 2
+# Alle wie viele Items beim Export Fortschritt/Abbruch geprüft werden
+PROGRESS_INTERVAL = 1000
+# Suche: Wartezeit nach dem letzten Tastendruck und maximale Trefferzahl im Dropdown
+SEARCH_DELAY_MS = 120
+SEARCH_RESULT_LIMIT = 50
+
+FILE_TYPES = [
+    ("Text Files", "*.txt"),
+    *((f"Text, komprimiert ({compression})", f"*{suffix}") for suffix, compression in COMPRESSION_SUFFIXES.items()),
+    ("Binärlisten", f"*{BINARY_SUFFIX}"),
+    ("SQLite-Datenbank", " ".join(f"*{suffix}" for suffix in SQLITE_SUFFIXES)),
+]
+IMPORT_FILE_TYPES = [("Alle Listen", " ".join(pattern for _label, pattern in FILE_TYPES))] + FILE_TYPES
 
 
 class ShoppingListTab(tk.Frame):
-    """Ein Tab repräsentiert eine einzelne Einkaufsliste."""
-
-    def __init__(self, parent, file_handler: FileHandler):
+    """Ein Tab repräsentiert eine einzelne Einkaufsliste.
+
+    Args:
+        parent: Das Notebook
+        file_handler: Standard-Strategie für Import/Export
+        loader: Liefert die Items beim ersten Anzeigen, z.B. aus Snapshot und Journal.
+            Darf die Tab-Widgets nicht anfassen (läuft ggf. in einem Worker-Thread).
+        on_loaded: Wird nach erfolgreichem Laden mit der gefüllten Liste aufgerufen
+        lazy: Widgets erst bei `ensure_built()` erzeugen (z.B. beim ersten Anzeigen)
+        tab_id: Stabile ID des Tabs in der Sitzung
+        catalog: Preiskatalog für die Vervollständigung im Dialog "Neues Item"
+    """
+
+    def __init__(
+        self,
+        parent,
+        file_handler: FileHandler,
+        loader: Optional[Callable[[], Iterable[ShoppingItem]]] = None,
+        on_loaded: Optional[Callable[[ShoppingList], None]] = None,
+        lazy: bool = False,
+        tab_id: Optional[str] = None,
+        catalog: Optional[PriceCatalog] = None,
+    ):
         super().__init__(parent)
         self.file_handler = file_handler
-        self.items: List[ShoppingItem] = []
+        self.tab_id = tab_id
+        self.catalog = catalog
+        self._loader = loader
+        self._on_loaded = on_loaded
+        self._loaded = loader is None
+        self._load_job: Optional[BackgroundJob] = None
+        # Fehlgeschlagenes Laden im Hintergrund wird nicht automatisch wiederholt.
+        self._background_load_failed = False
+        self._built = False
+        self.items = ShoppingList()
+        self._merger = MergeService(self.items)
+        self.items.subscribe(self._on_list_changed)
+        self.history = History(self.items, on_change=self._update_history_buttons)
+        self._total_label_id: Optional[str] = None
+        self._job: Optional[BackgroundJob] = None
+        self._job_poll_id: Optional[str] = None
+        self._job_callbacks: tuple = (None, None)
+        self._job_locked_buttons: List[tk.Button] = []
+        if not lazy:
+            self.ensure_built()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def is_built(self) -> bool:
+        return self._built
+
+    def ensure_loaded(self) -> None:
+        """Lädt die Items über den Loader (bis es einmal geklappt hat).
+
+        Schlägt das Laden fehl, bleibt der Tab leer, ungeladen und schreibgeschützt;
+        ein späterer Aufruf versucht es erneut.
+        """
+        if self._loaded:
+            return
+        self._apply_loaded(self._loader())  # type: ignore[misc]
+        self._background_load_failed = False
+
+    def start_background_load(self) -> bool:
+        """Lädt die Items in einem Worker-Thread; übernommen werden sie von `poll_background_load`.
+
+        Returns:
+            True, wenn (jetzt) im Hintergrund geladen wird.
+        """
+        if self._loaded or self._background_load_failed:
+            return False
+        if self._load_job is None:
+            loader = self._loader
+            self._load_job = BackgroundJob(lambda _job: list(loader()))  # type: ignore[misc]
+        return True
+
+    def poll_background_load(self) -> bool:
+        """Übernimmt das Ergebnis von `start_background_load`, sobald es da ist.
+
+        Returns:
+            True, solange noch geladen wird.
+        """
+        job = self._load_job
+        if job is None:
+            return False
+        if not job.finished:
+            return True
+        self._load_job = None
+        # Inzwischen synchron geladen (z.B. Tab ausgewählt): Ergebnis verwerfen.
+        if not self._loaded:
+            try:
+                self._apply_loaded(job.result())
+            except Exception as e:
+                self._background_load_failed = True
+                print(f"Fehler beim Laden: {e}")
+        return False
+
+    def _apply_loaded(self, loaded: Iterable[ShoppingItem]) -> None:
+        self.items.extend(loaded)
+        self._loaded = True
+        if self._on_loaded is not None:
+            self._on_loaded(self.items)
+        # Das Laden selbst ist kein rückgängig machbarer Schritt.
+        self.history.clear()
+        self._update_load_state()
+
+    def ensure_built(self) -> None:
+        """Erzeugt die Widgets und lädt die Daten, falls noch nicht geschehen."""
+        if self._built:
+            return
+        self._built = True
         self._setup_layout()
+        self._try_load()
+        self._refresh_list()
+        self._update_load_state()
+
+    def _try_load(self) -> None:
+        try:
+            self.ensure_loaded()
+        except Exception as e:
+            messagebox.showerror("Fehler", f"Liste konnte nicht geladen werden: {e}")
+
+    def _retry_load(self) -> None:
+        self._try_load()
+        self._refresh_list()
+
+    def _update_load_state(self) -> None:
+        """Ein nicht geladener Tab ist schreibgeschützt und bietet "Erneut laden" an."""
+        if not self._built:
+            return
+        state = tk.NORMAL if self._loaded else tk.DISABLED
+        for button in self._edit_buttons + self._io_buttons:
+            button.config(state=state)
+        if self._loaded:
+            self._btn_retry.pack_forget()
+        else:
+            self._btn_retry.pack(pady=5)
 
     def _setup_layout(self) -> None:
         """Erstellt das Grid-Layout: Links Buttons, Rechts Liste."""
@@ -39,28 +215,33 @@ class ShoppingListTab(tk.Frame):
         control_frame = tk.Frame(self, padx=10, pady=10, bg="#f0f0f0")
         control_frame.grid(row=0, column=0, sticky="ns")
 
-        tk.Button(control_frame, text="Item hinzufügen", command=self._show_add_popup, width=15).pack(pady=5)
-        tk.Button(control_frame, text="Item entfernen", command=self._remove_selected_item, width=15).pack(pady=5)
+        btn_add = tk.Button(control_frame, text="Item hinzufügen", command=self._show_add_popup, width=15)
+        btn_add.pack(pady=5)
+        btn_remove = tk.Button(control_frame, text="Item entfernen", command=self._remove_selected_item, width=15)
+        btn_remove.pack(pady=5)
+        self._btn_undo = tk.Button(control_frame, text="Rückgängig", command=self.undo, width=15)
+        self._btn_undo.pack(pady=5)
+        self._btn_redo = tk.Button(control_frame, text="Wiederholen", command=self.redo, width=15)
+        self._btn_redo.pack(pady=5)
 
         tk.Frame(control_frame, height=20, bg="#f0f0f0").pack()
 
-        tk.Button(control_frame, text="Exportieren", command=self._export_list, width=15).pack(pady=5)
-        tk.Button(control_frame, text="Importieren", command=self._import_list, width=15).pack(pady=5)
+        btn_export = tk.Button(control_frame, text="Exportieren", command=self._export_list, width=15)
+        btn_export.pack(pady=5)
+        btn_import = tk.Button(control_frame, text="Importieren", command=self._import_list, width=15)
+        btn_import.pack(pady=5)
+
+        self._edit_buttons = [btn_add, btn_remove]
+        self._io_buttons = [btn_export, btn_import]
+        self._btn_retry = tk.Button(control_frame, text="Erneut laden", command=self._retry_load, width=15)
 
         right_column = tk.Frame(self, padx=10, pady=10)
         right_column.grid(row=0, column=1, sticky="nsew")
         right_column.rowconfigure(0, weight=1)
         right_column.columnconfigure(0, weight=1)
 
-        list_frame = tk.Frame(right_column)
-        list_frame.grid(row=0, column=0, sticky="nsew")
-
-        scrollbar = tk.Scrollbar(list_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        self.listbox = tk.Listbox(list_frame, font=("Courier", 10), yscrollcommand=scrollbar.set)
-        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.config(command=self.listbox.yview)
+        self.list_view = VirtualListView(right_column, self.items, self._format_row, font=("Courier", 10))
+        self.list_view.grid(row=0, column=0, sticky="nsew")
 
         ttk.Separator(right_column, orient="horizontal").grid(row=1, column=0, sticky="ew", pady=(10, 5))
 
@@ -72,17 +253,63 @@ class ShoppingListTab(tk.Frame):
         )
         self.lbl_total_price.pack(anchor="e")
 
+        # Fortschrittsanzeige für Hintergrund-Jobs (nur sichtbar, solange einer läuft)
+        self._status_frame = tk.Frame(right_column, pady=5)
+        self._status_frame.grid(row=3, column=0, sticky="ew")
+        self._progress = ttk.Progressbar(self._status_frame, mode="determinate", maximum=1.0)
+        self._progress.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self._lbl_status = tk.Label(self._status_frame, text="")
+        self._lbl_status.pack(side=tk.LEFT, padx=5)
+        tk.Button(self._status_frame, text="Abbrechen", command=self._cancel_job).pack(side=tk.RIGHT)
+        self._status_frame.grid_remove()
+        self._update_history_buttons()
+
+    @staticmethod
+    def _format_row(item: ShoppingItem) -> str:
+        price = item.calculate_total()
+        return f"{item.name.ljust(20)} | {item.get_details().ljust(25)} | {price:>6.2f}€"
+
+    @instrumentation.timed("ShoppingListTab._refresh_list")
     def _refresh_list(self) -> None:
-        self.listbox.delete(0, tk.END)
-        total_sum = 0.0
+        """Vollständige Neusynchronisation der Anzeige (Zeilen-Cache und Gesamtpreis)."""
+        self.list_view.reset(self.items)
+        self._update_total_label()
+
+    def _on_list_changed(self, event: ListEvent) -> None:
+        """Überträgt jede Änderung der Liste gezielt in die Anzeige."""
+        if not self._built:
+            return
+        if event.kind == INSERT:
+            self.list_view.inserted(event.index, len(event.items))
+        elif event.kind == REMOVE:
+            self.list_view.removed(event.index, event.items)
+        elif event.kind == UPDATE:
+            for item in event.items:
+                self.list_view.changed(item)
+        elif event.kind == RESET:
+            self.list_view.reset(self.items)
+        # Label nur einmal pro Durchlauf der Eventschleife aktualisieren.
+        if self._total_label_id is None:
+            self._total_label_id = self.after_idle(self._update_total_label)
+
+    def _update_total_label(self) -> None:
+        if self._total_label_id is not None:
+            self.after_cancel(self._total_label_id)
+            self._total_label_id = None
+        self.lbl_total_price.config(text=f"Gesamtpreis: {self.items.total():.2f} €")
+
+    def _update_history_buttons(self) -> None:
+        if not self._built:
+            return
+        self._btn_undo.config(state=tk.NORMAL if self.history.can_undo else tk.DISABLED)
+        self._btn_redo.config(state=tk.NORMAL if self.history.can_redo else tk.DISABLED)
 
-        for item in self.items:
-            price = item.calculate_total()
-            total_sum += price
-            display_text = f"{item.name.ljust(20)} | {item.get_details().ljust(25)} | {price:>6.2f}€"
-            self.listbox.insert(tk.END, display_text)
+    def undo(self) -> None:
+        """Macht die letzte Aktion rückgängig (die Anzeige folgt den Events)."""
+        self.history.undo()
 
-        self.lbl_total_price.config(text=f"Gesamtpreis: {total_sum:.2f} €")
+    def redo(self) -> None:
+        self.history.redo()
 
     def _show_add_popup(self) -> None:
         popup = tk.Toplevel(self)
@@ -95,7 +322,8 @@ class ShoppingListTab(tk.Frame):
         var_price = tk.StringVar()
 
         tk.Label(popup, text="Name:").pack(pady=2)
-        tk.Entry(popup, textvariable=var_name).pack()
+        name_box = ttk.Combobox(popup, textvariable=var_name)
+        name_box.pack()
 
         def update_label() -> None:
             if var_is_weighted.get():
@@ -115,6 +343,28 @@ class ShoppingListTab(tk.Frame):
         lbl_price.pack(pady=2)
         tk.Entry(popup, textvariable=var_price).pack()
 
+        # Vorschläge aus dem Preiskatalog; Typ und letzter Preis werden vorbelegt,
+        # solange der Preis nicht von Hand geändert wurde.
+        prefilled_price = [""]
+
+        def update_suggestions(_event=None) -> None:
+            if self.catalog is not None:
+                name_box["values"] = [entry.name for entry in self.catalog.complete(var_name.get())]
+
+        def prefill(_event=None) -> None:
+            entry = self.catalog.lookup(var_name.get()) if self.catalog is not None else None
+            if entry is None or var_price.get().strip() not in ("", prefilled_price[0]):
+                return
+            var_is_weighted.set(entry.is_weighted)
+            update_label()
+            prefilled_price[0] = f"{entry.price:.2f}".replace(".", ",")
+            var_price.set(prefilled_price[0])
+
+        name_box.bind("<KeyRelease>", update_suggestions)
+        name_box.bind("<<ComboboxSelected>>", prefill)
+        name_box.bind("<FocusOut>", prefill)
+        name_box.focus_set()
+
         # Userfreundliche Fehlermeldungen für Zahleneingaben
         def submit() -> None:
             name = var_name.get().strip()
@@ -168,89 +418,383 @@ class ShoppingListTab(tk.Frame):
 
             # Item erstellen und hinzufügen
             new_item = ItemFactory.create_item(name, var_is_weighted.get(), amount, price)
-            self._merge_and_add_items([new_item])
-
-            self._refresh_list()
+            if self.catalog is not None:
+                self.catalog.record([new_item])
+            with self.history.transaction(f"Hinzufügen: {name}"):
+                self._merge_and_add_items([new_item])
             popup.destroy()
 
         tk.Button(popup, text="Hinzufügen", command=submit).pack(pady=15)
 
     def _remove_selected_item(self) -> None:
-        selection = self.listbox.curselection()
-        if not selection:
+        index = self.list_view.selected_index()
+        if index is None:
             return
-        index = selection[0]
-        del self.items[index]
-        self._refresh_list()
+        with self.history.transaction(f"Entfernen: {self.items[index].name}"):
+            self._merger.remove(index)
 
     def _export_list(self) -> None:
-        filename = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text Files", "*.txt")])
+        if self._job_running():
+            return
+        filename = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=FILE_TYPES)
         if not filename:
             return
         try:
-            self.file_handler.save(self.items, filename)
-            messagebox.showinfo("Erfolg", "Exportiert.")
+            handler = self._handler_for(filename, for_import=False)
         except Exception as e:
             messagebox.showerror("Fehler", str(e))
+            return
+        if handler is None:
+            return
+
+        items = self.items
+        total = len(items)
+        # Dateien werden erst vollständig neben dem Ziel geschrieben und dann ersetzt, damit ein
+        # Abbruch die vorhandene Datei nicht zerstört. SQLite schreibt in einer Transaktion.
+        target = filename if isinstance(handler, SqliteFileHandler) else filename + ".tmp"
+
+        def work(job: BackgroundJob) -> None:
+            def tracked_items():
+                for index, item in enumerate(items):
+                    if index % PROGRESS_INTERVAL == 0:
+                        job.check_cancelled()
+                        job.set_progress(index / total)
+                    yield item
+
+            handler.save_stream(tracked_items(), target)
+            if target != filename:
+                os.replace(target, filename)
+
+        def finished(error: Optional[BaseException]) -> None:
+            if error is not None and target != filename and os.path.exists(target):
+                try:
+                    os.remove(target)
+                except OSError as e:
+                    print(f"Fehler beim Aufräumen: {e}")
+            if error is None:
+                messagebox.showinfo("Erfolg", "Exportiert.")
+            elif isinstance(error, JobCancelled):
+                messagebox.showinfo("Abgebrochen", "Export abgebrochen.")
+            else:
+                messagebox.showerror("Fehler", str(error))
+
+        # Während des Exports darf die Liste nicht verändert werden.
+        self._start_job(BackgroundJob(work), "Export", None, finished, lock_editing=True)
 
     def _import_list(self) -> None:
-        filename = filedialog.askopenfilename(filetypes=[("Text Files", "*.txt")])
+        if self._job_running():
+            return
+        filename = filedialog.askopenfilename(filetypes=IMPORT_FILE_TYPES)
         if not filename:
             return
         try:
-            loaded_items = self.file_handler.load(filename)
-            self._merge_and_add_items(loaded_items)
-            self._refresh_list()
-            messagebox.showinfo("Erfolg", f"{len(loaded_items)} Items verarbeitet.")
+            handler = self._handler_for(filename, for_import=True)
         except Exception as e:
             messagebox.showerror("Fehler", f"Import fehlgeschlagen: {e}")
+            return
+        if handler is None:
+            return
+
+        catalog = self.catalog
+
+        def work(job: BackgroundJob) -> None:
+            # Die Datei wird gestreamt: nie mehr als ein paar Batches gleichzeitig im Speicher.
+            for batch in iter_batches(handler.iter_load(filename), IMPORT_BATCH_SIZE):
+                job.check_cancelled()
+                if catalog is not None:
+                    catalog.record(batch)
+                job.emit(batch)
+
+        processed = 0
+
+        def merge_batch(batch: List[ShoppingItem]) -> None:
+            nonlocal processed
+            self._merge_and_add_items(batch)
+            processed += len(batch)
+            self._lbl_status.config(text=f"{processed} Items")
 
+        def finished(error: Optional[BaseException]) -> None:
+            try:
+                self._refresh_list()
+            finally:
+                self.history.commit()
+            if error is None:
+                messagebox.showinfo("Erfolg", f"{processed} Items verarbeitet.")
+            elif isinstance(error, JobCancelled):
+                messagebox.showinfo("Abgebrochen", f"Import abgebrochen, {processed} Items übernommen.")
+            else:
+                messagebox.showerror("Fehler", f"Import fehlgeschlagen nach {processed} Items: {error}")
+
+        # Der ganze Import (auch ein abgebrochener) ist ein einziger Rückgängig-Schritt. Bearbeiten
+        # ist währenddessen gesperrt, sonst landeten eigene Änderungen mit in diesem Schritt.
+        self.history.begin(f"Import: {os.path.basename(filename)}")
+        self._start_job(BackgroundJob(work), "Import", merge_batch, finished, lock_editing=True)
+
+    # ------------------------------------------------------------------
+    # Hintergrund-Jobs
+    # ------------------------------------------------------------------
+    def _job_running(self) -> bool:
+        if self._job is None:
+            return False
+        messagebox.showwarning("Bitte warten", "Für diese Liste läuft bereits ein Import oder Export.")
+        return True
+
+    def _start_job(
+        self,
+        job: BackgroundJob,
+        label: str,
+        on_result: Optional[Callable[[Any], None]],
+        on_finished: Callable[[Optional[BaseException]], None],
+        lock_editing: bool,
+    ) -> None:
+        self._job = job
+        self._job_callbacks = (on_result, on_finished)
+
+        buttons = self._io_buttons + (self._edit_buttons if lock_editing else [])
+        for button in buttons:
+            button.config(state=tk.DISABLED)
+        self._job_locked_buttons = buttons
+
+        self._lbl_status.config(text=label)
+        self._progress.config(value=0)
+        self._status_frame.grid()
+        self._job_poll_id = self.after(JOB_POLL_INTERVAL_MS, self._poll_job)
+
+    def _poll_job(self) -> None:
+        job = self._job
+        if job is None:
+            return
+        on_result, on_finished = self._job_callbacks
+
+        try:
+            for result in job.drain(MAX_RESULTS_PER_POLL):
+                if on_result is not None:
+                    on_result(result)
+        except Exception as e:
+            # Fehler beim Übernehmen eines Ergebnisses: Job abbrechen und wie einen Worker-Fehler melden.
+            job.cancel()
+            self._finish_job(on_finished, e)
+            return
+
+        if job.progress is None:
+            self._progress.config(mode="indeterminate")
+            self._progress.step(0.05)
+        else:
+            self._progress.config(mode="determinate", value=job.progress)
+
+        if not job.finished:
+            self._job_poll_id = self.after(JOB_POLL_INTERVAL_MS, self._poll_job)
+            return
+
+        try:
+            job.result()
+        except BaseException as e:  # Fehler des Workers im Hauptthread melden
+            self._finish_job(on_finished, e)
+        else:
+            self._finish_job(on_finished, None)
+
+    def _finish_job(
+        self, on_finished: Callable[[Optional[BaseException]], None], error: Optional[BaseException]
+    ) -> None:
+        self._job = None
+        self._job_poll_id = None
+        for button in self._job_locked_buttons:
+            button.config(state=tk.NORMAL)
+        self._status_frame.grid_remove()
+        on_finished(error)
+
+    def _cancel_job(self) -> None:
+        if self._job is not None:
+            self._job.cancel()
+            self._lbl_status.config(text="Wird abgebrochen …")
+
+    def destroy(self) -> None:
+        if self._job is not None:
+            self._job.cancel()
+        if self._job_poll_id is not None:
+            self.after_cancel(self._job_poll_id)
+        if self._total_label_id is not None:
+            self.after_cancel(self._total_label_id)
+        self._merger.close()
+        self.history.close()
+        super().destroy()
+
+    def _list_name(self) -> str:
+        """Name des Tabs im Notebook."""
+        return self.master.tab(self, "text")
+
+    def _handler_for(self, filename: str, for_import: bool) -> Optional[FileHandler]:
+        """Strategie passend zur Datei; bei SQLite an die Liste dieses Tabs gebunden.
+
+        Textdateien werden beim Import über den ParsedFileCache gelesen.
+        """
+        handler = handler_for_file(filename, self.file_handler)
+        if for_import and isinstance(handler, TxtFileHandler):
+            return CachingFileHandler(handler)
+        if not isinstance(handler, SqliteFileHandler):
+            return handler
+
+        list_name = self._list_name()
+        if for_import:
+            names = handler.list_names(filename)
+            if list_name not in names:
+                if len(names) == 1:
+                    list_name = names[0]
+                else:
+                    list_name = simpledialog.askstring(
+                        "Liste wählen",
+                        "Welche Liste soll importiert werden?\n" + ", ".join(names[:20]),
+                        parent=self,
+                    )
+                    if not list_name:
+                        return None
+        return handler.with_list(list_name)
+
+    @instrumentation.timed("ShoppingListTab._merge_and_add_items")
     def _merge_and_add_items(self, new_items: List[ShoppingItem]) -> None:
-        for new_item in new_items:
-            merged = False
-
-            for existing_item in self.items:
-                is_same_name = existing_item.name == new_item.name
-                is_same_price = abs(existing_item.price_per_unit - new_item.price_per_unit) < 0.001
-                is_same_type = type(existing_item) == type(new_item)
-
-                if is_same_name and is_same_price and is_same_type:
-                    if isinstance(new_item, WeightedItem):
-                        amount_to_add = new_item.weight
-                    else:
-                        amount_to_add = new_item.quantity  # type: ignore[attr-defined]
-                    existing_item.add_amount(amount_to_add)
-                    merged = True
-                    break
-
-            if not merged:
-                self._handle_name_collision(new_item)
-                self.items.append(new_item)
+        result = self._merger.merge(new_items)
+        instrumentation.count("merge.updated", len(result.updated))
+        instrumentation.count("merge.appended", len(self.items) - result.first_new_index)
 
     def _handle_name_collision(self, new_item: ShoppingItem) -> None:
-        existing_names = [i.name for i in self.items]
-        if new_item.name not in existing_names:
-            return
+        self._merger.resolve_name_collision(new_item)
 
-        base_name = new_item.name
-        counter = 2
-        new_name = f"{base_name} #{counter}"
 
-        while new_name in existing_names:
-            counter += 1
-            new_name = f"{base_name} #{counter}"
+class DiagnosticsWindow(tk.Toplevel):
+    """Zeigt die Messwerte aus `instrumentation` als Tabelle (Aktualisieren per Button)."""
 
-        new_item.name = new_name
+    COLUMNS = (
+        ("calls", "Aufrufe"),
+        ("total_ms", "Gesamt ms"),
+        ("p50_ms", "p50 ms"),
+        ("p95_ms", "p95 ms"),
+        ("max_ms", "max ms"),
+    )
 
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Diagnose")
+        self.geometry("650x350")
+
+        self.tree = ttk.Treeview(self, columns=[key for key, _label in self.COLUMNS])
+        self.tree.heading("#0", text="Messpunkt")
+        self.tree.column("#0", width=260)
+        for key, label in self.COLUMNS:
+            self.tree.heading(key, text=label)
+            self.tree.column(key, width=70, anchor="e")
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        bottom = tk.Frame(self)
+        bottom.pack(fill=tk.X, padx=5, pady=(0, 5))
+        self.lbl_state = tk.Label(bottom)
+        self.lbl_state.pack(side=tk.LEFT)
+        tk.Button(bottom, text="Aktualisieren", command=self.refresh).pack(side=tk.RIGHT)
+        self.refresh()
+
+    def refresh(self) -> None:
+        data = instrumentation.snapshot()
+        self.tree.delete(*self.tree.get_children())
+        for name, values in data["timings"].items():
+            row = [values["calls"]] + [f"{values[key]:.2f}" for key, _label in self.COLUMNS[1:]]
+            self.tree.insert("", tk.END, text=name, values=row)
+        for name, value in data["counters"].items():
+            self.tree.insert("", tk.END, text=f"Zähler: {name}", values=[value])
+        state = "aktiv" if data["enabled"] else f"aus (Menü oder {instrumentation.ENV_VAR}=1)"
+        self.lbl_state.config(text=f"Messung {state}")
+
+
+class ConsolidatedTab(tk.Frame):
+    """Schreibgeschützte Gesamtliste aller Tabs (zusammengefasst wie beim Import).
+
+    Args:
+        parent: Das Notebook
+        consolidator: Liefert die Zeilen und meldet Änderungen
+        tab_title: Anzeigename einer Quelle (für die Aufschlüsselung)
+    """
+
+    def __init__(self, parent, consolidator: Consolidator, tab_title: Callable[[Any], str]):
+        super().__init__(parent, padx=10, pady=10)
+        self.consolidator = consolidator
+        self._tab_title = tab_title
+        self._total_label_id: Optional[str] = None
+
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        self.list_view = VirtualListView(self, consolidator, ShoppingListTab._format_row, font=("Courier", 10))
+        self.list_view.grid(row=0, column=0, sticky="nsew")
+
+        bottom = tk.Frame(self, bg="#e0e0e0", padx=5, pady=5)
+        bottom.grid(row=1, column=0, sticky="ew", pady=(10, 0))
+        tk.Button(bottom, text="Aufschlüsselung", command=self._show_breakdown).pack(side=tk.LEFT)
+        self.lbl_total_price = tk.Label(bottom, font=("Arial", 12, "bold"), bg="#e0e0e0")
+        self.lbl_total_price.pack(side=tk.RIGHT)
+
+        self._unsubscribe = consolidator.subscribe(self._on_changed)
+        self.list_view.reset()
+        self._update_total_label()
+
+    def _on_changed(self, event: ListEvent) -> None:
+        if event.kind == INSERT:
+            self.list_view.inserted(event.index, len(event.items))
+        elif event.kind == REMOVE:
+            self.list_view.deleted(event.index, event.items[0])
+        elif event.kind == UPDATE:
+            self.list_view.changed(event.items[0])
+        if self._total_label_id is None:
+            self._total_label_id = self.after_idle(self._update_total_label)
+
+    def _update_total_label(self) -> None:
+        if self._total_label_id is not None:
+            self.after_cancel(self._total_label_id)
+            self._total_label_id = None
+        self.lbl_total_price.config(text=f"Gesamtpreis: {self.consolidator.total():.2f} €")
+
+    def _show_breakdown(self) -> None:
+        index = self.list_view.selected_index()
+        if index is None or index >= len(self.consolidator):
+            messagebox.showinfo("Aufschlüsselung", "Bitte zuerst eine Zeile auswählen.")
+            return
+        row = self.consolidator.row(index)
+        weighted = isinstance(row.item, WeightedItem)
+        lines = [
+            f"{self._tab_title(source)}: " + (f"{amount:.3f} kg" if weighted else f"{int(amount)} Stk.")
+            for source, amount in row.breakdown()
+        ]
+        messagebox.showinfo(f"Aufschlüsselung – {row.item.name}", "\n".join(lines), parent=self)
+
+    def destroy(self) -> None:
+        if self._total_label_id is not None:
+            self.after_cancel(self._total_label_id)
+        self._unsubscribe()
+        self.consolidator.close()
+        super().destroy()
 
-class ShoppingListApp:
-    """Haupt-Controller: Fenster + Notebook."""
 
-    def __init__(self, root: tk.Tk, file_handler: FileHandler):
+class ShoppingListApp:
+    """Haupt-Controller: Fenster + Notebook.
+
+    Args:
+        root: Tk-Hauptfenster
+        file_handler: Standard-Strategie für Import/Export
+        session_path: Sitzungsdatei; wenn gesetzt, werden die Tabs beim Start
+            wiederhergestellt (Daten erst beim ersten Anzeigen geladen) und jede
+            Änderung sofort ins Journal geschrieben (siehe journal.py).
+        catalog: Preiskatalog; lernt aus eingegebenen und importierten Items (Standard: nur im Speicher)
+    """
+
+    def __init__(
+        self,
+        root: tk.Tk,
+        file_handler: FileHandler,
+        session_path: Optional[str] = None,
+        catalog: Optional[PriceCatalog] = None,
+    ):
         self.root = root
         self.root.title("Smarte Einkaufsliste (Multi-Tab)")
         self.root.geometry("700x600")
         self.file_handler = file_handler
+        self.workspace = Workspace(session_path) if session_path else None
+        self.catalog = catalog if catalog is not None else PriceCatalog()
 
         top_bar = tk.Frame(self.root, bg="#e8e8e8", padx=5, pady=5, relief=tk.RAISED, bd=1)
         top_bar.pack(side=tk.TOP, fill=tk.X)
@@ -266,11 +810,38 @@ class ShoppingListApp:
             side=tk.LEFT, padx=5
         )
 
+        self.search_index = SearchIndex()
+        self._search_hits: List[SearchHit] = []
+        self._search_after_id: Optional[str] = None
+        self._search_var = tk.StringVar()
+        self._search_var.trace_add("write", lambda *_args: self._schedule_search())
+        self._search_entry = tk.Entry(top_bar, textvariable=self._search_var, width=25)
+        self._search_entry.pack(side=tk.RIGHT, padx=5)
+        self._search_entry.bind("<Down>", lambda _e: self._focus_search_results())
+        self._search_entry.bind("<Return>", lambda _e: self._open_search_hit(0))
+        self._search_entry.bind("<Escape>", lambda _e: self._hide_search_results())
+        tk.Label(top_bar, text="Suche:", bg="#e8e8e8").pack(side=tk.RIGHT)
+        # Dropdown mit den Treffern, wird über dem Notebook eingeblendet
+        self._search_results = tk.Listbox(self.root, height=10, font=("Courier", 9), exportselection=False)
+        self._search_results.bind("<Return>", lambda _e: self._open_search_hit(self._selected_search_hit()))
+        self._search_results.bind("<Double-Button-1>", lambda _e: self._open_search_hit(self._selected_search_hit()))
+        self._search_results.bind("<Escape>", lambda _e: self._hide_search_results())
+
+        self._consolidated: Optional[ConsolidatedTab] = None
+        # Laden noch nicht geladener Tabs im Hintergrund (Suche, Gesamtliste)
+        self._load_poll_id: Optional[str] = None
+        self._load_callbacks: List[Callable[[], None]] = []
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Tabs bauen ihre Widgets erst, wenn sie zum ersten Mal ausgewählt werden.
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
         self._create_menu()
-        self.add_new_tab("Meine Liste")
+        if not self._restore_session():
+            self.add_new_tab("Meine Liste")
+        if self.workspace is not None:
+            self.workspace.start_compactor()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _create_menu(self) -> None:
         menubar = tk.Menu(self.root)
@@ -279,37 +850,339 @@ class ShoppingListApp:
         list_menu.add_command(label="Aktuellen Tab umbenennen", command=self.rename_current_tab)
         list_menu.add_separator()
         list_menu.add_command(label="Aktuellen Tab schließen", command=self.close_current_tab)
+        list_menu.add_separator()
+        self._consolidated_var = tk.BooleanVar(value=False)
+        list_menu.add_checkbutton(
+            label="Alle Listen anzeigen", variable=self._consolidated_var, command=self._toggle_consolidated_view
+        )
         menubar.add_cascade(label="Optionen", menu=list_menu)
+
+        edit_menu = tk.Menu(menubar, tearoff=0)
+        edit_menu.add_command(label="Rückgängig", accelerator="Strg+Z", command=self.undo)
+        edit_menu.add_command(label="Wiederholen", accelerator="Strg+Y", command=self.redo)
+        menubar.add_cascade(label="Bearbeiten", menu=edit_menu)
+        self.root.bind_all("<Control-z>", lambda _e: self._on_history_key(self.undo))
+        self.root.bind_all("<Control-y>", lambda _e: self._on_history_key(self.redo))
+
+        self._measure_var = tk.BooleanVar(value=instrumentation.is_enabled())
+        self._profile_var = tk.BooleanVar(value=instrumentation.profiling_active())
+        diag_menu = tk.Menu(menubar, tearoff=0)
+        diag_menu.add_checkbutton(label="Laufzeiten messen", variable=self._measure_var, command=self._toggle_measuring)
+        diag_menu.add_command(label="Messwerte anzeigen…", command=self._show_diagnostics)
+        diag_menu.add_command(label="Messwerte als JSON speichern…", command=self._dump_diagnostics)
+        diag_menu.add_command(label="Messwerte zurücksetzen", command=instrumentation.reset)
+        diag_menu.add_separator()
+        diag_menu.add_checkbutton(label="cProfile aufzeichnen", variable=self._profile_var, command=self._toggle_profiling)
+        menubar.add_cascade(label="Diagnose", menu=diag_menu)
         self.root.config(menu=menubar)
 
+    # ------------------------------------------------------------------
+    # Diagnose
+    # ------------------------------------------------------------------
+    def _toggle_measuring(self) -> None:
+        if self._measure_var.get():
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+
+    def _show_diagnostics(self) -> None:
+        DiagnosticsWindow(self.root)
+
+    def _dump_diagnostics(self) -> None:
+        filename = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if not filename:
+            return
+        try:
+            instrumentation.dump(filename)
+        except Exception as e:
+            messagebox.showerror("Fehler", str(e))
+
+    def _toggle_profiling(self) -> None:
+        if self._profile_var.get():
+            instrumentation.start_profiling()
+            return
+        filename = filedialog.asksaveasfilename(
+            title="Profil speichern", defaultextension=".prof", filetypes=[("cProfile", "*.prof")]
+        )
+        try:
+            instrumentation.stop_profiling(filename or None)
+        except Exception as e:
+            messagebox.showerror("Fehler", str(e))
+
+    # ------------------------------------------------------------------
+    # Rückgängig / Wiederholen
+    # ------------------------------------------------------------------
+    def undo(self) -> None:
+        tab = self.current_tab()
+        if tab is not None:
+            tab.undo()
+
+    def redo(self) -> None:
+        tab = self.current_tab()
+        if tab is not None:
+            tab.redo()
+
+    def _on_history_key(self, action: Callable[[], None]) -> Optional[str]:
+        # In Eingabefeldern (Suche, Popup) nicht die Liste ändern.
+        if isinstance(self.root.focus_get(), tk.Entry):
+            return None
+        action()
+        return "break"
+
+    def tabs(self) -> List[ShoppingListTab]:
+        """Alle Listen-Tabs in Notebook-Reihenfolge (ohne "Alle Listen")."""
+        widgets = [self.root.nametowidget(tab_id) for tab_id in self.notebook.tabs()]
+        return [widget for widget in widgets if isinstance(widget, ShoppingListTab)]
+
+    def current_tab(self) -> Optional[ShoppingListTab]:
+        """Der ausgewählte Listen-Tab; None, wenn keiner oder "Alle Listen" ausgewählt ist."""
+        selected_tab_id = self.notebook.select()
+        if not selected_tab_id:
+            return None
+        widget = self.root.nametowidget(selected_tab_id)
+        return widget if isinstance(widget, ShoppingListTab) else None
+
+    def _on_tab_changed(self, _event=None) -> None:
+        tab = self.current_tab()
+        if tab is not None:
+            if self.workspace is not None:
+                self.workspace.select_tab(tab.tab_id)
+            tab.ensure_built()
+
     def ask_new_tab(self) -> None:
         name = simpledialog.askstring("Neue Liste", "Name der Liste:")
         if name:
             self.add_new_tab(name)
 
-    def add_new_tab(self, name: str) -> None:
-        new_tab = ShoppingListTab(self.notebook, self.file_handler)
+    def add_new_tab(
+        self,
+        name: str,
+        select: bool = True,
+        tab_id: Optional[str] = None,
+    ) -> ShoppingListTab:
+        """Fügt einen Tab hinzu. Mit `tab_id` wird ein Tab der Sitzung wiederhergestellt
+        (Daten erst beim ersten Anzeigen), sonst entsteht eine neue, leere Liste."""
+        workspace = self.workspace
+        loader = on_loaded = None
+        if workspace is not None:
+            if tab_id is None:
+                tab_id = workspace.create_tab(name).tab_id
+            else:
+                restored_id = tab_id
+                loader = lambda: workspace.read_tab(restored_id)  # noqa: E731
+                on_loaded = lambda items: workspace.track(restored_id, items)  # noqa: E731
+        new_tab = ShoppingListTab(
+            self.notebook, self.file_handler, loader, on_loaded, lazy=True, tab_id=tab_id, catalog=self.catalog
+        )
+        if workspace is not None and loader is None:
+            workspace.track(tab_id, new_tab.items)  # type: ignore[arg-type]
         self.notebook.add(new_tab, text=name)
-        self.notebook.select(new_tab)
+        self.search_index.attach(new_tab, new_tab.items)
+        if self._consolidated is not None:
+            self._consolidated.consolidator.attach(new_tab, new_tab.items)
+        if select:
+            self.notebook.select(new_tab)
+            new_tab.ensure_built()
+        return new_tab
 
     def close_current_tab(self) -> None:
-        if self.notebook.index("end") <= 1:
+        if self.current_tab() is None:
+            return
+        if len(self.tabs()) <= 1:
             if not messagebox.askyesno(
                 "Warnung",
                 "Das ist die letzte Liste. Wirklich schließen?\n(Das Programm bleibt dann leer)."
             ):
                 return
 
-        selected_tab_id = self.notebook.select()
-        if selected_tab_id:
-            self.notebook.forget(selected_tab_id)
+        tab = self.current_tab()
+        if tab is not None:
+            self.search_index.detach(tab, tab.items)
+            if self._consolidated is not None:
+                self._consolidated.consolidator.detach(tab)
+            if self.workspace is not None:
+                self.workspace.close_tab(tab.tab_id)
+            self.notebook.forget(tab)
+            tab.destroy()
 
     def rename_current_tab(self) -> None:
-        selected_tab_id = self.notebook.select()
-        if not selected_tab_id:
+        if self.current_tab() is None:
             return
+        selected_tab_id = self.notebook.select()
 
         current_name = self.notebook.tab(selected_tab_id, "text")
         new_name = simpledialog.askstring("Umbenennen", "Neuer Name:", initialvalue=current_name)
         if new_name:
             self.notebook.tab(selected_tab_id, text=new_name)
+            if self.workspace is not None:
+                self.workspace.rename_tab(self.current_tab().tab_id, new_name)
+
+    # ------------------------------------------------------------------
+    # Gesamtliste
+    # ------------------------------------------------------------------
+    def _toggle_consolidated_view(self) -> None:
+        if self._consolidated_var.get():
+            self.show_consolidated_view()
+        else:
+            self.hide_consolidated_view()
+
+    def show_consolidated_view(self) -> None:
+        """Blendet den Tab "Alle Listen" ein (noch nicht geladene Tabs kommen im Hintergrund dazu)."""
+        if self._consolidated is None:
+            consolidator = Consolidator()
+            for tab in self.tabs():
+                consolidator.attach(tab, tab.items)
+            self._consolidated = ConsolidatedTab(self.notebook, consolidator, self._tab_title)
+            self.notebook.insert(0, self._consolidated, text="Alle Listen")
+            # Die Gesamtliste folgt den Events der Tabs, sobald deren Items da sind.
+            self._load_tabs_in_background()
+        self._consolidated_var.set(True)
+        self.notebook.select(self._consolidated)
+
+    def hide_consolidated_view(self) -> None:
+        if self._consolidated is not None:
+            self.notebook.forget(self._consolidated)
+            self._consolidated.destroy()
+            self._consolidated = None
+        self._consolidated_var.set(False)
+
+    def _load_tabs_in_background(self, on_done: Optional[Callable[[], None]] = None) -> bool:
+        """Startet das Laden aller noch nicht geladenen Tabs in Worker-Threads.
+
+        Args:
+            on_done: Wird aufgerufen, sobald alle Tabs fertig geladen sind.
+
+        Returns:
+            True, wenn noch Tabs geladen werden (sonst wird `on_done` nicht aufgerufen).
+        """
+        loading = [tab for tab in self.tabs() if tab.start_background_load()]
+        if not loading:
+            return False
+        if on_done is not None and on_done not in self._load_callbacks:
+            self._load_callbacks.append(on_done)
+        if self._load_poll_id is None:
+            self._load_poll_id = self.root.after(JOB_POLL_INTERVAL_MS, self._poll_background_loads)
+        return True
+
+    def _poll_background_loads(self) -> None:
+        self._load_poll_id = None
+        busy = False
+        for tab in self.tabs():
+            busy = tab.poll_background_load() or busy
+        if busy:
+            self._load_poll_id = self.root.after(JOB_POLL_INTERVAL_MS, self._poll_background_loads)
+            return
+        callbacks, self._load_callbacks = self._load_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def _tab_title(self, tab: ShoppingListTab) -> str:
+        return self.notebook.tab(tab, "text")
+
+    # ------------------------------------------------------------------
+    # Suche
+    # ------------------------------------------------------------------
+    def _schedule_search(self) -> None:
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(SEARCH_DELAY_MS, self._run_search)
+
+    def _run_search(self) -> None:
+        self._search_after_id = None
+        query = self._search_var.get()
+        if not query.strip():
+            self._hide_search_results()
+            return
+
+        # Noch nicht geladene Tabs (Sitzung) werden im Hintergrund gefüllt (nicht gebaut);
+        # danach wird die Suche wiederholt.
+        loading = self._load_tabs_in_background(self._rerun_search)
+
+        self._search_hits = self.search_index.search(query, SEARCH_RESULT_LIMIT)
+        self._search_results.delete(0, tk.END)
+        for hit in self._search_hits:
+            tab_name = self.notebook.tab(hit.source, "text")
+            self._search_results.insert(tk.END, f"{tab_name[:15]:<15} | {ShoppingListTab._format_row(hit.item)}")
+        if loading:
+            self._search_results.insert(tk.END, "Weitere Listen werden geladen …")
+        elif not self._search_hits:
+            self._search_results.insert(tk.END, "Keine Treffer")
+        self._search_results.place(in_=self._search_entry, relx=1.0, rely=1.0, anchor="ne", width=600)
+        self._search_results.lift()
+
+    def _rerun_search(self) -> None:
+        """Nach dem Laden im Hintergrund: offene Trefferliste aktualisieren."""
+        if self._search_results.winfo_ismapped() and self._search_after_id is None:
+            self._run_search()
+
+    def _hide_search_results(self) -> None:
+        self._search_results.place_forget()
+
+    def _focus_search_results(self) -> None:
+        if self._search_hits:
+            self._search_results.focus_set()
+            self._search_results.selection_clear(0, tk.END)
+            self._search_results.selection_set(0)
+            self._search_results.activate(0)
+
+    def _selected_search_hit(self) -> Optional[int]:
+        selection = self._search_results.curselection()
+        return selection[0] if selection else None
+
+    def _open_search_hit(self, position: Optional[int]) -> None:
+        """Wechselt zum Tab des Treffers und markiert das Item."""
+        if position is None or position >= len(self._search_hits):
+            return
+        hit = self._search_hits[position]
+        self._hide_search_results()
+        tab: ShoppingListTab = hit.source  # type: ignore[assignment]
+        self.notebook.select(tab)
+        tab.ensure_built()
+        try:
+            tab.list_view.select(tab.items.index_of(hit.item))
+        except ValueError:
+            # Inzwischen entfernt
+            return
+        tab.list_view.listbox.focus_set()
+
+    # ------------------------------------------------------------------
+    # Sitzung
+    # ------------------------------------------------------------------
+    def _restore_session(self) -> bool:
+        """Legt für jeden Tab der Sitzung einen leeren, noch nicht gebauten Tab an."""
+        if self.workspace is None or not self.workspace.tabs:
+            return False
+        for record in self.workspace.tabs:
+            self.add_new_tab(record.name, select=False, tab_id=record.tab_id)
+
+        ids = [record.tab_id for record in self.workspace.tabs]
+        selected = self.workspace.selected_tab_id
+        self.notebook.select(ids.index(selected) if selected in ids else 0)
+        self._on_tab_changed()
+        return True
+
+    def save_session(self) -> None:
+        """Wartet, bis alle Änderungen im Journal auf der Platte sind.
+
+        Einen vollständigen Snapshot schreibt der Compactor im Hintergrund.
+        """
+        if self.workspace is None:
+            return
+        self.workspace.journal.sync()
+
+    def _on_close(self) -> None:
+        try:
+            self.save_session()
+            if self.workspace is not None:
+                self.workspace.close()
+        except Exception as e:
+            if not messagebox.askyesno(
+                "Fehler", f"Sitzung konnte nicht gespeichert werden: {e}\nTrotzdem beenden?"
+            ):
+                return
+        try:
+            self.catalog.close()
+        except sqlite3.Error as e:
+            # Der Katalog ist nur eine Eingabehilfe: Beenden trotzdem zulassen.
+            print(f"Fehler beim Speichern des Preiskatalogs: {e}")
+        self.root.destroy()
@@ -0,0 +1,243 @@
+"""history.py
+------------------------------------------------------------------------------
+Rückgängig / Wiederholen für eine ShoppingList.
+
+Problem:
+Ein Fehlklick auf "Item entfernen" oder ein falscher Import ließ sich nicht
+zurücknehmen. Eine Kopie der Liste vor jeder Aktion wäre bei 100k+ Items viel
+zu teuer (Zeit und Speicher).
+
+Lösung:
+- Die History hört auf die ListEvents und merkt sich pro Schritt nur, was zum
+  Umkehren nötig ist: eingefügte Bereiche (Position + Items), entfernte
+  Bereiche und Mengenänderungen je Item. Die Items selbst werden nicht kopiert,
+  sondern mit der Liste geteilt.
+- Aufeinanderfolgende Einfügungen am selben Bereich werden zusammengefasst: Ein
+  Import von 100k Items ist ein einziger Bereich und wird mit einem einzigen
+  REMOVE-Event zurückgenommen (die Anzeige ändert nur den sichtbaren Teil).
+- Beim Rückgängigmachen entstehen wieder ListEvents; diese werden als
+  Wiederholen-Schritt aufgezeichnet (und umgekehrt).
+- Der Speicher ist begrenzt: höchstens `limit` Schritte und `max_items`
+  gemerkte Items; die ältesten Schritte fallen zuerst heraus.
+- RESET (Liste komplett ersetzt) lässt sich nicht umkehren und leert die History.
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+from .instrumentation import timed
+from .models import INSERT, REMOVE, RESET, UPDATE, ListEvent, ShoppingList
+
+# Standard-Grenzen: Anzahl Schritte und insgesamt gemerkte Items
+DEFAULT_LIMIT = 100
+DEFAULT_MAX_ITEMS = 1_000_000
+
+
+class _Step:
+    """Ein rückgängig machbarer Schritt (eine Aktion oder Transaktion)."""
+
+    __slots__ = ("label", "ranges", "updates", "size")
+
+    def __init__(self, label: str):
+        self.label = label
+        # [INSERT oder REMOVE, index, items] in Reihenfolge des Geschehens
+        self.ranges: List[list] = []
+        # id(item) -> [item, Mengenänderung]
+        self.updates: Dict[int, list] = {}
+        self.size = 0
+
+    def record(self, event: ListEvent) -> None:
+        if event.kind == UPDATE:
+            for item in event.items:
+                entry = self.updates.get(id(item))
+                if entry is None:
+                    self.updates[id(item)] = [item, event.amount_delta]
+                    self.size += 1
+                else:
+                    entry[1] += event.amount_delta
+            return
+
+        self.size += len(event.items)
+        last = self.ranges[-1] if self.ranges else None
+        if last is not None and last[0] == event.kind:
+            if event.kind == INSERT and last[1] + len(last[2]) == event.index:
+                last[2].extend(event.items)
+                return
+            if event.kind == REMOVE and last[1] == event.index:
+                last[2].extend(event.items)
+                return
+        self.ranges.append([event.kind, event.index, list(event.items)])
+
+    def revert(self, items: ShoppingList) -> None:
+        """Macht den Schritt auf `items` rückgängig.
+
+        Mengen zuerst: Items, die gerade nicht in der Liste stehen, werden direkt
+        korrigiert und kommen beim Wiedereinfügen mit der richtigen Menge zurück.
+        """
+        for item, amount_delta in self.updates.values():
+            if not amount_delta:
+                continue
+            try:
+                items.index_of(item)
+            except ValueError:
+                item.add_amount(-amount_delta)
+            else:
+                items.add_amount(item, -amount_delta)
+        for kind, index, entries in reversed(self.ranges):
+            if kind == INSERT:
+                items.delete(index, len(entries))
+            else:
+                items.insert_many(index, entries)
+
+
+class History:
+    """Rückgängig/Wiederholen-Stapel für eine ShoppingList.
+
+    Args:
+        items: Die beobachtete Liste
+        limit: Maximale Anzahl Schritte im Rückgängig-Stapel
+        max_items: Maximale Anzahl gemerkter Items über alle Schritte
+        on_change: Wird aufgerufen, wenn sich Rückgängig/Wiederholen-Zustand ändert
+    """
+
+    def __init__(
+        self,
+        items: ShoppingList,
+        limit: int = DEFAULT_LIMIT,
+        max_items: int = DEFAULT_MAX_ITEMS,
+        on_change: Optional[Callable[[], None]] = None,
+    ):
+        self.items = items
+        self.limit = limit
+        self.max_items = max_items
+        self.on_change = on_change
+        self._undo: Deque[_Step] = deque()
+        self._redo: List[_Step] = []
+        self._size = 0
+        self._open: Optional[_Step] = None
+        self._depth = 0
+        # Ziel der Aufzeichnung, während ein Schritt umgekehrt wird
+        self._replay: Optional[_Step] = None
+        self._unsubscribe = items.subscribe(self._on_list_changed)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    # ------------------------------------------------------------------
+    # Zustand
+    # ------------------------------------------------------------------
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo) and self._open is None
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo) and self._open is None
+
+    def undo_label(self) -> Optional[str]:
+        return self._undo[-1].label if self._undo else None
+
+    def redo_label(self) -> Optional[str]:
+        return self._redo[-1].label if self._redo else None
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+        self._size = 0
+        self._notify()
+
+    def _notify(self) -> None:
+        if self.on_change is not None:
+            self.on_change()
+
+    # ------------------------------------------------------------------
+    # Aufzeichnen
+    # ------------------------------------------------------------------
+    def begin(self, label: str) -> None:
+        """Beginnt eine Transaktion: alle Änderungen bis `commit()` sind ein Schritt."""
+        self._depth += 1
+        if self._depth == 1:
+            self._open = _Step(label)
+            self._notify()
+
+    def commit(self) -> None:
+        if self._depth == 0:
+            raise RuntimeError("Keine offene Transaktion")
+        self._depth -= 1
+        if self._depth == 0:
+            step, self._open = self._open, None
+            self._push(step)  # type: ignore[arg-type]
+
+    @contextmanager
+    def transaction(self, label: str) -> Iterator[None]:
+        self.begin(label)
+        try:
+            yield
+        finally:
+            self.commit()
+
+    def _on_list_changed(self, event: ListEvent) -> None:
+        if event.kind == RESET:
+            # Nicht umkehrbar: alles Bisherige (auch in einer offenen Transaktion) verwerfen.
+            if self._open is not None:
+                self._open = _Step(self._open.label)
+            self.clear()
+            return
+        if self._replay is not None:
+            self._replay.record(event)
+        elif self._open is not None:
+            self._open.record(event)
+        else:
+            step = _Step("")
+            step.record(event)
+            self._push(step)
+
+    def _push(self, step: _Step) -> None:
+        if not step.ranges and not step.updates:
+            self._notify()
+            return
+        self._redo.clear()
+        self._append_undo(step)
+        self._notify()
+
+    def _append_undo(self, step: _Step) -> None:
+        self._undo.append(step)
+        self._size += step.size
+        while self._undo and (len(self._undo) > self.limit or self._size > self.max_items):
+            self._size -= self._undo.popleft().size
+
+    # ------------------------------------------------------------------
+    # Umkehren
+    # ------------------------------------------------------------------
+    @timed("History.undo")
+    def undo(self) -> bool:
+        """Macht den letzten Schritt rückgängig; False, wenn es keinen gibt."""
+        if not self.can_undo:
+            return False
+        step = self._undo.pop()
+        self._size -= step.size
+        self._redo.append(self._revert(step))
+        self._notify()
+        return True
+
+    @timed("History.redo")
+    def redo(self) -> bool:
+        """Wiederholt den zuletzt rückgängig gemachten Schritt."""
+        if not self.can_redo:
+            return False
+        self._append_undo(self._revert(self._redo.pop()))
+        self._notify()
+        return True
+
+    def _revert(self, step: _Step) -> _Step:
+        """Kehrt `step` um und liefert den Schritt, der das wieder aufhebt."""
+        self._replay = _Step(step.label)
+        try:
+            step.revert(self.items)
+            return self._replay
+        finally:
+            self._replay = None
@@ -0,0 +1,201 @@
+"""instrumentation.py
+------------------------------------------------------------------------------
+Leichtgewichtige Laufzeitmessung für die heißen Pfade.
+
+Problem:
+Wenn die Anwendung "langsam" wirkt, wissen wir nicht, wo die Zeit bleibt
+(Laden, Speichern, Mergen, Neuzeichnen, Item-Erzeugung).
+
+Lösung:
+- `@timed(name)` misst Aufrufe einer Funktion. Ist die Messung aus (Standard),
+  kostet ein Aufruf nur eine zusätzliche Funktionsebene und eine Abfrage.
+  Liefert die Funktion einen Iterator (z.B. `iter_load`), wird die Zeit in
+  den `next()`-Aufrufen aufsummiert – nicht die Zeit des Verbrauchers.
+- Pro Name werden Aufrufe, Gesamtzeit und die letzten SAMPLE_WINDOW Laufzeiten
+  (für p50/p95) gehalten; dazu einfache Zähler.
+- Einschalten per Umgebungsvariable SHOPPING_LIST_PROFILE=1 oder über das
+  Menü "Diagnose"; Ausgabe als JSON-Datei oder im Diagnosefenster.
+- `start_profiling()` / `stop_profiling()` umschließen einen Abschnitt mit
+  cProfile (nur der aufrufende Thread, also i.d.R. der Tk-Hauptthread).
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import inspect
+import json
+import math
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, TypeVar
+
+ENV_VAR = "SHOPPING_LIST_PROFILE"
+# Anzahl der letzten Messwerte pro Name, aus denen p50/p95 berechnet werden
+SAMPLE_WINDOW = 1024
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_enabled = os.environ.get(ENV_VAR, "").strip() not in ("", "0")
+_lock = threading.Lock()
+_samples: Dict[str, Deque[float]] = {}
+_calls: Dict[str, int] = {}
+_total_seconds: Dict[str, float] = {}
+_counters: Dict[str, int] = {}
+_profiler: Optional[cProfile.Profile] = None
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Verwirft alle bisherigen Messwerte und Zähler."""
+    with _lock:
+        _samples.clear()
+        _calls.clear()
+        _total_seconds.clear()
+        _counters.clear()
+
+
+def record(name: str, seconds: float) -> None:
+    """Nimmt eine einzelne Laufzeit auf (auch aus Worker-Threads)."""
+    with _lock:
+        samples = _samples.get(name)
+        if samples is None:
+            samples = _samples[name] = deque(maxlen=SAMPLE_WINDOW)
+        samples.append(seconds)
+        _calls[name] = _calls.get(name, 0) + 1
+        _total_seconds[name] = _total_seconds.get(name, 0.0) + seconds
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Erhöht einen Zähler; ohne aktive Messung passiert nichts."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def _timed_iter(name: str, iterator: Iterator[Any]) -> Iterator[Any]:
+    elapsed = 0.0
+    clock = time.perf_counter
+    try:
+        while True:
+            start = clock()
+            try:
+                value = next(iterator)
+            except StopIteration:
+                elapsed += clock() - start
+                return
+            elapsed += clock() - start
+            yield value
+    finally:
+        record(name, elapsed)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Dekorator: misst jeden Aufruf unter `name`, solange die Messung aktiv ist."""
+
+    def decorate(func: F) -> F:
+        if inspect.isgeneratorfunction(func):
+
+            @functools.wraps(func)
+            def iter_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return func(*args, **kwargs)
+                return _timed_iter(name, func(*args, **kwargs))
+
+            return iter_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-Rank-Perzentil einer sortierten, nicht leeren Liste."""
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def snapshot() -> Dict[str, Any]:
+    """Aktueller Stand: pro Name Aufrufe, Gesamtzeit, p50/p95/max (ms) sowie die Zähler."""
+    with _lock:
+        samples = {name: sorted(values) for name, values in _samples.items()}
+        calls = dict(_calls)
+        totals = dict(_total_seconds)
+        counters = dict(_counters)
+
+    timings = {}
+    for name, values in sorted(samples.items()):
+        timings[name] = {
+            "calls": calls[name],
+            "total_ms": totals[name] * 1000,
+            "p50_ms": _percentile(values, 0.50) * 1000,
+            "p95_ms": _percentile(values, 0.95) * 1000,
+            "max_ms": values[-1] * 1000,
+        }
+    return {"enabled": _enabled, "timings": timings, "counters": dict(sorted(counters.items()))}
+
+
+def dump(filename: str) -> None:
+    """Schreibt `snapshot()` als JSON-Datei."""
+    try:
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(snapshot(), f, ensure_ascii=False, indent=2)
+    except IOError as e:
+        print(f"Fehler beim Speichern: {e}")
+        raise
+
+
+# ----------------------------------------------------------------------
+# cProfile auf Abruf
+# ----------------------------------------------------------------------
+def profiling_active() -> bool:
+    return _profiler is not None
+
+
+def start_profiling() -> None:
+    """Startet cProfile für den aufrufenden Thread (keine Wirkung, falls schon aktiv)."""
+    global _profiler
+    if _profiler is not None:
+        return
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+
+
+def stop_profiling(filename: Optional[str] = None) -> Optional[pstats.Stats]:
+    """Stoppt cProfile; schreibt die Rohdaten (für pstats/snakeviz) optional nach `filename`."""
+    global _profiler
+    if _profiler is None:
+        return None
+    profiler, _profiler = _profiler, None
+    profiler.disable()
+    if filename:
+        profiler.dump_stats(filename)
+    return pstats.Stats(profiler)
@@ -0,0 +1,515 @@
+"""journal.py
+------------------------------------------------------------------------------
+Append-only Journal für Sitzungen (Autosave, Absturzsicherheit).
+
+Problem:
+Gespeichert wurde nur beim Schließen (bzw. beim Export), und zwar jede
+geänderte Liste komplett. Häufiges Autosave wäre bei großen Listen zu teuer,
+und nach einem Absturz war alles seit dem letzten Speichern verloren.
+
+Lösung:
+- Jede Änderung (Items einfügen/entfernen/ändern, Tab anlegen/schließen/
+  umbenennen) wird als JSON-Zeile mit fortlaufender Nummer (seq) an das
+  Journal angehängt. Die Kosten hängen nur von der Größe der Änderung ab.
+- Ein Writer-Thread schreibt gesammelt (Group Commit): Alles, was während
+  COMMIT_DELAY anfällt, kostet ein write() und ein fsync(). Aufeinander
+  folgende Einfügungen am Listenende werden dabei zu einer Zeile zusammengefasst.
+- Das Journal besteht aus Segmenten (journal-<erste seq>.jsonl), die ab
+  SEGMENT_SIZE gewechselt werden. Eine beim Absturz halb geschriebene letzte
+  Zeile wird beim Öffnen abgeschnitten.
+- Snapshot = session.json plus Backing-Dateien; beide merken sich, bis zu
+  welcher seq sie aktuell sind. Beim Start werden nur die Tab-Operationen
+  nachgespielt; die Item-Operationen eines Tabs erst, wenn er geladen wird.
+- Ein Hintergrund-Compactor faltet abgeschlossene Segmente in neue
+  Backing-Dateien und eine neue session.json und löscht die Segmente danach.
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .factories import ItemFactory
+from .models import INSERT, REMOVE, RESET, UPDATE, ListEvent, ShoppingItem, ShoppingList
+from .persistence import BinaryFileHandler, handler_for_file, iter_rows
+from .session import Session, TabRecord
+
+# Wartezeit des Writers, um weitere Operationen in denselben fsync zu packen
+COMMIT_DELAY = 0.02
+# Ab dieser Größe (Bytes) beginnt ein neues Segment
+SEGMENT_SIZE = 4 * 1024 * 1024
+# Der Compactor läuft, sobald so viele Bytes seit dem letzten Snapshot anfielen ...
+COMPACT_THRESHOLD = 16 * 1024 * 1024
+# ... spätestens aber nach diesem Intervall (Sekunden), falls es überhaupt Änderungen gibt
+COMPACT_INTERVAL = 300.0
+
+JOURNAL_DIRNAME = "journal"
+_SEGMENT_PREFIX = "journal-"
+_SEGMENT_SUFFIX = ".jsonl"
+
+Op = Dict[str, Any]
+
+
+def _segment_name(first_seq: int) -> str:
+    return f"{_SEGMENT_PREFIX}{first_seq:012d}{_SEGMENT_SUFFIX}"
+
+
+def _item_rows(items: Iterable[ShoppingItem]) -> List[list]:
+    return [[is_weighted, name, amount, price] for is_weighted, name, amount, price in iter_rows(items)]
+
+
+def _create_items(rows: Iterable[list]) -> List[ShoppingItem]:
+    return [ItemFactory.create_item(name, is_weighted, amount, price) for is_weighted, name, amount, price in rows]
+
+
+class Journal:
+    """Segmentiertes Append-only-Log mit Group Commit.
+
+    Args:
+        directory: Verzeichnis der Segmente (wird angelegt)
+        start_seq: Mindestwert für die letzte vergebene seq (z.B. aus dem Snapshot)
+        segment_size: Segmentgröße in Bytes
+        commit_delay: Sammelzeit des Writers in Sekunden
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        start_seq: int = 0,
+        segment_size: int = SEGMENT_SIZE,
+        commit_delay: float = COMMIT_DELAY,
+    ):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.commit_delay = commit_delay
+        os.makedirs(directory, exist_ok=True)
+
+        last_seq = max(start_seq, self._recover())
+        self._next_seq = last_seq + 1
+        self._written_seq = last_seq
+        self.bytes_written = 0
+
+        self._cond = threading.Condition()
+        self._pending: List[Op] = []
+        self._closing = False
+        self._error: Optional[BaseException] = None
+
+        self._io_lock = threading.Lock()
+        segments = self.segments()
+        if segments and os.path.getsize(segments[-1][1]) < segment_size:
+            self._path = segments[-1][1]
+        else:
+            self._path = os.path.join(directory, _segment_name(self._next_seq))
+        self._file = open(self._path, "ab")
+        self._size = self._file.tell()
+
+        self._thread = threading.Thread(target=self._run, name="shopping-list-journal", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Segmente
+    # ------------------------------------------------------------------
+    def segments(self) -> List[Tuple[int, str]]:
+        """(erste seq, Pfad) aller Segmente, aufsteigend."""
+        result = []
+        for entry in os.listdir(self.directory):
+            if entry.startswith(_SEGMENT_PREFIX) and entry.endswith(_SEGMENT_SUFFIX):
+                digits = entry[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]
+                if digits.isdigit():
+                    result.append((int(digits), os.path.join(self.directory, entry)))
+        return sorted(result)
+
+    def _recover(self) -> int:
+        """Schneidet eine halbe letzte Zeile ab; liefert die letzte gültige seq."""
+        last_seq = 0
+        for _first, path in self.segments():
+            valid_end = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        op = json.loads(line)
+                    except ValueError:
+                        break
+                    if not line.endswith(b"\n"):
+                        break
+                    valid_end += len(line)
+                    last_seq = max(last_seq, op["seq"])
+            if valid_end < os.path.getsize(path):
+                print(f"Journal: unvollständiges Ende von {os.path.basename(path)} verworfen")
+                with open(path, "r+b") as f:
+                    f.truncate(valid_end)
+        return last_seq
+
+    # ------------------------------------------------------------------
+    # Schreiben
+    # ------------------------------------------------------------------
+    def append(self, op: Op) -> int:
+        """Hängt eine Operation an (kehrt sofort zurück) und liefert ihre seq."""
+        with self._cond:
+            if self._error is not None:
+                raise IOError(f"Journal nicht beschreibbar: {self._error}")
+            if self._closing:
+                raise ValueError("Journal ist geschlossen")
+            if op.get("op") == "insert" and self._pending:
+                last = self._pending[-1]
+                if (
+                    last["op"] == "insert"
+                    and last["tab"] == op["tab"]
+                    and last["index"] + len(last["items"]) == op["index"]
+                ):
+                    last["items"].extend(op["items"])
+                    return last["seq"]
+            seq = self._next_seq
+            self._next_seq += 1
+            self._pending.append({"seq": seq, **op})
+            self._cond.notify()
+            return seq
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                closing = self._closing
+            if self.commit_delay and not closing:
+                time.sleep(self.commit_delay)
+            with self._cond:
+                batch, self._pending = self._pending, []
+
+            try:
+                data = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in batch).encode("utf-8")
+                with self._io_lock:
+                    self._file.write(data)
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    self._size += len(data)
+                    self._written_seq = batch[-1]["seq"]
+                    if self._size >= self.segment_size:
+                        self._rotate_locked()
+            except (IOError, OSError) as e:
+                print(f"Fehler beim Speichern: {e}")
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+
+            with self._cond:
+                self.bytes_written += len(data)
+                self._cond.notify_all()
+
+    def sync(self) -> int:
+        """Wartet, bis alle bisher angehängten Operationen auf der Platte sind."""
+        with self._cond:
+            target = self._next_seq - 1
+            while self._written_seq < target and self._error is None and self._thread.is_alive():
+                self._cond.wait(0.1)
+            if self._error is not None:
+                raise IOError(f"Journal nicht beschreibbar: {self._error}")
+            return self._written_seq
+
+    def _rotate_locked(self) -> None:
+        if self._size == 0:
+            return
+        self._file.close()
+        self._path = os.path.join(self.directory, _segment_name(self._written_seq + 1))
+        self._file = open(self._path, "ab")
+        self._size = 0
+
+    def rotate(self) -> int:
+        """Schließt das aktuelle Segment ab; liefert die letzte darin enthaltene seq."""
+        self.sync()
+        with self._io_lock:
+            self._rotate_locked()
+            return self._written_seq
+
+    def close(self) -> None:
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+        with self._io_lock:
+            self._file.close()
+
+    # ------------------------------------------------------------------
+    # Lesen und Aufräumen
+    # ------------------------------------------------------------------
+    def read(self, after: int = 0, upto: Optional[int] = None, contains: Optional[str] = None) -> Iterator[Op]:
+        """Operationen mit after < seq <= upto in Reihenfolge.
+
+        `contains` ist ein schneller Vorfilter auf die Rohzeile (z.B. eine Tab-ID);
+        nur passende Zeilen werden überhaupt als JSON gelesen.
+        """
+        segments = self.segments()
+        for pos, (first, path) in enumerate(segments):
+            if upto is not None and first > upto:
+                return
+            if pos + 1 < len(segments) and segments[pos + 1][0] <= after + 1:
+                continue
+            try:
+                f = open(path, "r", encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            with f:
+                for line in f:
+                    if contains is not None and contains not in line:
+                        continue
+                    if not line.endswith("\n"):
+                        break
+                    op = json.loads(line)
+                    if op["seq"] <= after:
+                        continue
+                    if upto is not None and op["seq"] > upto:
+                        return
+                    yield op
+
+    def drop_segments(self, upto: int) -> None:
+        """Löscht abgeschlossene Segmente, die nur Operationen <= upto enthalten."""
+        segments = self.segments()
+        for pos, (_first, path) in enumerate(segments[:-1]):
+            if segments[pos + 1][0] <= upto + 1 and path != self._path:
+                os.remove(path)
+
+
+# ----------------------------------------------------------------------
+# Operationen anwenden
+# ----------------------------------------------------------------------
+def apply_item_op(items: ShoppingList, op: Op) -> None:
+    """Spielt eine Item-Operation auf `items` nach."""
+    kind = op["op"]
+    if kind == "insert":
+        items.insert_many(op["index"], _create_items(op["items"]))
+    elif kind == "remove":
+        items.delete(op["index"], op.get("count", 1))
+    elif kind == "update":
+        items.add_amount(items[op["index"]], op["amount"])
+    elif kind == "reset":
+        items.reset(_create_items(op["items"]))
+
+
+def apply_tab_op(tabs: List[TabRecord], op: Op) -> None:
+    """Spielt eine Tab-Operation auf die Tab-Liste nach."""
+    kind = op["op"]
+    if kind == "create_tab":
+        position = op.get("position")
+        record = TabRecord(op["name"], tab_id=op["tab"])
+        tabs.insert(len(tabs) if position is None else position, record)
+        return
+    for pos, record in enumerate(tabs):
+        if record.tab_id == op["tab"]:
+            if kind == "close_tab":
+                del tabs[pos]
+            elif kind == "rename_tab":
+                record.name = op["name"]
+            return
+
+
+_TAB_OPS = ("create_tab", "close_tab", "rename_tab", "select_tab")
+
+
+class Workspace:
+    """Sitzung (Snapshot) plus Journal: Wiederherstellen, Mitschreiben, Verdichten.
+
+    Args:
+        session_path: Pfad der session.json; das Journal liegt daneben.
+        segment_size, commit_delay: siehe Journal
+    """
+
+    def __init__(self, session_path: str, segment_size: int = SEGMENT_SIZE, commit_delay: float = COMMIT_DELAY):
+        self.session = Session.load(session_path)
+        # Schützt Snapshot-Dateien und session.json (Compactor vs. Laden eines Tabs)
+        self.lock = threading.RLock()
+        self.journal = Journal(
+            self.journal_dir, self.session.journal_seq, segment_size=segment_size, commit_delay=commit_delay
+        )
+        self.tabs, self.selected_tab_id = self._restore_tabs()
+        self._untrack: Dict[str, Callable[[], None]] = {}
+        self._compactor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._compacted_bytes = 0
+
+    @property
+    def journal_dir(self) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(self.session.path)), JOURNAL_DIRNAME)
+
+    def _restore_tabs(self) -> Tuple[List[TabRecord], Optional[str]]:
+        """Tab-Liste des Snapshots plus alle späteren Tab-Operationen."""
+        tabs = [record.copy() for record in self.session.tabs]
+        selected = None
+        if tabs:
+            selected = tabs[min(max(0, self.session.selected), len(tabs) - 1)].tab_id
+        for op in self.journal.read(after=self.session.journal_seq, contains='_tab"'):
+            if op["op"] == "select_tab":
+                selected = op["tab"]
+            elif op["op"] in _TAB_OPS:
+                apply_tab_op(tabs, op)
+        if selected not in {record.tab_id for record in tabs}:
+            selected = tabs[0].tab_id if tabs else None
+        return tabs, selected
+
+    # ------------------------------------------------------------------
+    # Tab-Operationen
+    # ------------------------------------------------------------------
+    def create_tab(self, name: str, position: Optional[int] = None, tab_id: Optional[str] = None) -> TabRecord:
+        record = TabRecord(name, tab_id=tab_id)
+        op: Op = {"op": "create_tab", "tab": record.tab_id, "name": name, "position": position}
+        self.journal.append(op)
+        self.tabs.insert(len(self.tabs) if position is None else position, record)
+        return record
+
+    def close_tab(self, tab_id: str) -> None:
+        self.untrack(tab_id)
+        op: Op = {"op": "close_tab", "tab": tab_id}
+        self.journal.append(op)
+        apply_tab_op(self.tabs, op)
+
+    def rename_tab(self, tab_id: str, name: str) -> None:
+        op: Op = {"op": "rename_tab", "tab": tab_id, "name": name}
+        self.journal.append(op)
+        apply_tab_op(self.tabs, op)
+
+    def select_tab(self, tab_id: str) -> None:
+        if tab_id != self.selected_tab_id:
+            self.selected_tab_id = tab_id
+            self.journal.append({"op": "select_tab", "tab": tab_id})
+
+    # ------------------------------------------------------------------
+    # Items
+    # ------------------------------------------------------------------
+    def track(self, tab_id: str, items: ShoppingList) -> None:
+        """Schreibt ab jetzt jede Änderung von `items` ins Journal."""
+        journal = self.journal
+
+        def on_change(event: ListEvent) -> None:
+            if event.kind == INSERT:
+                journal.append({"op": "insert", "tab": tab_id, "index": event.index, "items": _item_rows(event.items)})
+            elif event.kind == REMOVE:
+                journal.append({"op": "remove", "tab": tab_id, "index": event.index, "count": len(event.items)})
+            elif event.kind == UPDATE:
+                journal.append({"op": "update", "tab": tab_id, "index": event.index, "amount": event.amount_delta})
+            elif event.kind == RESET:
+                journal.append({"op": "reset", "tab": tab_id, "items": _item_rows(event.items)})
+
+        self.untrack(tab_id)
+        self._untrack[tab_id] = items.subscribe(on_change)
+
+    def untrack(self, tab_id: str) -> None:
+        unsubscribe = self._untrack.pop(tab_id, None)
+        if unsubscribe is not None:
+            unsubscribe()
+
+    def _snapshot_items(self, record: Optional[TabRecord]) -> ShoppingList:
+        items = ShoppingList()
+        if record is not None and record.backing_file:
+            handler = handler_for_file(record.backing_file, BinaryFileHandler())
+            items.extend(handler.iter_load(record.backing_file))
+        return items
+
+    def _snapshot_record(self, tab_id: str) -> Optional[TabRecord]:
+        for record in self.session.tabs:
+            if record.tab_id == tab_id:
+                return record
+        return None
+
+    def read_tab(self, tab_id: str) -> ShoppingList:
+        """Stand eines Tabs aus Snapshot plus Journal (darf in einem Worker-Thread laufen)."""
+        with self.lock:
+            record = self._snapshot_record(tab_id)
+            loaded = self._snapshot_items(record)
+            after = record.seq if record is not None else 0
+            for op in self.journal.read(after=after, contains=f'"tab": {json.dumps(tab_id)}'):
+                if op["op"] not in _TAB_OPS:
+                    apply_item_op(loaded, op)
+        return loaded
+
+    def load_tab(self, tab_id: str, items: ShoppingList) -> None:
+        """Füllt `items` aus Snapshot plus Journal und schreibt danach Änderungen mit."""
+        items.extend(self.read_tab(tab_id))
+        self.track(tab_id, items)
+
+    # ------------------------------------------------------------------
+    # Verdichten
+    # ------------------------------------------------------------------
+    def compact(self) -> bool:
+        """Faltet alle abgeschlossenen Journal-Operationen in einen neuen Snapshot.
+
+        Returns:
+            True, wenn ein neuer Snapshot geschrieben wurde.
+        """
+        with self.lock:
+            start_bytes = self.journal.bytes_written
+            upto = self.journal.rotate()
+            if upto <= self.session.journal_seq:
+                return False
+
+            tabs = [record.copy() for record in self.session.tabs]
+            selected = tabs[self.session.selected].tab_id if 0 <= self.session.selected < len(tabs) else None
+            item_ops: Dict[str, List[Op]] = {}
+            for op in self.journal.read(after=self.session.journal_seq, upto=upto):
+                if op["op"] == "select_tab":
+                    selected = op["tab"]
+                elif op["op"] in _TAB_OPS:
+                    apply_tab_op(tabs, op)
+                    if op["op"] == "close_tab":
+                        item_ops.pop(op["tab"], None)
+                else:
+                    item_ops.setdefault(op["tab"], []).append(op)
+
+            handler = BinaryFileHandler()
+            for record in tabs:
+                ops = item_ops.get(record.tab_id)
+                if not ops:
+                    continue
+                items = self._snapshot_items(record)
+                for op in ops:
+                    if op["seq"] > record.seq:
+                        apply_item_op(items, op)
+                os.makedirs(self.session.lists_dir, exist_ok=True)
+                path = self.session.backing_file_for(record.tab_id, upto)
+                handler.save(items, path)
+                with open(path, "rb+") as f:
+                    os.fsync(f.fileno())
+                record.backing_file = path
+                record.seq = upto
+
+            ids = [record.tab_id for record in tabs]
+            self.session.tabs = tabs
+            self.session.selected = ids.index(selected) if selected in ids else 0
+            self.session.journal_seq = upto
+            self.session.save()
+            self.journal.drop_segments(upto)
+            self._compacted_bytes = start_bytes
+            return True
+
+    def start_compactor(self, interval: float = COMPACT_INTERVAL, threshold: int = COMPACT_THRESHOLD) -> None:
+        """Startet den Hintergrund-Compactor (prüft jede Sekunde, ob es Zeit ist)."""
+        if self._compactor is not None:
+            return
+
+        def run() -> None:
+            last = time.monotonic()
+            while not self._stop.wait(1.0):
+                pending = self.journal.bytes_written - self._compacted_bytes
+                if pending >= threshold or (pending and time.monotonic() - last >= interval):
+                    try:
+                        self.compact()
+                    except Exception as e:
+                        print(f"Fehler beim Speichern: {e}")
+                    last = time.monotonic()
+
+        self._compactor = threading.Thread(target=run, name="shopping-list-compactor", daemon=True)
+        self._compactor.start()
+
+    def close(self) -> None:
+        """Stoppt den Compactor und schreibt alle offenen Operationen."""
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+        self.journal.sync()
+        self.journal.close()
@@ -0,0 +1,262 @@
+"""listview.py
+------------------------------------------------------------------------------
+Virtualisierte Listenanzeige (View).
+
+Problem:
+Die Listbox wurde nach jeder Änderung komplett geleert und mit einer Zeile pro
+Item neu befüllt. Bei großen Listen kostet damit jede Einzeländerung O(n)
+Tk-Aufrufe.
+
+Lösung:
+- Die Listbox enthält nur die Zeilen des sichtbaren Ausschnitts (Viewport).
+  Die Scrollbar wird selbst verwaltet und bildet die gesamte Liste ab.
+- Formatierte Zeilen werden pro Item zwischengespeichert.
+- Änderungen werden gezielt gemeldet (inserted / deleted / changed) und nur
+  dann in die Listbox übertragen, wenn sie im Viewport liegen. Der Abgleich
+  mit der Listbox läuft danach einmal gesammelt, sobald Tk untätig ist – viele
+  Einzeländerungen (z.B. beim Import) kosten so nur einen Durchlauf.
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import tkinter as tk
+import tkinter.font as tkfont
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+# Obergrenze für den Zeilen-Cache; danach wird er verworfen und neu aufgebaut.
+ROW_CACHE_LIMIT = 10_000
+
+
+class VirtualListView(tk.Frame):
+    """Listbox mit Scrollbar, die nur den sichtbaren Ausschnitt von `items` materialisiert.
+
+    Args:
+        parent: Eltern-Widget
+        items: Die angezeigte Sequenz (wird nur gelesen, nie kopiert)
+        formatter: Erzeugt den Anzeigetext für ein Item
+        **listbox_options: Weitere Optionen für die tk.Listbox (z.B. font)
+    """
+
+    def __init__(
+        self,
+        parent,
+        items: Sequence[Any],
+        formatter: Callable[[Any], str],
+        **listbox_options: Any,
+    ):
+        super().__init__(parent)
+        self._items = items
+        self._formatter = formatter
+        self._cache: Dict[int, Tuple[Any, str]] = {}
+        self._shown: List[str] = []
+        self._offset = 0
+        self._visible_rows = 1
+        self._selected: Optional[int] = None
+        self._render_id: Optional[str] = None
+
+        self._scrollbar = tk.Scrollbar(self, command=self._on_scroll)
+        self._scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        listbox_options.setdefault("exportselection", False)
+        self.listbox = tk.Listbox(self, **listbox_options)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.listbox.bind("<Configure>", self._on_configure)
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        self.listbox.bind("<MouseWheel>", self._on_mousewheel)
+        self.listbox.bind("<Button-4>", lambda _e: self._scroll_by(-3))
+        self.listbox.bind("<Button-5>", lambda _e: self._scroll_by(3))
+        self.listbox.bind("<Up>", lambda _e: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda _e: self._move_selection(1))
+
+    # ------------------------------------------------------------------
+    # Änderungs-API
+    # ------------------------------------------------------------------
+    def reset(self, items: Optional[Sequence[Any]] = None) -> None:
+        """Verwirft alle Caches und zeichnet den Viewport neu."""
+        if items is not None:
+            self._items = items
+        self._cache.clear()
+        self._selected = None
+        self._render()
+
+    def inserted(self, index: int, count: int = 1) -> None:
+        """Meldet, dass `count` Items ab `index` eingefügt wurden."""
+        if self._selected is not None and self._selected >= index:
+            self._selected += count
+
+        if index < self._offset:
+            # Oberhalb des Viewports: gleiche Items bleiben sichtbar.
+            self._offset += count
+        elif index < self._offset + self._visible_rows:
+            pos = index - self._offset
+            for k in range(min(count, self._visible_rows - pos)):
+                row = self._row(self._items[index + k])
+                self.listbox.insert(pos + k, row)
+                self._shown.insert(pos + k, row)
+            overflow = len(self._shown) - self._visible_rows
+            if overflow > 0:
+                self.listbox.delete(self._visible_rows, tk.END)
+                del self._shown[self._visible_rows:]
+        self._schedule_render()
+
+    def deleted(self, index: int, item: Any = None) -> None:
+        """Meldet, dass das Item an `index` entfernt wurde."""
+        self.removed(index, (item,) if item is not None else 1)
+
+    def removed(self, index: int, items: Union[Sequence[Any], int]) -> None:
+        """Meldet, dass ab `index` mehrere Items entfernt wurden (Items oder Anzahl)."""
+        if isinstance(items, int):
+            count = items
+        else:
+            count = len(items)
+            for item in items:
+                self._cache.pop(id(item), None)
+        end = index + count
+        if self._selected is not None:
+            if index <= self._selected < end:
+                self._selected = None
+            elif self._selected >= end:
+                self._selected -= count
+
+        # Teil oberhalb des Viewports verschiebt nur den Offset.
+        above = max(0, min(end, self._offset) - index)
+        pos = index + above - self._offset
+        self._offset -= above
+        count -= above
+        if count and pos < len(self._shown):
+            last = min(pos + count, len(self._shown))
+            self.listbox.delete(pos, last - 1)
+            del self._shown[pos:last]
+        self._schedule_render()
+
+    def changed(self, item: Any) -> None:
+        """Meldet, dass sich die Anzeige eines Items geändert hat (z.B. Menge)."""
+        self._cache.pop(id(item), None)
+        end = min(len(self._items), self._offset + len(self._shown))
+        for index in range(self._offset, end):
+            if self._items[index] is item:
+                self._schedule_render()
+                return
+
+    def selected_index(self) -> Optional[int]:
+        """Index des ausgewählten Items in `items` (nicht in der Listbox)."""
+        return self._selected
+
+    def see(self, index: int) -> None:
+        """Scrollt so, dass das Item an `index` sichtbar ist."""
+        if index < self._offset:
+            self._offset = index
+        elif index >= self._offset + self._visible_rows:
+            self._offset = index - self._visible_rows + 1
+        self._render()
+
+    def select(self, index: int) -> None:
+        self._selected = index
+        self.see(index)
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+    def _row(self, item: Any) -> str:
+        entry = self._cache.get(id(item))
+        if entry is not None and entry[0] is item:
+            return entry[1]
+        if len(self._cache) >= ROW_CACHE_LIMIT:
+            self._cache.clear()
+        row = self._formatter(item)
+        # Die Referenz auf das Item verhindert, dass seine id() neu vergeben wird.
+        self._cache[id(item)] = (item, row)
+        return row
+
+    def _schedule_render(self) -> None:
+        if self._render_id is None:
+            self._render_id = self.after_idle(self._render)
+
+    def destroy(self) -> None:
+        if self._render_id is not None:
+            self.after_cancel(self._render_id)
+            self._render_id = None
+        super().destroy()
+
+    def _render(self) -> None:
+        """Gleicht die Listbox mit dem Viewport ab; nur abweichende Zeilen kosten Tk-Aufrufe."""
+        if self._render_id is not None:
+            self.after_cancel(self._render_id)
+            self._render_id = None
+        total = len(self._items)
+        max_offset = max(0, total - self._visible_rows)
+        self._offset = min(max(0, self._offset), max_offset)
+
+        end = min(total, self._offset + self._visible_rows)
+        wanted = [self._row(self._items[i]) for i in range(self._offset, end)]
+
+        for pos, row in enumerate(wanted):
+            if pos < len(self._shown):
+                if self._shown[pos] != row:
+                    self.listbox.delete(pos)
+                    self.listbox.insert(pos, row)
+                    self._shown[pos] = row
+            else:
+                self.listbox.insert(tk.END, row)
+                self._shown.append(row)
+        if len(self._shown) > len(wanted):
+            self.listbox.delete(len(wanted), tk.END)
+            del self._shown[len(wanted):]
+
+        self.listbox.selection_clear(0, tk.END)
+        if self._selected is not None and self._offset <= self._selected < end:
+            pos = self._selected - self._offset
+            self.listbox.selection_set(pos)
+            self.listbox.activate(pos)
+        self.listbox.yview_moveto(0)
+
+        if total:
+            self._scrollbar.set(self._offset / total, end / total)
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+    # ------------------------------------------------------------------
+    # Event-Handler
+    # ------------------------------------------------------------------
+    def _on_configure(self, event) -> None:
+        linespace = tkfont.Font(font=self.listbox.cget("font")).metrics("linespace")
+        rows = max(1, event.height // max(1, linespace))
+        if rows != self._visible_rows:
+            self._visible_rows = rows
+            self._render()
+
+    def _on_select(self, _event) -> None:
+        selection = self.listbox.curselection()
+        self._selected = self._offset + selection[0] if selection else None
+
+    def _on_scroll(self, *args: str) -> None:
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._offset = int(float(args[1]) * len(self._items))
+            self._render()
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(1, self._visible_rows - 1)
+            self._scroll_by(step)
+
+    def _on_mousewheel(self, event) -> str:
+        self._scroll_by(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _scroll_by(self, rows: int) -> str:
+        self._offset += rows
+        self._render()
+        return "break"
+
+    def _move_selection(self, delta: int) -> str:
+        if not len(self._items):
+            return "break"
+        current = self._selected if self._selected is not None else self._offset - delta
+        self._selected = min(max(0, current + delta), len(self._items) - 1)
+        self.see(self._selected)
+        self.listbox.event_generate("<<ListboxSelect>>")
+        return "break"
@@ -14,13 +14,17 @@ from __future__ import annotations
 import tkinter as tk
 
 from .gui import ShoppingListApp
-from .persistence import TxtFileHandler
+from .fastload import ParallelTxtFileHandler
+from .session import default_session_path
+from .catalog import PriceCatalog, default_catalog_path
 
 
 def main() -> None:
     root = tk.Tk()
-    file_strategy = TxtFileHandler()
-    ShoppingListApp(root, file_strategy)
+    # Große Exporte werden parallel geparst, kleine Dateien wie gewohnt sequentiell.
+    file_strategy = ParallelTxtFileHandler()
+    catalog = PriceCatalog(default_catalog_path())
+    ShoppingListApp(root, file_strategy, session_path=default_session_path(), catalog=catalog)
     root.mainloop()
 
 
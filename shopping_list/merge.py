@@ -0,0 +1,236 @@
+"""merge.py
+------------------------------------------------------------------------------
+Merge-Index für das Zusammenführen von Items.
+
+Problem:
+Beim Import wurde für jedes neue Item die komplette Liste durchsucht
+(gleicher Name, gleicher Typ, Preis innerhalb der Toleranz). Zusätzlich hat die
+Namenskollisions-Behandlung für jeden "#N"-Versuch alle Namen neu gesammelt.
+Bei großen Listen ergibt das quadratische Laufzeit.
+
+Lösung:
+- Hash-Index über (Name, konkreter Typ, quantisierter Preis).
+  Da die Toleranz (< 0.001) nicht exakt auf Buckets passt, werden jeweils der
+  eigene und die beiden Nachbar-Buckets geprüft. Die eigentliche Entscheidung
+  trifft weiterhin der exakte Toleranzvergleich.
+- Namenszähler (Multiset) plus ein Suffix-Zähler pro Basisname, damit die
+  Suche nach dem nächsten freien "#N" nicht jedes Mal bei 2 beginnt.
+- MergeService bündelt die Merge-Regeln ohne GUI-Abhängigkeit, damit GUI und
+  Kommandozeile (cli.py) exakt gleich zusammenführen. Er arbeitet auf einer
+  ShoppingList und hält seinen Index über deren Events synchron – auch wenn
+  die Liste von anderer Stelle geändert wird.
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .models import INSERT, REMOVE, RESET, ListEvent, ShoppingItem, ShoppingList, WeightedItem
+
+PRICE_TOLERANCE = 0.001
+
+_SUFFIX_RE = re.compile(r"^(.*) #([0-9]+)$", re.DOTALL)
+
+# (Name, konkreter Typ, Bucket bzw. bei riesigen Preisen der Preis selbst)
+_Key = Tuple[str, type, Union[int, float]]
+
+
+def price_bucket(price: float) -> Optional[int]:
+    """Quantisiert einen Preis auf die Toleranz-Auflösung.
+
+    Nicht-endliche Preise (nan, inf) sind nach dem Toleranzvergleich nie gleich
+    und bekommen deshalb keinen Bucket. Ebenso Preise, deren Quotient nicht mehr
+    endlich ist (Betrag über ca. 1.8e305).
+    """
+    quotient = price / PRICE_TOLERANCE
+    if not math.isfinite(quotient):
+        return None
+    return math.floor(quotient)
+
+
+def _index_key(item: ShoppingItem) -> Optional[_Key]:
+    """Schlüssel, unter dem ein Item im MergeIndex liegt (None = wird nie gemergt).
+
+    Riesige, aber endliche Preise haben keinen Bucket. Innerhalb der Toleranz liegt
+    dort nur exakt derselbe Preis, also dient der Preis selbst als Schlüssel.
+    """
+    price = item.price_per_unit
+    bucket = price_bucket(price)
+    if bucket is not None:
+        return (item.name, type(item), bucket)
+    if math.isfinite(price):
+        return (item.name, type(item), price)
+    return None
+
+
+class MergeIndex:
+    """Index über die Items einer Liste, muss synchron zu `items` gehalten werden.
+
+    Args:
+        items: Die Liste, deren Items indexiert werden. Sie wird nur gelesen
+            (für die Reihenfolge bei mehreren Treffern).
+    """
+
+    def __init__(self, items: Sequence[ShoppingItem]):
+        self._items = items
+        self._buckets: Dict[_Key, List[ShoppingItem]] = {}
+        self._name_counts: Dict[str, int] = {}
+        self._next_suffix: Dict[str, int] = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item: ShoppingItem) -> None:
+        """Nimmt ein Item auf, das gerade zur Liste hinzugefügt wurde."""
+        key = _index_key(item)
+        if key is not None:
+            self._buckets.setdefault(key, []).append(item)
+        self._name_counts[item.name] = self._name_counts.get(item.name, 0) + 1
+
+    def discard(self, item: ShoppingItem) -> None:
+        """Entfernt ein Item, das gerade aus der Liste gelöscht wurde."""
+        key = _index_key(item)
+        if key is not None:
+            entries = self._buckets.get(key)
+            if entries is not None:
+                for pos, entry in enumerate(entries):
+                    if entry is item:
+                        del entries[pos]
+                        break
+                if not entries:
+                    del self._buckets[key]
+
+        name = item.name
+        count = self._name_counts.get(name, 0) - 1
+        if count > 0:
+            self._name_counts[name] = count
+            return
+        self._name_counts.pop(name, None)
+
+        # Ein frei gewordenes "Basis #N" muss beim nächsten Konflikt wieder vergeben werden.
+        match = _SUFFIX_RE.match(name)
+        if match is None:
+            return
+        base, digits = match.groups()
+        number = int(digits)
+        if number >= 2 and str(number) == digits and base in self._next_suffix:
+            self._next_suffix[base] = min(self._next_suffix[base], number)
+
+    def find_match(self, new_item: ShoppingItem) -> Optional[ShoppingItem]:
+        """Liefert das erste Item der Liste, in das `new_item` gemergt würde."""
+        key = _index_key(new_item)
+        if key is None:
+            return None
+
+        name, item_type, bucket = key
+        if isinstance(bucket, int):
+            keys = [(name, item_type, neighbour) for neighbour in (bucket - 1, bucket, bucket + 1)]
+        else:
+            keys = [key]
+
+        matches: List[ShoppingItem] = []
+        for neighbour_key in keys:
+            for existing_item in self._buckets.get(neighbour_key, ()):
+                if abs(existing_item.price_per_unit - new_item.price_per_unit) < PRICE_TOLERANCE:
+                    matches.append(existing_item)
+
+        if len(matches) <= 1:
+            return matches[0] if matches else None
+
+        # Selten (nur ohne Kollisions-Umbenennung möglich): Listenreihenfolge entscheidet.
+        candidates = {id(m) for m in matches}
+        for item in self._items:
+            if id(item) in candidates:
+                return item
+        return None
+
+    def contains_name(self, name: str) -> bool:
+        return name in self._name_counts
+
+    def unique_name(self, name: str) -> str:
+        """Liefert `name` oder – falls vergeben – den ersten freien Namen "name #N" (N >= 2)."""
+        if name not in self._name_counts:
+            return name
+
+        counter = self._next_suffix.get(name, 2)
+        new_name = f"{name} #{counter}"
+        while new_name in self._name_counts:
+            counter += 1
+            new_name = f"{name} #{counter}"
+
+        self._next_suffix[name] = counter
+        return new_name
+
+
+class MergeResult(NamedTuple):
+    """Ergebnis von MergeService.merge."""
+
+    first_new_index: int
+    """Index des ersten neu angehängten Items (= alte Länge der Liste)."""
+    updated: List[ShoppingItem]
+    """Schon vorher vorhandene Items, deren Menge erhöht wurde (ohne Duplikate)."""
+    total_delta: float
+    """Änderung des Gesamtpreises der Liste."""
+
+
+class MergeService:
+    """Merge- und Kollisionsregeln einer Liste, unabhängig von der GUI.
+
+    Args:
+        items: Liste, die zusammengeführt wird (wird in-place verändert).
+    """
+
+    def __init__(self, items: Optional[ShoppingList] = None):
+        self.items: ShoppingList = items if items is not None else ShoppingList()
+        self.index = MergeIndex(self.items)
+        self._unsubscribe = self.items.subscribe(self._on_list_changed)
+
+    def close(self) -> None:
+        """Meldet den Service von der Liste ab (der Index wird danach nicht mehr gepflegt)."""
+        self._unsubscribe()
+
+    def _on_list_changed(self, event: ListEvent) -> None:
+        if event.kind == INSERT:
+            for item in event.items:
+                self.index.add(item)
+        elif event.kind == REMOVE:
+            for item in event.items:
+                self.index.discard(item)
+        elif event.kind == RESET:
+            self.index = MergeIndex(self.items)
+
+    def merge(self, new_items: Iterable[ShoppingItem]) -> MergeResult:
+        """Gleiche Items (Name, Typ, Preis) erhöhen die Menge, alle anderen werden angehängt."""
+        first_new_index = len(self.items)
+        updated: Dict[int, ShoppingItem] = {}
+        appended: set = set()
+        total_delta = 0.0
+
+        for new_item in new_items:
+            existing_item = self.index.find_match(new_item)
+
+            if existing_item is not None:
+                if isinstance(new_item, WeightedItem):
+                    amount_to_add = new_item.weight
+                else:
+                    amount_to_add = new_item.quantity  # type: ignore[attr-defined]
+                total_delta += self.items.add_amount(existing_item, amount_to_add)
+                if id(existing_item) not in appended:
+                    updated[id(existing_item)] = existing_item
+            else:
+                self.resolve_name_collision(new_item)
+                self.items.append(new_item)
+                appended.add(id(new_item))
+                total_delta += new_item.calculate_total()
+
+        return MergeResult(first_new_index, list(updated.values()), total_delta)
+
+    def resolve_name_collision(self, new_item: ShoppingItem) -> None:
+        """Benennt `new_item` in "Name #N" um, falls der Name schon vergeben ist."""
+        new_item.name = self.index.unique_name(new_item.name)
+
+    def remove(self, index: int) -> ShoppingItem:
+        """Entfernt das Item an `index` und gibt es zurück."""
+        return self.items.pop(index)
@@ -10,17 +10,26 @@ Konzepte:
 - Vererbung: CountedItem und WeightedItem erben Eigenschaften von ShoppingItem.
 - Polymorphismus: Beide Unterklassen haben die GLEICHEN Methoden (calculate_total),
   verhalten sich aber unterschiedlich. Das erlaubt der GUI, sie gleich zu behandeln.
+- __slots__: Die Attribute liegen in festen Slots statt in einem Instanz-Dict.
+  Das spart bei großen Listen pro Item deutlich Speicher.
+- Aggregat (ShoppingList): Besitzt die Items einer Liste, hält Gesamtpreis,
+  Teilsummen und Anzahl laufend aktuell und meldet jede Änderung als Event
+  (Observer). Niemand muss dafür die ganze Liste erneut durchlaufen.
 ------------------------------------------------------------------------------
 """
 
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
 
 class ShoppingItem(ABC):
     """Abstrakte Basisklasse für Einkaufsartikel."""
 
+    __slots__ = ("name", "price_per_unit")
+
     def __init__(self, name: str, price_per_unit: float):
         self.name = name
         self.price_per_unit = price_per_unit
@@ -44,6 +53,8 @@ class ShoppingItem(ABC):
 class CountedItem(ShoppingItem):
     """Konkrete Klasse für Artikel mit Stückzahl (z.B. 3 Gurken)."""
 
+    __slots__ = ("quantity",)
+
     def __init__(self, name: str, price_per_unit: float, quantity: int):
         super().__init__(name, price_per_unit)
         self.quantity = quantity
@@ -61,6 +72,8 @@ class CountedItem(ShoppingItem):
 class WeightedItem(ShoppingItem):
     """Konkrete Klasse für Artikel nach Gewicht (z.B. 2.5 kg Äpfel)."""
 
+    __slots__ = ("weight",)
+
     def __init__(self, name: str, price_per_unit: float, weight: float):
         super().__init__(name, price_per_unit)
         self.weight = weight
@@ -73,3 +86,242 @@ class WeightedItem(ShoppingItem):
 
     def add_amount(self, amount: float) -> None:
         self.weight += float(amount)
+
+
+# Arten von Listen-Events
+INSERT = "insert"
+REMOVE = "remove"
+UPDATE = "update"
+RESET = "reset"
+
+
+class ListEvent(NamedTuple):
+    """Eine Änderung an einer ShoppingList (wird nach der Änderung gemeldet)."""
+
+    kind: str
+    """INSERT, REMOVE, UPDATE oder RESET."""
+    index: int
+    """Position des (ersten) betroffenen Items; bei RESET immer 0."""
+    items: Tuple[ShoppingItem, ...]
+    """Eingefügte, entfernte bzw. geänderte Items (bei RESET: die neuen Items)."""
+    amount_delta: float
+    """Nur UPDATE: Änderung der Menge bzw. des Gewichts."""
+    total_delta: float
+    """Änderung des Gesamtpreises der Liste."""
+
+
+ListListener = Callable[[ListEvent], None]
+
+# Ab so vielen Verschiebungen baut ShoppingList.index_of seine Positionen neu auf.
+MAX_POSITION_SHIFTS = 256
+
+
+def item_type_key(item: ShoppingItem) -> str:
+    """"W" für Gewichtsartikel, sonst "C" (wie in der Exportdatei)."""
+    return "W" if isinstance(item, WeightedItem) else "C"
+
+
+class ShoppingList:
+    """Die Items einer Einkaufsliste plus laufend gepflegte Summen.
+
+    Alle Änderungen laufen über die Methoden dieser Klasse; danach werden die
+    registrierten Listener mit einem ListEvent aufgerufen. Gesamtpreis,
+    Teilsummen und Anzahlen werden dabei inkrementell angepasst.
+
+    Args:
+        items: Anfangsbestand (erzeugt kein Event)
+    """
+
+    def __init__(self, items: Iterable[ShoppingItem] = ()):
+        self._items: List[ShoppingItem] = []
+        self._listeners: Tuple[ListListener, ...] = ()
+        # id(item) -> Index zum Zeitpunkt des Aufbaus; wird erst bei Bedarf aufgebaut.
+        # Spätere Verschiebungen stehen als (ab Index, Delta) in _shifts und werden
+        # beim Nachschlagen angewendet; nach dem Aufbau eingefügte Items stehen mit
+        # (Index, Anzahl bekannter Verschiebungen) in _inserted.
+        self._positions: Optional[Dict[int, int]] = None
+        self._shifts: List[Tuple[int, int]] = []
+        self._inserted: Dict[int, Tuple[int, int]] = {}
+        self._reset_aggregates()
+        for item in items:
+            self._items.append(item)
+            self._account(item, 1)
+
+    # ------------------------------------------------------------------
+    # Lesen
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[ShoppingItem]:
+        return iter(self._items)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[ShoppingItem, List[ShoppingItem]]:
+        return self._items[index]
+
+    def index_of(self, item: ShoppingItem) -> int:
+        """Position von `item` (Identität, nicht Gleichheit); ValueError, falls nicht enthalten."""
+        if self._positions is None:
+            self._positions = {id(entry): pos for pos, entry in enumerate(self._items)}
+            self._shifts = []
+            self._inserted = {}
+        key = id(item)
+        entry = self._inserted.get(key)
+        if entry is not None:
+            pos, known_shifts = entry
+        else:
+            pos = self._positions.get(key)  # type: ignore[assignment]
+            if pos is None:
+                raise ValueError(f"{item.name!r} ist nicht in der Liste")
+            known_shifts = 0
+        for start, delta in islice(self._shifts, known_shifts, None):
+            if pos >= start:
+                pos += delta
+        return pos
+
+    def total(self) -> float:
+        return self._total
+
+    def subtotals(self) -> Dict[str, float]:
+        """Summe je Typ: {"C": Stückartikel, "W": Gewichtsartikel}."""
+        return dict(self._subtotals)
+
+    def counts(self) -> Dict[str, int]:
+        """Anzahl Items je Typ: {"C": ..., "W": ...}."""
+        return dict(self._counts)
+
+    # ------------------------------------------------------------------
+    # Beobachter
+    # ------------------------------------------------------------------
+    def subscribe(self, listener: ListListener) -> Callable[[], None]:
+        """Registriert `listener`; der Rückgabewert meldet ihn wieder ab."""
+        self._listeners += (listener,)
+
+        def unsubscribe() -> None:
+            self._listeners = tuple(entry for entry in self._listeners if entry is not listener)
+
+        return unsubscribe
+
+    def _emit(self, event: ListEvent) -> None:
+        for listener in self._listeners:
+            listener(event)
+
+    # ------------------------------------------------------------------
+    # Ändern
+    # ------------------------------------------------------------------
+    def append(self, item: ShoppingItem) -> None:
+        self.insert(len(self._items), item)
+
+    def extend(self, items: Iterable[ShoppingItem]) -> None:
+        """Hängt mehrere Items an und meldet sie als ein einziges INSERT-Event."""
+        self.insert_many(len(self._items), items)
+
+    def insert(self, index: int, item: ShoppingItem) -> None:
+        self.insert_many(index, (item,))
+
+    def insert_many(self, index: int, items: Iterable[ShoppingItem]) -> None:
+        """Fügt mehrere Items ab `index` ein (ein INSERT-Event)."""
+        size = len(self._items)
+        index = max(0, min(index + size if index < 0 else index, size))
+        added = tuple(items)
+        if not added:
+            return
+        self._items[index:index] = added
+        if self._positions is not None:
+            if index < size:
+                self._shift_positions(index, len(added))
+            if self._positions is not None:
+                if self._shifts:
+                    stamp = len(self._shifts)
+                    for offset, item in enumerate(added):
+                        self._inserted[id(item)] = (index + offset, stamp)
+                else:
+                    for offset, item in enumerate(added):
+                        self._positions[id(item)] = index + offset
+        delta = 0.0
+        for item in added:
+            delta += self._account(item, 1)
+        self._emit(ListEvent(INSERT, index, added, 0.0, delta))
+
+    def pop(self, index: int = -1) -> ShoppingItem:
+        size = len(self._items)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("pop index out of range")
+        return self.delete(index, 1)[0]
+
+    def delete(self, index: int, count: int) -> Tuple[ShoppingItem, ...]:
+        """Entfernt `count` Items ab `index` (ein REMOVE-Event) und gibt sie zurück."""
+        size = len(self._items)
+        removed = tuple(self._items[index:index + count])
+        if not removed:
+            return removed
+        del self._items[index:index + len(removed)]
+        if self._positions is not None:
+            for item in removed:
+                self._positions.pop(id(item), None)
+                self._inserted.pop(id(item), None)
+            if index + len(removed) < size:
+                self._shift_positions(index + len(removed), -len(removed))
+        delta = 0.0
+        for item in removed:
+            delta += self._account(item, -1)
+        self._emit(ListEvent(REMOVE, index, removed, 0.0, delta))
+        return removed
+
+    def _shift_positions(self, start: int, delta: int) -> None:
+        """Merkt sich, dass alle Items ab `start` um `delta` verschoben wurden."""
+        if len(self._shifts) >= MAX_POSITION_SHIFTS:
+            # Zu viele offene Verschiebungen: beim nächsten index_of neu aufbauen.
+            self._positions = None
+            return
+        self._shifts.append((start, delta))
+
+    def add_amount(self, item: ShoppingItem, amount: float) -> float:
+        """Erhöht die Menge von `item` (muss enthalten sein); liefert die Preisänderung."""
+        index = self.index_of(item)
+        old_total = item.calculate_total()
+        old_amount = item.weight if isinstance(item, WeightedItem) else item.quantity  # type: ignore[attr-defined]
+        item.add_amount(amount)
+        new_amount = item.weight if isinstance(item, WeightedItem) else item.quantity  # type: ignore[attr-defined]
+        delta = item.calculate_total() - old_total
+        self._total += delta
+        self._subtotals[item_type_key(item)] += delta
+        self._emit(ListEvent(UPDATE, index, (item,), new_amount - old_amount, delta))
+        return delta
+
+    def reset(self, items: Iterable[ShoppingItem] = ()) -> None:
+        """Ersetzt den kompletten Inhalt (ein RESET-Event)."""
+        old_total = self._total
+        self._items = list(items)
+        self._positions = None
+        self._reset_aggregates()
+        for item in self._items:
+            self._account(item, 1)
+        self._emit(ListEvent(RESET, 0, tuple(self._items), 0.0, self._total - old_total))
+
+    def clear(self) -> None:
+        self.reset()
+
+    # ------------------------------------------------------------------
+    # Summen
+    # ------------------------------------------------------------------
+    def _reset_aggregates(self) -> None:
+        self._total = 0.0
+        self._subtotals: Dict[str, float] = {"C": 0.0, "W": 0.0}
+        self._counts: Dict[str, int] = {"C": 0, "W": 0}
+
+    def _account(self, item: ShoppingItem, sign: int) -> float:
+        """Bucht ein Item ein (+1) oder aus (-1); liefert die Änderung des Gesamtpreises."""
+        key = item_type_key(item)
+        delta = sign * item.calculate_total()
+        self._counts[key] += sign
+        self._subtotals[key] += delta
+        self._total += delta
+        # Rundungsreste nicht stehen lassen: leere Liste bzw. leerer Typ ist exakt 0.
+        if not self._counts[key]:
+            self._subtotals[key] = 0.0
+        if not self._items:
+            self._total = 0.0
+        return delta
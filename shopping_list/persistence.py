@@ -1,20 +1,124 @@
 """persistence.py
 ------------------------------------------------------------------------------
 Persistenz-Layer (Speichern & Laden).
+
+Das Textformat gibt es auch komprimiert (.gz, .bz2, .xz; Standardbibliothek).
+Beim Schreiben entscheidet die Dateiendung, beim Lesen die Kennung am
+Dateianfang (Magic Bytes) – eine komprimierte Datei wird also auch mit
+falscher Endung gelesen. Beides läuft gestreamt.
 ------------------------------------------------------------------------------
 """
 
 from __future__ import annotations
 
+import bz2
+import gzip
+import lzma
+import mmap
+import os
+import pathlib
+import sqlite3
+import struct
+import sys
+import zlib
 from abc import ABC, abstractmethod
-from typing import List
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from .models import ShoppingItem, ShoppingList, WeightedItem
+from .factories import ItemFactory, ItemValidationError
+from .instrumentation import timed
+from .merge import MergeService, price_bucket
+from .store import ItemStore, Row
+
+T = TypeVar("T")
+
+BINARY_SUFFIX = ".slb"
+BINARY_MAGIC = b"SLB1"
+BINARY_VERSION = 1
+
+# magic, version, reserviert, anzahl_records, anzahl_namen, offset_namen, gesamtpreis
+_BIN_HEADER = struct.Struct("<4sHHQQQd")
+# typ, namensindex, menge, einzelpreis
+_BIN_RECORD = struct.Struct("<BxxxIdd")
+_BIN_OFFSETS = struct.Struct("<QQ")
+_BIN_WRITE_BUFFER = 1 << 20
+
+SQLITE_SUFFIXES = (".sqlite", ".db")
+
+# Dateiendung -> Kompression des Textformats
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma"}
+# Standard-Kompressionsstufe je Verfahren (gzip/bz2: 1-9, lzma: Preset 0-9)
+DEFAULT_COMPRESSION_LEVELS = {"gzip": 6, "bz2": 9, "lzma": 3}
+# Fehler beim Dekomprimieren, die nicht von IOError abgeleitet sind (z.B. abgeschnittene Datei)
+COMPRESSION_ERRORS = (EOFError, lzma.LZMAError, zlib.error)
+_COMPRESSION_MAGIC = ((b"\x1f\x8b", "gzip"), (b"BZh", "bz2"), (b"\xfd7zXZ\x00", "lzma"))
+
+
+def detect_compression(filename: str) -> Optional[str]:
+    """Kompression anhand der ersten Bytes ("gzip", "bz2", "lzma") oder None."""
+    with open(filename, "rb") as f:
+        head = f.read(6)
+    for magic, compression in _COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
 
-from .models import ShoppingItem, WeightedItem
-from .factories import ItemFactory
+
+def open_text(filename: str, mode: str = "r", compression: Optional[str] = None, level: Optional[int] = None):
+    """Öffnet eine (ggf. komprimierte) UTF-8-Textdatei als Stream.
+
+    Beim Lesen wird die Kompression erkannt; beim Schreiben gilt `compression`
+    (None = unkomprimiert) mit `level` (None = DEFAULT_COMPRESSION_LEVELS).
+    """
+    if mode == "r":
+        compression = detect_compression(filename)
+    if compression is None:
+        return open(filename, mode, encoding="utf-8")
+    text_mode = mode + "t"
+    if mode == "r":
+        if compression == "gzip":
+            return gzip.open(filename, text_mode, encoding="utf-8")
+        if compression == "bz2":
+            return bz2.open(filename, text_mode, encoding="utf-8")
+        return lzma.open(filename, text_mode, encoding="utf-8")
+
+    if level is None:
+        level = DEFAULT_COMPRESSION_LEVELS[compression]
+    if compression == "gzip":
+        return gzip.open(filename, text_mode, compresslevel=level, encoding="utf-8")
+    if compression == "bz2":
+        return bz2.open(filename, text_mode, compresslevel=level, encoding="utf-8")
+    if compression == "lzma":
+        return lzma.open(filename, text_mode, preset=level, encoding="utf-8")
+    raise ValueError(f"Unbekannte Kompression: {compression}")
+
+
+def iter_rows(items: Iterable[ShoppingItem]) -> Iterator[Row]:
+    """Liefert (ist_gewichtsartikel, name, menge, einzelpreis) je Item."""
+    if isinstance(items, ItemStore):
+        yield from items.rows()
+        return
+    for item in items:
+        if isinstance(item, WeightedItem):
+            yield True, item.name, item.weight, item.price_per_unit
+        else:
+            yield False, item.name, getattr(item, "quantity", 0), item.price_per_unit
+
+
+def list_total(items: Iterable[ShoppingItem], streamed_total: float) -> float:
+    """Gesamtpreis für Fußzeile/Header: bei einer ShoppingList die gepflegte Summe
+    (identisch mit der GUI-Anzeige), sonst die beim Schreiben mitgezählte."""
+    return items.total() if isinstance(items, ShoppingList) else streamed_total
 
 
 class FileHandler(ABC):
-    """Abstraktes Interface für Speichern/Laden (Strategy)."""
+    """Abstraktes Interface für Speichern/Laden (Strategy).
+
+    `iter_load` und `save_stream` sind die Streaming-Varianten. Die
+    Standard-Implementierungen greifen auf `load`/`save` zurück; Strategien,
+    die wirklich streamen können, überschreiben sie.
+    """
 
     @abstractmethod
     def save(self, items: List[ShoppingItem], filename: str) -> None:
@@ -24,6 +128,28 @@ class FileHandler(ABC):
     def load(self, filename: str) -> List[ShoppingItem]:
         raise NotImplementedError
 
+    def iter_load(self, filename: str) -> Iterator[ShoppingItem]:
+        """Liefert die Items einer Datei nacheinander."""
+        yield from self.load(filename)
+
+    def save_stream(self, items: Iterable[ShoppingItem], filename: str) -> None:
+        """Speichert Items aus einem beliebigen Iterable (z.B. Generator)."""
+        self.save(list(items), filename)
+
+
+def iter_batches(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Teilt ein Iterable in Listen mit höchstens `size` Elementen."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+# (Namen, ist_gewichtsartikel, Mengen, Preise, Zeilennummern) eines Blocks von Zeilen
+ColumnBlock = Tuple[List[str], List[bool], List[Any], List[Any], List[int]]
+
 
 class TxtFileHandler(FileHandler):
     """Speichert Items in einem Pipe-getrennten Format: TYP|NAME|MENGE|PREIS.
@@ -31,17 +157,29 @@ class TxtFileHandler(FileHandler):
     # Gesamtpreis|<wert>
     """
 
-    def save(self, items: List[ShoppingItem], filename: str) -> None:
-        try:
-            total_sum = sum(item.calculate_total() for item in items)
+    # Zeilen pro write()-Aufruf beim Speichern
+    WRITE_BATCH_SIZE = 1000
+    # Zeilen pro Block beim Laden (ein create_items-Aufruf je Block)
+    LOAD_BATCH_SIZE = 5000
 
-            # Spaltenbreiten (kannst du anpassen)
-            type_w = 3
-            name_w = 25
-            amount_w = 10
-            price_w = 12
+    # Spaltenbreiten (kannst du anpassen)
+    type_w = 3
+    name_w = 25
+    amount_w = 10
+    price_w = 12
 
-            with open(filename, "w", encoding="utf-8") as f:
+    @timed("TxtFileHandler.save")
+    def save(self, items: Sequence[ShoppingItem], filename: str) -> None:
+        self.save_stream(items, filename)
+
+    @timed("TxtFileHandler.save_stream")
+    def save_stream(self, items: Iterable[ShoppingItem], filename: str) -> None:
+        """Schreibt in einem einzigen Durchlauf; der Gesamtpreis wird dabei mitgezählt."""
+        type_w, name_w, amount_w, price_w = self.type_w, self.name_w, self.amount_w, self.price_w
+        try:
+            total_sum = 0.0
+
+            with self._open_for_writing(filename) as f:
                 header = (
                     f"{'Typ':<{type_w}}|"
                     f"{'Name':<{name_w}}|"
@@ -50,60 +188,597 @@ class TxtFileHandler(FileHandler):
                 )
                 f.write(header + "\n")
 
-                for item in items:
-                    if isinstance(item, WeightedItem):
+                lines: List[str] = []
+                for is_weighted, name, amount_val, price_val in iter_rows(items):
+                    if is_weighted:
                         typ = "W"
-                        amount = f"{item.weight:.3f}"
-                        price = f"{item.price_per_unit:.2f}"
+                        amount = f"{amount_val:.3f}"
                     else:
                         typ = "C"
-                        qty = item.quantity if hasattr(item, "quantity") else 0
-                        amount = f"{qty:d}"
-                        price = f"{item.price_per_unit:.2f}"
+                        amount_val = int(amount_val)
+                        amount = f"{amount_val:d}"
+                    price = f"{price_val:.2f}"
+                    total_sum += amount_val * price_val
 
-                    line = (
+                    lines.append(
                         f"{typ:<{type_w}}|"
-                        f"{item.name:<{name_w}}|"
+                        f"{name:<{name_w}}|"
                         f"{amount:>{amount_w}}|"
-                        f"{price:>{price_w}}"
+                        f"{price:>{price_w}}\n"
                     )
-                    f.write(line + "\n")
+                    if len(lines) >= self.WRITE_BATCH_SIZE:
+                        f.write("".join(lines))
+                        lines.clear()
 
-                f.write(f"# Gesamtpreis|{total_sum:.2f}\n")
+                f.write("".join(lines))
+                f.write(f"# Gesamtpreis|{list_total(items, total_sum):.2f}\n")
 
-        except IOError as e:
+        except (IOError, *COMPRESSION_ERRORS) as e:
             print(f"Fehler beim Speichern: {e}")
             raise
 
+    def _open_for_writing(self, filename: str):
+        return open_text(filename, "w")
+
+    @timed("TxtFileHandler.load")
     def load(self, filename: str) -> List[ShoppingItem]:
+        """Lädt die ganze Datei; ungültige Zeilen werden gesammelt und gemeinsam gemeldet."""
         items: List[ShoppingItem] = []
+        errors: List[Tuple[int, str]] = []
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                for raw in f:
-                    line = raw.strip()
-                    if not line:
-                        continue
+            for columns in self._iter_columns(filename):
+                try:
+                    items.extend(ItemFactory.create_items(*columns))
+                except ItemValidationError as e:
+                    errors.extend(e.errors)
+            if errors:
+                raise ItemValidationError(errors)
+            return items
 
-                    # Kopfzeile / Footer / Kommentare ignorieren
-                    if line.startswith("Typ|"):
-                        continue
-                    if line.startswith("#"):
-                        continue
+        except (IOError, ValueError, *COMPRESSION_ERRORS) as e:
+            print(f"Fehler beim Laden: {e}")
+            raise
+
+    @timed("TxtFileHandler.iter_load")
+    def iter_load(self, filename: str) -> Iterator[ShoppingItem]:
+        """Liefert die Items blockweise erzeugt; bricht beim ersten Block mit Fehlern ab."""
+        try:
+            for columns in self._iter_columns(filename):
+                yield from ItemFactory.create_items(*columns)
 
-                    parts = [p.strip() for p in line.split("|")]
-                    if len(parts) != 4:
+        except (IOError, ValueError, *COMPRESSION_ERRORS) as e:
+            print(f"Fehler beim Laden: {e}")
+            raise
+
+    def _iter_columns(self, filename: str) -> Iterator[ColumnBlock]:
+        """Liest die Datei in Blöcken von LOAD_BATCH_SIZE Zeilen, als Spalten plus Zeilennummern.
+
+        `load` und `iter_load` laufen beide hierüber; Unterklassen (z.B. der
+        parallele Lader) überschreiben nur diese Methode.
+        """
+        # Komprimierte Dateien werden am Dateianfang erkannt, unabhängig von der Endung.
+        with open_text(filename, "r") as f:
+            line_number = 0
+            while True:
+                lines = list(islice(f, self.LOAD_BATCH_SIZE))
+                if not lines:
+                    return
+                names: List[str] = []
+                flags: List[bool] = []
+                amounts: List[str] = []
+                prices: List[str] = []
+                row_numbers: List[int] = []
+                for raw in lines:
+                    line_number += 1
+                    fields = split_line(raw)
+                    if fields is None:
                         continue
+                    flags.append(fields[0])
+                    names.append(fields[1])
+                    amounts.append(fields[2])
+                    prices.append(fields[3])
+                    row_numbers.append(line_number)
+                if names:
+                    yield names, flags, amounts, prices, row_numbers
+
+
+class CompressedTxtFileHandler(TxtFileHandler):
+    """Textformat mit gzip-, bz2- oder lzma-Kompression (gestreamt).
+
+    Args:
+        compression: "gzip", "bz2" oder "lzma"
+        level: Kompressionsstufe (None = DEFAULT_COMPRESSION_LEVELS)
+    """
+
+    def __init__(self, compression: str = "gzip", level: Optional[int] = None):
+        if compression not in DEFAULT_COMPRESSION_LEVELS:
+            raise ValueError(f"Unbekannte Kompression: {compression}")
+        self.compression = compression
+        self.level = level
+
+    def _open_for_writing(self, filename: str):
+        return open_text(filename, "w", self.compression, self.level)
+
+
+def split_line(raw: str) -> Optional[Tuple[bool, str, str, str]]:
+    """Zerlegt eine Zeile im Format TYP|NAME|MENGE|PREIS, ohne Zahlen umzurechnen.
+
+    Returns:
+        (ist_gewichtsartikel, name, menge, preis) mit Menge/Preis als Text
+        (Dezimalkomma bereits durch Punkt ersetzt) oder None für Leer-, Kopf-,
+        Footer- und Kommentarzeilen sowie Zeilen ohne vier Spalten.
+    """
+    line = raw.strip()
+    if not line:
+        return None
+
+    # Kopfzeile / Footer / Kommentare ignorieren
+    if line.startswith("Typ|"):
+        return None
+    if line.startswith("#"):
+        return None
+
+    parts = [p.strip() for p in line.split("|")]
+    if len(parts) != 4:
+        return None
+
+    type_char, name, amount_str, price_str = parts
+    return type_char.upper() == "W", name, amount_str.replace(",", "."), price_str.replace(",", ".")
+
+
+def parse_line(raw: str) -> Optional[Tuple[str, bool, float, float]]:
+    """Zerlegt eine Zeile im Format TYP|NAME|MENGE|PREIS.
+
+    Returns:
+        (name, ist_gewichtsartikel, menge, preis) oder None (siehe `split_line`).
+
+    Raises:
+        ValueError: wenn Menge oder Preis keine Zahl sind.
+    """
+    fields = split_line(raw)
+    if fields is None:
+        return None
+    is_weighted, name, amount_str, price_str = fields
+    return name, is_weighted, float(amount_str), float(price_str)
+
+
+class BinaryListReader:
+    """Wahlfreier Lesezugriff auf eine Binärliste (siehe BinaryFileHandler).
+
+    Die Datei wird per mmap eingeblendet; Records werden mit struct direkt aus
+    dem Speicher gelesen, ohne die Datei zu kopieren oder komplett zu parsen.
+    """
+
+    def __init__(self, filename: str):
+        self._file = open(filename, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{filename}: leere Datei ist keine Binärliste")
+        self._view = memoryview(self._mm)
+        self._names: Dict[int, str] = {}
+        try:
+            self._read_header(filename)
+        except Exception:
+            self.close()
+            raise
+
+    def _read_header(self, filename: str) -> None:
+        if len(self._view) < _BIN_HEADER.size:
+            raise ValueError(f"{filename}: Datei ist zu kurz für eine Binärliste")
+        magic, version, _reserved, count, string_count, strings_offset, total = _BIN_HEADER.unpack_from(self._view)
+        if magic != BINARY_MAGIC:
+            raise ValueError(f"{filename}: keine Binärliste (falsche Kennung)")
+        if version != BINARY_VERSION:
+            raise ValueError(f"{filename}: nicht unterstützte Version {version}")
+
+        records_end = _BIN_HEADER.size + count * _BIN_RECORD.size
+        blob_offset = strings_offset + (string_count + 1) * 8
+        if records_end > strings_offset or blob_offset > len(self._view):
+            raise ValueError(f"{filename}: Binärliste ist unvollständig")
+
+        self._count = count
+        self._string_count = string_count
+        self._strings_offset = strings_offset
+        self._blob_offset = blob_offset
+        self.total: float = total
 
-                    type_char, name, amount_str, price_str = parts
-                    amount_val = float(amount_str.replace(",", "."))
-                    price_val = float(price_str.replace(",", "."))
-                    is_weighted = type_char.upper() == "W"
+    def close(self) -> None:
+        self._view.release()
+        self._mm.close()
+        self._file.close()
 
-                    item = ItemFactory.create_item(name, is_weighted, amount_val, price_val)
-                    items.append(item)
+    def __enter__(self) -> "BinaryListReader":
+        return self
 
-        except (IOError, ValueError) as e:
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def name(self, string_index: int) -> str:
+        cached = self._names.get(string_index)
+        if cached is not None:
+            return cached
+        if not 0 <= string_index < self._string_count:
+            raise ValueError(f"Ungültiger Namensindex {string_index}")
+        start, end = _BIN_OFFSETS.unpack_from(self._view, self._strings_offset + string_index * 8)
+        name = sys.intern(str(self._view[self._blob_offset + start:self._blob_offset + end], "utf-8"))
+        self._names[string_index] = name
+        return name
+
+    def row(self, index: int) -> Row:
+        """Liest genau einen Record (ist_gewichtsartikel, name, menge, einzelpreis)."""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("BinaryListReader index out of range")
+        type_flag, string_index, amount, price = _BIN_RECORD.unpack_from(
+            self._view, _BIN_HEADER.size + index * _BIN_RECORD.size
+        )
+        return bool(type_flag), self.name(string_index), amount, price
+
+    def __getitem__(self, index: int) -> ShoppingItem:
+        is_weighted, name, amount, price = self.row(index)
+        return ItemFactory.create_item(name, is_weighted, amount, price)
+
+    def iter_rows(self) -> Iterator[Row]:
+        records = self._view[_BIN_HEADER.size:_BIN_HEADER.size + self._count * _BIN_RECORD.size]
+        try:
+            for type_flag, string_index, amount, price in _BIN_RECORD.iter_unpack(records):
+                yield bool(type_flag), self.name(string_index), amount, price
+        finally:
+            records.release()
+
+
+class BinaryFileHandler(FileHandler):
+    """Kompaktes Binärformat mit Records fester Breite.
+
+    Aufbau (little endian):
+        Header      magic "SLB1", Version, Anzahl Records, Anzahl Namen,
+                    Offset der Namenstabelle, Gesamtpreis
+        Records     je 24 Bytes: Typ (0 = Stück, 1 = Gewicht), Namensindex,
+                    Menge (double), Einzelpreis (double)
+        Namen       (Anzahl + 1) Offsets, danach alle Namen UTF-8-kodiert
+
+    Jeder Name wird nur einmal gespeichert. Durch die feste Record-Breite kann
+    jedes Item über seinen Index gelesen werden (siehe `open`).
+    """
+
+    @timed("BinaryFileHandler.save")
+    def save(self, items: Sequence[ShoppingItem], filename: str) -> None:
+        self.save_stream(items, filename)
+
+    @timed("BinaryFileHandler.save_stream")
+    def save_stream(self, items: Iterable[ShoppingItem], filename: str) -> None:
+        try:
+            with open(filename, "wb") as f:
+                f.write(bytes(_BIN_HEADER.size))
+
+                names: Dict[str, int] = {}
+                total_sum = 0.0
+                count = 0
+                buffer = bytearray()
+                for is_weighted, name, amount, price in iter_rows(items):
+                    if not is_weighted:
+                        amount = int(amount)
+                    total_sum += amount * price
+                    string_index = names.setdefault(name, len(names))
+                    buffer += _BIN_RECORD.pack(1 if is_weighted else 0, string_index, amount, price)
+                    count += 1
+                    if len(buffer) >= _BIN_WRITE_BUFFER:
+                        f.write(buffer)
+                        buffer.clear()
+                f.write(buffer)
+
+                strings_offset = f.tell()
+                encoded = [name.encode("utf-8") for name in names]
+                offsets = [0]
+                for data in encoded:
+                    offsets.append(offsets[-1] + len(data))
+                f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+                f.write(b"".join(encoded))
+
+                f.seek(0)
+                f.write(_BIN_HEADER.pack(
+                    BINARY_MAGIC, BINARY_VERSION, 0, count, len(names), strings_offset, list_total(items, total_sum)
+                ))
+
+        except IOError as e:
+            print(f"Fehler beim Speichern: {e}")
+            raise
+
+    def open(self, filename: str) -> BinaryListReader:
+        """Öffnet die Datei für wahlfreien Zugriff (als Context Manager nutzbar)."""
+        return BinaryListReader(filename)
+
+    @timed("BinaryFileHandler.load")
+    def load(self, filename: str) -> List[ShoppingItem]:
+        return list(self.iter_load(filename))
+
+    @timed("BinaryFileHandler.iter_load")
+    def iter_load(self, filename: str) -> Iterator[ShoppingItem]:
+        try:
+            with self.open(filename) as reader:
+                for is_weighted, name, amount, price in reader.iter_rows():
+                    yield ItemFactory.create_item(name, is_weighted, amount, price)
+
+        except (IOError, ValueError, struct.error) as e:
             print(f"Fehler beim Laden: {e}")
             raise
 
-        return items
+
+class SqliteFileHandler(FileHandler):
+    """Speichert viele Listen in einer lokalen SQLite-Datenbank (eine Liste pro Tab).
+
+    - WAL-Modus, alle Schreibzugriffe gebündelt über executemany.
+    - Vor dem Schreiben wird die Liste mit MergeService zusammengeführt (gleiche
+      Regeln wie GUI und Kommandozeile: Preis-Toleranz, Umbenennung in "Name #N").
+      Damit ist der Name innerhalb einer Liste eindeutig und dient als Schlüssel.
+    - `save` gleicht die Liste mit der Datenbank ab und schreibt nur geänderte Zeilen.
+    - `merge` lädt die gespeicherte Liste, führt die neuen Items per MergeService
+      hinzu und gleicht das Ergebnis genauso wie `save` ab.
+    - Lesezugriffe (`load`, `list_names`) öffnen die Datei nur lesend und legen
+      weder Tabellen an noch ändern sie den Journal-Modus.
+
+    Args:
+        list_name: Name der Liste innerhalb der Datenbank
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS lists (
+            id   INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS items (
+            id        INTEGER PRIMARY KEY,
+            list_id   INTEGER NOT NULL REFERENCES lists(id) ON DELETE CASCADE,
+            pos       REAL NOT NULL,
+            name      TEXT NOT NULL,
+            type      TEXT NOT NULL,
+            price_key INTEGER,
+            price     REAL NOT NULL,
+            amount    REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS items_name ON items(list_id, name);
+        CREATE INDEX IF NOT EXISTS items_order ON items(list_id, pos);
+    """
+
+    def __init__(self, list_name: str = "Meine Liste"):
+        self.list_name = list_name
+        # (eingefügt, geändert, gelöscht) des letzten save()-Aufrufs
+        self.last_save_stats: Tuple[int, int, int] = (0, 0, 0)
+
+    def with_list(self, list_name: str) -> "SqliteFileHandler":
+        """Gleiche Strategie für eine andere Liste derselben Datenbank."""
+        return SqliteFileHandler(list_name)
+
+    # ------------------------------------------------------------------
+    # Verbindung
+    # ------------------------------------------------------------------
+    def _connect(self, filename: str) -> sqlite3.Connection:
+        """Verbindung zum Schreiben; legt bei Bedarf das Schema an."""
+        conn = sqlite3.connect(filename)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(self.SCHEMA)
+        return conn
+
+    @staticmethod
+    def _connect_readonly(filename: str) -> sqlite3.Connection:
+        """Verbindung nur zum Lesen; die Datei bleibt unverändert."""
+        uri = pathlib.Path(os.path.abspath(filename)).as_uri() + "?mode=ro"
+        return sqlite3.connect(uri, uri=True)
+
+    @staticmethod
+    def _has_schema(conn: sqlite3.Connection) -> bool:
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('lists', 'items')"
+        ).fetchone()
+        return count == 2
+
+    def _list_id(self, conn: sqlite3.Connection, create: bool) -> Optional[int]:
+        row = conn.execute("SELECT id FROM lists WHERE name = ?", (self.list_name,)).fetchone()
+        if row is not None:
+            return row[0]
+        if not create:
+            return None
+        return conn.execute("INSERT INTO lists(name) VALUES (?)", (self.list_name,)).lastrowid
+
+    def list_names(self, filename: str) -> List[str]:
+        """Alle Listen, die in der Datenbank gespeichert sind."""
+        conn = self._connect_readonly(filename)
+        try:
+            if not self._has_schema(conn):
+                return []
+            return [name for (name,) in conn.execute("SELECT name FROM lists ORDER BY name")]
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Speichern
+    # ------------------------------------------------------------------
+    @timed("SqliteFileHandler.save")
+    def save(self, items: Sequence[ShoppingItem], filename: str) -> None:
+        self.save_stream(items, filename)
+
+    @timed("SqliteFileHandler.save_stream")
+    def save_stream(self, items: Iterable[ShoppingItem], filename: str) -> None:
+        rows = self._merge_rows(items)
+        try:
+            conn = self._connect(filename)
+            try:
+                with conn:
+                    self.last_save_stats = self._sync(conn, rows)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Fehler beim Speichern: {e}")
+            raise
+
+    @staticmethod
+    def _merge_rows(items: Iterable[ShoppingItem], stored: Iterable[ShoppingItem] = ()) -> List[list]:
+        """[name, typ, preis_key, preis, menge] je Item nach MergeService-Regeln, in Listenreihenfolge.
+
+        `stored` sind die schon gespeicherten Items, in die `items` gemergt werden.
+        Gemergt wird auf Kopien, die übergebenen Items bleiben unverändert.
+        """
+        service = MergeService(ShoppingList(stored))
+        service.merge(ItemFactory.create_item(name, w, amount, price) for w, name, amount, price in iter_rows(items))
+        return [
+            [name, "W" if is_weighted else "C", price_bucket(price), price,
+             float(amount) if is_weighted else float(int(amount))]
+            for is_weighted, name, amount, price in iter_rows(service.items)
+        ]
+
+    def _sync(self, conn: sqlite3.Connection, rows: List[list]) -> Tuple[int, int, int]:
+        list_id = self._list_id(conn, create=True)
+        stored: Dict[str, tuple] = {}
+        to_delete: List[Tuple[int]] = []
+        for row_id, name, typ, price_key, price, amount, pos in conn.execute(
+            "SELECT id, name, type, price_key, price, amount, pos FROM items WHERE list_id = ? ORDER BY pos",
+            (list_id,),
+        ):
+            if name in stored:
+                # Ältere Datenbanken konnten einen Namen mehrfach enthalten.
+                to_delete.append((row_id,))
+            else:
+                stored[name] = (row_id, typ, price_key, price, amount, pos)
+
+        matches = [stored.pop(row[0], None) for row in rows]
+        to_delete.extend((entry[0],) for entry in stored.values())
+        positions = self._assign_positions([m[5] if m is not None else None for m in matches])
+
+        to_insert = []
+        to_update = []
+        for row, match, pos in zip(rows, matches, positions):
+            name, typ, price_key, price, amount = row
+            if match is None:
+                to_insert.append((list_id, pos, name, typ, price_key, price, amount))
+            elif match[1:] != (typ, price_key, price, amount, pos):
+                to_update.append((pos, typ, price_key, price, amount, match[0]))
+
+        conn.executemany("DELETE FROM items WHERE id = ?", to_delete)
+        conn.executemany(
+            "UPDATE items SET pos = ?, type = ?, price_key = ?, price = ?, amount = ? WHERE id = ?", to_update
+        )
+        conn.executemany(
+            "INSERT INTO items(list_id, pos, name, type, price_key, price, amount) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            to_insert,
+        )
+        return len(to_insert), len(to_update), len(to_delete)
+
+    @staticmethod
+    def _assign_positions(old_positions: List[Optional[float]]) -> List[float]:
+        """Behält möglichst viele alte Positionen und verteilt neue in die Lücken dazwischen.
+
+        Nur Zeilen, deren Position sich ändern muss (neu eingefügt oder
+        umsortiert), bekommen einen neuen Wert.
+        """
+        positions: List[Optional[float]] = []
+        last = float("-inf")
+        for pos in old_positions:
+            if pos is not None and pos > last:
+                positions.append(pos)
+                last = pos
+            else:
+                positions.append(None)
+
+        result: List[float] = []
+        index = 0
+        count = len(positions)
+        lower = 0.0
+        while index < count:
+            if positions[index] is not None:
+                lower = positions[index]
+                result.append(lower)
+                index += 1
+                continue
+            run_end = index
+            while run_end < count and positions[run_end] is None:
+                run_end += 1
+            run = run_end - index
+            if run_end < count:
+                upper = positions[run_end]
+                if index == 0:
+                    lower = upper - run - 1
+            else:
+                upper = lower + run + 1 if index else run + 1.0
+            step = (upper - lower) / (run + 1)
+            if step <= 1e-9:
+                # Lücke zu klein: komplett neu durchnummerieren.
+                return [float(i) for i in range(count)]
+            result.extend(lower + step * (k + 1) for k in range(run))
+            index = run_end
+        return result
+
+    def merge(self, items: Iterable[ShoppingItem], filename: str) -> None:
+        """Führt Items mit den Regeln von MergeService in die gespeicherte Liste zusammen."""
+        try:
+            conn = self._connect(filename)
+            try:
+                with conn:
+                    stored = list(self._iter_items(conn))
+                    self.last_save_stats = self._sync(conn, self._merge_rows(items, stored))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Fehler beim Speichern: {e}")
+            raise
+
+    # ------------------------------------------------------------------
+    # Laden
+    # ------------------------------------------------------------------
+    def _iter_items(self, conn: sqlite3.Connection, list_id: Optional[int] = None) -> Iterator[ShoppingItem]:
+        if list_id is None:
+            list_id = self._list_id(conn, create=False)
+            if list_id is None:
+                return
+        cursor = conn.execute("SELECT name, type, amount, price FROM items WHERE list_id = ? ORDER BY pos", (list_id,))
+        for name, typ, amount, price in cursor:
+            yield ItemFactory.create_item(name, typ == "W", amount, price)
+
+    @timed("SqliteFileHandler.load")
+    def load(self, filename: str) -> List[ShoppingItem]:
+        return list(self.iter_load(filename))
+
+    @timed("SqliteFileHandler.iter_load")
+    def iter_load(self, filename: str) -> Iterator[ShoppingItem]:
+        try:
+            if not os.path.exists(filename):
+                raise FileNotFoundError(filename)
+            conn = self._connect_readonly(filename)
+            try:
+                list_id = self._list_id(conn, create=False) if self._has_schema(conn) else None
+                if list_id is None:
+                    raise ValueError(f"Liste „{self.list_name}“ ist in {filename} nicht vorhanden")
+                yield from self._iter_items(conn, list_id)
+            finally:
+                conn.close()
+
+        except (IOError, ValueError, sqlite3.Error) as e:
+            print(f"Fehler beim Laden: {e}")
+            raise
+
+
+# Dateiendung -> Strategie. Alles andere wird mit der Standard-Strategie gelesen.
+_HANDLERS_BY_SUFFIX: Dict[str, Callable[[], FileHandler]] = {
+    BINARY_SUFFIX: BinaryFileHandler,
+    **{suffix: SqliteFileHandler for suffix in SQLITE_SUFFIXES},
+    **{
+        suffix: (lambda compression=compression: CompressedTxtFileHandler(compression))
+        for suffix, compression in COMPRESSION_SUFFIXES.items()
+    },
+}
+
+
+def handler_for_file(filename: str, default: FileHandler) -> FileHandler:
+    """Wählt die Speicher-Strategie anhand der Dateiendung."""
+    lowered = filename.lower()
+    for suffix, factory in _HANDLERS_BY_SUFFIX.items():
+        if lowered.endswith(suffix):
+            return factory()
+    return default
@@ -0,0 +1,196 @@
+"""search.py
+------------------------------------------------------------------------------
+Suche über alle Tabs während der Eingabe.
+
+Problem:
+Um herauszufinden, in welcher Liste "Tomaten" stehen, musste man jeden Tab
+durchscrollen. Eine naive Suche bei jedem Tastendruck würde alle Items aller
+Tabs durchlaufen (bei 1 Mio. Items zu langsam).
+
+Lösung:
+- Index über die Namen (casefold), nicht über die Items: Gleiche Namen teilen
+  sich einen Eintrag, der die zugehörigen Items (pro Tab) hält.
+- Präfixsuche über eine sortierte Namensliste (bisect). Neue Namen landen
+  zunächst in einem Puffer und werden erst bei der nächsten Suche einsortiert;
+  entfernte Namen bleiben bis zur nächsten Verdichtung als "veraltet" stehen.
+- Teilstring-Suche (ab 3 Zeichen) über einen Trigramm-Index: Geprüft werden
+  nur die Namen, die das seltenste Trigramm der Anfrage enthalten.
+- Der Index folgt den Events der ShoppingLists (Merge, Umbenennung bei
+  Namenskollision vor dem Einfügen, Entfernen) und wird nie neu aufgebaut.
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left
+from itertools import islice
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from .models import INSERT, REMOVE, RESET, ListEvent, ShoppingItem, ShoppingList
+
+# Standard-Obergrenze für die Anzahl der Treffer pro Anfrage
+DEFAULT_LIMIT = 200
+TRIGRAM = 3
+
+
+def fold(name: str) -> str:
+    """Normalisierte Schreibweise für Vergleiche (Groß/Klein, ß -> ss)."""
+    return name.casefold()
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + TRIGRAM] for i in range(len(text) - TRIGRAM + 1)}
+
+
+class SearchHit(NamedTuple):
+    source: Hashable
+    """Herkunft des Items (in der GUI: der Tab)."""
+    item: ShoppingItem
+
+
+class SearchIndex:
+    """Namensindex über beliebig viele ShoppingLists (Quellen)."""
+
+    def __init__(self) -> None:
+        # gefalteter Name -> {id(item): (quelle, item)}
+        self._entries: Dict[str, Dict[int, Tuple[Hashable, ShoppingItem]]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._sorted: List[str] = []
+        self._pending: List[str] = []
+        self._stale = 0
+        self._unsubscribe: Dict[int, Callable[[], None]] = {}
+
+    def __len__(self) -> int:
+        """Anzahl der indexierten Items."""
+        return sum(len(bucket) for bucket in self._entries.values())
+
+    # ------------------------------------------------------------------
+    # Quellen
+    # ------------------------------------------------------------------
+    def attach(self, source: Hashable, items: ShoppingList) -> None:
+        """Indexiert `items` und folgt ab jetzt ihren Änderungen."""
+        self.detach(source, items)
+        for item in items:
+            self.add(source, item)
+
+        def on_change(event: ListEvent) -> None:
+            if event.kind == INSERT:
+                for item in event.items:
+                    self.add(source, item)
+            elif event.kind == REMOVE:
+                for item in event.items:
+                    self.discard(item)
+            elif event.kind == RESET:
+                self._discard_source(source)
+                for item in event.items:
+                    self.add(source, item)
+
+        self._unsubscribe[id(source)] = items.subscribe(on_change)
+
+    def detach(self, source: Hashable, items: Iterable[ShoppingItem]) -> None:
+        """Entfernt alle Items einer Quelle und meldet den Index von ihr ab."""
+        unsubscribe = self._unsubscribe.pop(id(source), None)
+        if unsubscribe is None:
+            return
+        unsubscribe()
+        for item in items:
+            self.discard(item)
+
+    def _discard_source(self, source: Hashable) -> None:
+        for key in list(self._entries):
+            for item_id, (entry_source, item) in list(self._entries[key].items()):
+                if entry_source is source:
+                    self._remove_entry(key, item_id)
+
+    # ------------------------------------------------------------------
+    # Einzelne Items
+    # ------------------------------------------------------------------
+    def add(self, source: Hashable, item: ShoppingItem) -> None:
+        key = fold(item.name)
+        bucket = self._entries.get(key)
+        if bucket is None:
+            bucket = self._entries[key] = {}
+            for gram in trigrams(key):
+                self._trigrams.setdefault(gram, set()).add(key)
+            self._pending.append(key)
+        bucket[id(item)] = (source, item)
+
+    def discard(self, item: ShoppingItem) -> None:
+        key = fold(item.name)
+        if key in self._entries:
+            self._remove_entry(key, id(item))
+
+    def _remove_entry(self, key: str, item_id: int) -> None:
+        bucket = self._entries[key]
+        bucket.pop(item_id, None)
+        if bucket:
+            return
+        del self._entries[key]
+        for gram in trigrams(key):
+            names = self._trigrams.get(gram)
+            if names is not None:
+                names.discard(key)
+                if not names:
+                    del self._trigrams[gram]
+        self._stale += 1
+
+    # ------------------------------------------------------------------
+    # Suche
+    # ------------------------------------------------------------------
+    def _sorted_names(self) -> List[str]:
+        if self._stale > len(self._entries):
+            # Mehr veraltete als gültige Namen: komplett neu sortieren.
+            self._sorted = sorted(self._entries)
+            self._pending.clear()
+            self._stale = 0
+        elif self._pending:
+            # Timsort erkennt die bereits sortierte Folge und mischt den Puffer linear ein.
+            self._sorted.extend(sorted(self._pending))
+            self._sorted.sort()
+            self._pending.clear()
+        return self._sorted
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[SearchHit]:
+        """Treffer für `query`: zuerst Namen, die damit beginnen, dann (ab 3 Zeichen)
+        Namen, die es enthalten; jeweils alphabetisch."""
+        needle = fold(query.strip())
+        if not needle:
+            return []
+
+        hits: List[SearchHit] = []
+        seen: Set[str] = set()
+
+        names = self._sorted_names()
+        pos = bisect_left(names, needle)
+        while pos < len(names) and len(hits) < limit and names[pos].startswith(needle):
+            key = names[pos]
+            pos += 1
+            if key in seen or key not in self._entries:
+                continue
+            seen.add(key)
+            hits.extend(self._hits(key, limit - len(hits)))
+
+        if len(hits) < limit and len(needle) >= TRIGRAM:
+            # Jeder Name liefert mindestens einen Treffer: die `limit` kleinsten genügen.
+            matches = (key for key in self._contains(needle) if key not in seen)
+            for key in heapq.nsmallest(limit - len(hits), matches):
+                hits.extend(self._hits(key, limit - len(hits)))
+                if len(hits) >= limit:
+                    break
+        return hits
+
+    def _contains(self, needle: str) -> Iterator[str]:
+        """Alle Namen, die `needle` (mind. 3 Zeichen) enthalten."""
+        smallest: Optional[Set[str]] = None
+        for gram in trigrams(needle):
+            names = self._trigrams.get(gram)
+            if not names:
+                return iter(())
+            if smallest is None or len(names) < len(smallest):
+                smallest = names
+        # Nur die Namen des seltensten Trigramms prüfen; der Teilstring-Test ist exakt.
+        return (key for key in smallest if needle in key)  # type: ignore[union-attr]
+
+    def _hits(self, key: str, limit: int) -> List[SearchHit]:
+        return [SearchHit(source, item) for source, item in islice(self._entries[key].values(), limit)]
@@ -0,0 +1,130 @@
+"""session.py
+------------------------------------------------------------------------------
+Sitzung (Workspace): welche Tabs offen sind und wo ihre Daten liegen.
+
+Die Sitzung wird als JSON gespeichert. Jeder Tab hat eine Backing-Datei
+(Binärformat, siehe BinaryFileHandler), aus der er erst geladen wird, wenn er
+zum ersten Mal angezeigt wird. Unveränderte Tabs werden beim Speichern nicht
+angefasst.
+
+Zusammen mit den Backing-Dateien bildet die Sitzung einen Snapshot: Sie hält
+fest, bis zu welcher Journal-Nummer (siehe journal.py) Tab-Liste und
+Backing-Dateien aktuell sind.
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from typing import List, Optional
+
+from .persistence import BINARY_SUFFIX
+
+SESSION_VERSION = 1
+SESSION_FILENAME = "session.json"
+LISTS_DIRNAME = "lists"
+
+
+def default_session_dir() -> str:
+    """Verzeichnis der Sitzung (überschreibbar über SHOPPING_LIST_HOME)."""
+    return os.environ.get("SHOPPING_LIST_HOME") or os.path.join(os.path.expanduser("~"), ".shopping_list")
+
+
+def default_session_path() -> str:
+    return os.path.join(default_session_dir(), SESSION_FILENAME)
+
+
+class TabRecord:
+    """Ein Tab der Sitzung: stabile ID, angezeigter Name und Backing-Datei.
+
+    `seq` ist die letzte Journal-Nummer, die in der Backing-Datei enthalten ist.
+    """
+
+    __slots__ = ("tab_id", "name", "backing_file", "seq")
+
+    def __init__(
+        self, name: str, backing_file: Optional[str] = None, tab_id: Optional[str] = None, seq: int = 0
+    ):
+        self.tab_id = tab_id or uuid.uuid4().hex
+        self.name = name
+        self.backing_file = backing_file
+        self.seq = seq
+
+    def copy(self) -> "TabRecord":
+        return TabRecord(self.name, self.backing_file, self.tab_id, self.seq)
+
+    def to_dict(self) -> dict:
+        return {"id": self.tab_id, "name": self.name, "file": self.backing_file, "seq": self.seq}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TabRecord":
+        return cls(
+            name=data["name"], backing_file=data.get("file"), tab_id=data.get("id"), seq=int(data.get("seq", 0))
+        )
+
+
+class Session:
+    """Liste der offenen Tabs plus Index des ausgewählten Tabs."""
+
+    def __init__(
+        self, path: str, tabs: Optional[List[TabRecord]] = None, selected: int = 0, journal_seq: int = 0
+    ):
+        self.path = path
+        self.tabs: List[TabRecord] = tabs or []
+        self.selected = selected
+        self.journal_seq = journal_seq
+
+    @property
+    def lists_dir(self) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(self.path)), LISTS_DIRNAME)
+
+    def backing_file_for(self, tab_id: str, seq: Optional[int] = None) -> str:
+        """Standard-Pfad der Backing-Datei eines Tabs innerhalb der Sitzung.
+
+        Mit `seq` bekommt jeder Snapshot eine eigene Datei; die vorherige bleibt
+        gültig, bis die Sitzung auf die neue umgestellt ist.
+        """
+        suffix = f"-{seq}" if seq is not None else ""
+        return os.path.join(self.lists_dir, f"tab-{tab_id}{suffix}{BINARY_SUFFIX}")
+
+    @classmethod
+    def load(cls, path: str) -> "Session":
+        """Lädt eine Sitzung; fehlt die Datei oder ist sie kaputt, ist die Sitzung leer."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            tabs = [TabRecord.from_dict(entry) for entry in data.get("tabs", [])]
+            return cls(path, tabs, int(data.get("selected", 0)), int(data.get("journal_seq", 0)))
+        except FileNotFoundError:
+            return cls(path)
+        except (IOError, ValueError, KeyError, TypeError) as e:
+            print(f"Fehler beim Laden der Sitzung: {e}")
+            return cls(path)
+
+    def save(self) -> None:
+        """Schreibt die Sitzung atomar und löscht verwaiste Backing-Dateien."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        data = {
+            "version": SESSION_VERSION,
+            "selected": self.selected,
+            "journal_seq": self.journal_seq,
+            "tabs": [tab.to_dict() for tab in self.tabs],
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._remove_orphans()
+
+    def _remove_orphans(self) -> None:
+        if not os.path.isdir(self.lists_dir):
+            return
+        referenced = {os.path.abspath(tab.backing_file) for tab in self.tabs if tab.backing_file}
+        for entry in os.listdir(self.lists_dir):
+            path = os.path.abspath(os.path.join(self.lists_dir, entry))
+            if entry.startswith("tab-") and path not in referenced:
+                os.remove(path)
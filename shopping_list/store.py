@@ -0,0 +1,253 @@
+"""store.py
+------------------------------------------------------------------------------
+Spaltenorientierter Item-Speicher (Columnar Store).
+
+Problem:
+Jedes Item ist ein eigenes Python-Objekt. Summen werden berechnet, indem in
+einer Python-Schleife für jedes Objekt calculate_total() aufgerufen wird.
+Bei Listen mit Millionen Einträgen kostet das viel Speicher und Zeit.
+
+Lösung:
+ItemStore hält Namen, Typ-Flags, Mengen und Einzelpreise in parallelen Spalten
+(typisierte `array`s der Standardbibliothek). Summen werden spaltenweise
+berechnet, mit NumPy falls installiert, sonst über C-Iteratoren (map/compress).
+Für Code, der mit ShoppingItem-Objekten arbeitet, liefert der Store leichte
+Sichten (Views), die direkt in die Spalten lesen und schreiben.
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import math
+import operator
+import sys
+from array import array
+from itertools import compress
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import CountedItem, ShoppingItem, WeightedItem
+
+try:  # Optionale Beschleunigung
+    import numpy as np
+except ImportError:  # pragma: no cover - abhängig von der Umgebung
+    np = None
+
+# Zeile im Store: (ist_gewichtsartikel, name, menge, einzelpreis)
+Row = Tuple[bool, str, float, float]
+
+
+class ItemStore:
+    """Container für viele Items in parallelen, typisierten Spalten."""
+
+    def __init__(self, items: Iterable[ShoppingItem] = ()):
+        self._names: List[str] = []
+        self._weighted = array("b")
+        self._amounts = array("d")
+        self._prices = array("d")
+        self.extend(items)
+
+    # ------------------------------------------------------------------
+    # Befüllen / Ändern
+    # ------------------------------------------------------------------
+    def append(self, name: str, is_weighted: bool, amount: float, price: float) -> None:
+        """Hängt eine Zeile an (gleiche Umrechnung wie ItemFactory.create_item)."""
+        self._names.append(sys.intern(name))
+        self._weighted.append(1 if is_weighted else 0)
+        self._amounts.append(float(amount) if is_weighted else float(int(amount)))
+        self._prices.append(float(price))
+
+    def append_item(self, item: ShoppingItem) -> None:
+        is_weighted, name, amount, price = _item_row(item)
+        self.append(name, is_weighted, amount, price)
+
+    def extend(self, items: Iterable[ShoppingItem]) -> None:
+        for item in items:
+            self.append_item(item)
+
+    def extend_columns(
+        self, names: List[str], weighted: Iterable[bool], amounts: Iterable[float], prices: Iterable[float]
+    ) -> None:
+        """Hängt bereits umgerechnete Spalten auf einmal an (siehe ItemFactory.create_store)."""
+        self._names.extend(names)
+        self._weighted.extend(1 if flag else 0 for flag in weighted)
+        self._amounts.extend(amounts)
+        self._prices.extend(prices)
+
+    def columns(self) -> Tuple[List[str], array, array, array]:
+        """Die Spalten (Namen, Typ-Flags, Mengen, Einzelpreise) ohne Kopie; nur lesen."""
+        return self._names, self._weighted, self._amounts, self._prices
+
+    def add_amount(self, index: int, amount: float) -> None:
+        """Erhöht die Menge einer Zeile (Stückartikel ganzzahlig, wie CountedItem)."""
+        if self._weighted[index]:
+            self._amounts[index] += float(amount)
+        else:
+            self._amounts[index] += int(amount)
+
+    def __delitem__(self, index: int) -> None:
+        del self._names[index]
+        del self._weighted[index]
+        del self._amounts[index]
+        del self._prices[index]
+
+    # ------------------------------------------------------------------
+    # Lesen
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __getitem__(self, index: int) -> ShoppingItem:
+        """Liefert eine Sicht auf die Zeile. Sichten gelten nur bis zum nächsten Löschen davor."""
+        if index < 0:
+            index += len(self._names)
+        if not 0 <= index < len(self._names):
+            raise IndexError("ItemStore index out of range")
+        if self._weighted[index]:
+            return WeightedItemView(self, index)
+        return CountedItemView(self, index)
+
+    def __iter__(self) -> Iterator[ShoppingItem]:
+        for index in range(len(self._names)):
+            yield self[index]
+
+    def row(self, index: int) -> Row:
+        return (
+            bool(self._weighted[index]),
+            self._names[index],
+            self._amounts[index],
+            self._prices[index],
+        )
+
+    def rows(self) -> Iterator[Row]:
+        """Iteriert über alle Zeilen, ohne Sichten zu erzeugen."""
+        return zip(map(bool, self._weighted), self._names, self._amounts, self._prices)
+
+    @property
+    def nbytes(self) -> int:
+        """Speicherbedarf der numerischen Spalten plus Namensliste (ohne die Strings selbst)."""
+        return (
+            self._weighted.itemsize * len(self._weighted)
+            + self._amounts.itemsize * len(self._amounts)
+            + self._prices.itemsize * len(self._prices)
+            + 8 * len(self._names)
+        )
+
+    # ------------------------------------------------------------------
+    # Summen
+    # ------------------------------------------------------------------
+    def total(self) -> float:
+        """Gesamtpreis aller Zeilen."""
+        if np is not None and self._names:
+            return float(np.dot(self._np(self._amounts), self._np(self._prices)))
+        return math.fsum(map(operator.mul, self._amounts, self._prices))
+
+    def subtotals(self) -> Dict[str, float]:
+        """Zwischensummen pro Typ: {"C": Stückartikel, "W": Gewichtsartikel}."""
+        weighted_total = self._masked_total(self._weighted)
+        if np is not None and self._names:
+            counted_mask = self._np(self._weighted, np.int8) == 0
+            counted_total = float(
+                np.dot(self._np(self._amounts)[counted_mask], self._np(self._prices)[counted_mask])
+            )
+        else:
+            counted_total = self._masked_total(map(operator.not_, self._weighted))
+        return {"C": counted_total, "W": weighted_total}
+
+    def filtered_total(
+        self,
+        *,
+        weighted: Optional[bool] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        name_prefix: Optional[str] = None,
+    ) -> float:
+        """Summe über alle Zeilen, die sämtliche angegebenen Filter erfüllen."""
+        if np is not None and self._names:
+            mask = np.ones(len(self._names), dtype=bool)
+            prices = self._np(self._prices)
+            if weighted is not None:
+                mask &= (self._np(self._weighted, np.int8) != 0) == weighted
+            if min_price is not None:
+                mask &= prices >= min_price
+            if max_price is not None:
+                mask &= prices <= max_price
+            if name_prefix is not None:
+                mask &= np.fromiter(
+                    (n.startswith(name_prefix) for n in self._names), dtype=bool, count=len(self._names)
+                )
+            return float(np.dot(self._np(self._amounts)[mask], prices[mask]))
+
+        selected = [True] * len(self._names)
+        if weighted is not None:
+            selected = [s and (bool(w) == weighted) for s, w in zip(selected, self._weighted)]
+        if min_price is not None:
+            selected = [s and p >= min_price for s, p in zip(selected, self._prices)]
+        if max_price is not None:
+            selected = [s and p <= max_price for s, p in zip(selected, self._prices)]
+        if name_prefix is not None:
+            selected = [s and n.startswith(name_prefix) for s, n in zip(selected, self._names)]
+        return self._masked_total(selected)
+
+    def _masked_total(self, mask: Iterable) -> float:
+        mask = list(mask)
+        return math.fsum(
+            map(operator.mul, compress(self._amounts, mask), compress(self._prices, mask))
+        )
+
+    @staticmethod
+    def _np(column: array, dtype=None):
+        """Zero-Copy-Sicht einer Spalte als NumPy-Array."""
+        return np.frombuffer(column, dtype=dtype or np.float64)
+
+
+def _item_row(item: ShoppingItem) -> Row:
+    if isinstance(item, WeightedItem):
+        return True, item.name, item.weight, item.price_per_unit
+    return False, item.name, getattr(item, "quantity", 0), item.price_per_unit
+
+
+def _column_property(column: str) -> property:
+    def getter(self):
+        return getattr(self._store, column)[self._index]
+
+    def setter(self, value):
+        getattr(self._store, column)[self._index] = value
+
+    return property(getter, setter)
+
+
+class CountedItemView(CountedItem):
+    """Stückartikel-Sicht auf eine Zeile eines ItemStore."""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: ItemStore, index: int):
+        # Kein super().__init__(): die Daten liegen im Store, nicht in der Sicht.
+        self._store = store
+        self._index = index
+
+    name = _column_property("_names")
+    price_per_unit = _column_property("_prices")
+
+    @property
+    def quantity(self) -> int:
+        return int(self._store._amounts[self._index])
+
+    @quantity.setter
+    def quantity(self, value: int) -> None:
+        self._store._amounts[self._index] = float(int(value))
+
+
+class WeightedItemView(WeightedItem):
+    """Gewichtsartikel-Sicht auf eine Zeile eines ItemStore."""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: ItemStore, index: int):
+        # Kein super().__init__(): die Daten liegen im Store, nicht in der Sicht.
+        self._store = store
+        self._index = index
+
+    name = _column_property("_names")
+    price_per_unit = _column_property("_prices")
+    weight = _column_property("_amounts")
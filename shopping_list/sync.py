@@ -0,0 +1,555 @@
+"""sync.py
+------------------------------------------------------------------------------
+Sync-Server für gemeinsam bearbeitete Listen (asyncio, ohne tkinter).
+
+Problem:
+Jede Instanz der Anwendung ist eine Insel: Listen werden nur geteilt, indem
+man sie als txt exportiert und woanders wieder importiert.
+
+Lösung:
+- SyncServer hält benannte Listen (ShoppingList + MergeService) und spricht
+  über TCP ein zeilenbasiertes JSON-Protokoll (eine Nachricht pro Zeile).
+  Standard ist localhost, damit alles auch offline testbar ist.
+- Clients schicken Batches von Operationen ("merge"/"add" mit Zeilen
+  [ist_gewichtsartikel, name, menge, preis], "remove" mit Namen). Ein Batch
+  wird komplett geprüft und dann mit denselben Merge- und Kollisionsregeln
+  wie `ShoppingListTab._merge_and_add_items` angewendet; er bekommt eine
+  fortlaufende Nummer (seq) pro Liste und eine Bestätigung ("ack").
+- Abonnenten bekommen die Änderungen als Item-Operationen im Format des
+  Journals (insert/remove/update/reset, siehe journal.apply_item_op). Jede
+  Verbindung hat einen Postausgang: Solange ein langsamer Client noch liest,
+  werden neue Änderungen an die wartende Nachricht angehängt und vor dem
+  Senden zusammengefasst (`coalesce`). Wird der Rückstand zu groß, bekommt
+  der Client statt der Einzeländerungen einen frischen Snapshot.
+- SyncClient ist das Gegenstück (Batches senden, Listen spiegeln); der
+  Lasttest liegt in benchmarks/bench_sync.py.
+
+Protokoll (Client -> Server):
+    {"type": "subscribe", "id": 1, "list": "Familie"}
+    {"type": "unsubscribe", "id": 2, "list": "Familie"}
+    {"type": "batch", "id": 3, "list": "Familie", "ops": [
+        {"op": "merge", "items": [[false, "Milch", 2, 0.99]]},
+        {"op": "remove", "names": ["Brot"]}]}
+
+Protokoll (Server -> Client):
+    {"type": "ack", "id": 3, "seq": 17}
+    {"type": "error", "id": 3, "message": "..."}
+    {"type": "delta", "list": "Familie", "seq": 17, "ops": [...]}
+------------------------------------------------------------------------------
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from .factories import ItemFactory
+from .journal import Op, apply_item_op
+from .merge import MergeService
+from .models import INSERT, REMOVE, RESET, UPDATE, ListEvent, ShoppingItem, ShoppingList
+from .persistence import iter_rows
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Obergrenze für eine Nachricht (Zeile); Snapshots großer Listen sind lang
+MAX_LINE = 64 * 1024 * 1024
+# Ab so vielen wartenden Operationen bekommt ein Abonnent einen Snapshot statt der Deltas
+MAX_PENDING_OPS = 10_000
+# Fertig kodierte Delta-Nachrichten je Liste (alle Abonnenten mit gleichem Rückstand teilen sie)
+ENCODED_CACHE_SIZE = 16
+
+Message = Dict[str, Any]
+
+
+class SyncError(ValueError):
+    """Ungültige Nachricht oder Operation (wird dem Client als "error" gemeldet)."""
+
+
+def encode(message: Message) -> bytes:
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _item_rows(items: Sequence[ShoppingItem]) -> List[list]:
+    return [[is_weighted, name, amount, price] for is_weighted, name, amount, price in iter_rows(items)]
+
+
+def coalesce(ops: Sequence[Op]) -> List[Op]:
+    """Fasst aufeinanderfolgende Item-Operationen zusammen (gleiches Ergebnis, weniger Ops).
+
+    - zusammenhängende Einfügungen werden eine Einfügung,
+    - Mengenänderungen an gerade eingefügten Items wandern in deren Zeilen,
+    - weitere Mengenänderungen werden je Index addiert und erst ausgegeben,
+      wenn eine Verschiebung der Indizes sie betreffen würde.
+
+    `ops` wird nicht verändert.
+    """
+    result: List[Op] = []
+    updates: Dict[int, float] = {}
+    highest_update = -1
+    # Die letzte Einfügung, solange danach nichts mehr die Indizes verschoben hat
+    open_insert: Optional[Op] = None
+
+    def flush_updates(from_index: int = 0) -> bool:
+        nonlocal updates, highest_update
+        if highest_update < from_index:
+            return False
+        result.extend({"op": "update", "index": index, "amount": amount} for index, amount in updates.items())
+        updates = {}
+        highest_update = -1
+        return True
+
+    for op in ops:
+        kind = op["op"]
+        if kind == "update":
+            index = op["index"]
+            if open_insert is not None and 0 <= index - open_insert["index"] < len(open_insert["items"]):
+                open_insert["items"][index - open_insert["index"]][2] += op["amount"]
+            else:
+                updates[index] = updates.get(index, 0) + op["amount"]
+                highest_update = max(highest_update, index)
+        elif kind == "insert":
+            index = op["index"]
+            if flush_updates(index):
+                # Die Updates müssen vor dieser Einfügung wirken.
+                open_insert = None
+            rows = [list(row) for row in op["items"]]
+            if open_insert is not None and open_insert["index"] + len(open_insert["items"]) == index:
+                open_insert["items"].extend(rows)
+            else:
+                open_insert = {"op": "insert", "index": index, "items": rows}
+                result.append(open_insert)
+        elif kind == "remove":
+            flush_updates(op["index"])
+            previous = result[-1] if result else None
+            if previous is not None and previous["op"] == "remove" and previous["index"] == op["index"]:
+                result[-1] = {"op": "remove", "index": op["index"], "count": previous["count"] + op.get("count", 1)}
+            else:
+                result.append(dict(op))
+            open_insert = None
+        elif kind == "reset":
+            # Alles davor ist überholt.
+            result = [op]
+            updates = {}
+            highest_update = -1
+            open_insert = None
+        else:
+            raise SyncError(f"Unbekannte Item-Operation: {kind!r}")
+    flush_updates()
+    return result
+
+
+# ----------------------------------------------------------------------
+# Server
+# ----------------------------------------------------------------------
+class SharedList:
+    """Eine Liste auf dem Server samt Merge-Regeln, seq und Abonnenten."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = ShoppingList()
+        self.merger = MergeService(self.items)
+        self.seq = 0
+        self.subscribers: Set["_Connection"] = set()
+        # Namen sind nach der Kollisionsauflösung eindeutig.
+        self._by_name: Dict[str, ShoppingItem] = {}
+        self._changes: List[Op] = []
+        # (erste seq, letzte seq, Snapshot?) -> kodierte Nachricht
+        self._encoded: Dict[Tuple[int, int, bool], bytes] = {}
+        self.items.subscribe(self._on_change)
+
+    def _on_change(self, event: ListEvent) -> None:
+        if event.kind == INSERT:
+            for item in event.items:
+                self._by_name[item.name] = item
+            self._changes.append({"op": "insert", "index": event.index, "items": _item_rows(event.items)})
+        elif event.kind == REMOVE:
+            for item in event.items:
+                if self._by_name.get(item.name) is item:
+                    del self._by_name[item.name]
+            self._changes.append({"op": "remove", "index": event.index, "count": len(event.items)})
+        elif event.kind == UPDATE:
+            self._changes.append({"op": "update", "index": event.index, "amount": event.amount_delta})
+        elif event.kind == RESET:
+            self._by_name = {item.name: item for item in event.items}
+            self._changes.append({"op": "reset", "items": _item_rows(event.items)})
+
+    def snapshot(self) -> Op:
+        return {"op": "reset", "items": _item_rows(self.items)}
+
+    def encoded_delta(self, first_seq: int, last_seq: int, ops: List[Op], snapshot: bool) -> bytes:
+        """Delta-Nachricht für die Batches first_seq..last_seq; wird nur einmal zusammengefasst und kodiert.
+
+        Ein Snapshot zeigt immer den aktuellen Stand (seq der Liste).
+        """
+        if snapshot:
+            last_seq = self.seq
+        key = (first_seq, last_seq, snapshot)
+        data = self._encoded.get(key)
+        if data is None:
+            if len(self._encoded) >= ENCODED_CACHE_SIZE:
+                self._encoded.clear()
+            message = {
+                "type": "delta",
+                "list": self.name,
+                "seq": last_seq,
+                "ops": [self.snapshot()] if snapshot else coalesce(ops),
+            }
+            data = self._encoded[key] = encode(message)
+        return data
+
+    def apply(self, ops: Any) -> int:
+        """Prüft und wendet einen Batch an, verteilt die Änderungen; liefert die seq.
+
+        Raises:
+            SyncError: bei ungültigen Operationen; die Liste bleibt dann unverändert.
+        """
+        actions = [self._prepare(op) for op in _as_list(ops, "ops")]
+        try:
+            for action in actions:
+                action()
+        finally:
+            # Auch nach einem unerwarteten Fehler mittendrin die schon erfolgten Änderungen verteilen.
+            changes, self._changes = self._changes, []
+            if changes:
+                self.seq += 1
+                for connection in self.subscribers:
+                    connection.send_delta(self, changes)
+        return self.seq
+
+    def _prepare(self, op: Any) -> Callable[[], None]:
+        if not isinstance(op, dict):
+            raise SyncError(f"Operation ist kein Objekt: {op!r}")
+        kind = op.get("op")
+        if kind in ("merge", "add"):
+            rows = _as_list(op.get("items"), "items") if kind == "merge" else [op.get("item")]
+            try:
+                flags, names, amounts, prices = zip(*rows) if rows else ((), (), (), ())
+            except (TypeError, ValueError):
+                raise SyncError("Zeilen müssen [ist_gewichtsartikel, name, menge, preis] sein") from None
+            try:
+                new_items = ItemFactory.create_items(names, flags, amounts, prices)
+            except ValueError as e:
+                raise SyncError(str(e)) from None
+            return lambda: self._merge(new_items)
+        if kind == "remove":
+            names = _as_list(op.get("names"), "names")
+            return lambda: self._remove(names)
+        raise SyncError(f"Unbekannte Operation: {kind!r}")
+
+    def _merge(self, new_items: List[ShoppingItem]) -> None:
+        self.merger.merge(new_items)
+
+    def _remove(self, names: List[Any]) -> None:
+        # Schon von einem anderen Client entfernte Namen sind kein Fehler.
+        for name in names:
+            item = self._by_name.get(name) if isinstance(name, str) else None
+            if item is not None:
+                self.items.delete(self.items.index_of(item), 1)
+
+
+def _as_list(value: Any, field: str) -> list:
+    if not isinstance(value, list):
+        raise SyncError(f"„{field}“ muss eine Liste sein")
+    return value
+
+
+class _PendingDelta:
+    """Noch nicht gesendete Änderungen einer Liste für einen Abonnenten."""
+
+    __slots__ = ("shared", "first_seq", "last_seq", "ops", "snapshot")
+
+    def __init__(self, shared: SharedList, ops: List[Op], snapshot: bool = False):
+        self.shared = shared
+        self.first_seq = 0 if snapshot else shared.seq
+        # Letzter Batch, dessen Änderungen in `ops` stecken (nach einem Abo-Ende
+        # oder neuen Snapshot kommen keine mehr dazu).
+        self.last_seq = shared.seq
+        self.ops = ops
+        self.snapshot = snapshot
+
+    def encode(self) -> bytes:
+        return self.shared.encoded_delta(self.first_seq, self.last_seq, self.ops, self.snapshot)
+
+
+class _Connection:
+    """Eine Client-Verbindung mit Postausgang (Nachrichten werden gesammelt gesendet)."""
+
+    def __init__(self, writer: asyncio.StreamWriter, max_pending_ops: int):
+        self.writer = writer
+        self.max_pending_ops = max_pending_ops
+        self._outbox: List[Union[Message, _PendingDelta]] = []
+        # Liste -> noch nicht gesendete Änderungen (darin wird weiter gesammelt)
+        self._open_deltas: Dict[str, _PendingDelta] = {}
+        self._wake = asyncio.Event()
+        self.closed = False
+
+    def send(self, message: Union[Message, _PendingDelta]) -> None:
+        self._outbox.append(message)
+        self._wake.set()
+
+    def send_delta(self, shared: SharedList, ops: List[Op]) -> None:
+        pending = self._open_deltas.get(shared.name)
+        if pending is None:
+            pending = self._open_deltas[shared.name] = _PendingDelta(shared, list(ops))
+            self.send(pending)
+        elif not pending.snapshot:
+            pending.ops.extend(ops)
+            pending.last_seq = shared.seq
+            if len(pending.ops) > self.max_pending_ops:
+                # Client kommt nicht hinterher: beim Senden den aktuellen Stand schicken.
+                pending.ops = []
+                pending.snapshot = True
+                pending.first_seq = 0
+
+    def send_snapshot(self, shared: SharedList) -> None:
+        pending = self._open_deltas[shared.name] = _PendingDelta(shared, [], snapshot=True)
+        self.send(pending)
+
+    async def run_writer(self) -> None:
+        try:
+            while True:
+                await self._wake.wait()
+                self._wake.clear()
+                messages, self._outbox = self._outbox, []
+                self._open_deltas = {}
+                self.writer.write(
+                    b"".join(
+                        message.encode() if isinstance(message, _PendingDelta) else encode(message)
+                        for message in messages
+                    )
+                )
+                # Während drain() wartet, sammeln sich neue Änderungen im Postausgang.
+                await self.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.closed = True
+
+
+class SyncServer:
+    """Hostet benannte Listen; alle Zugriffe laufen in einer Event-Loop (keine Locks).
+
+    Args:
+        host, port: Adresse (Port 0 = freien Port wählen, siehe `port` nach `start()`)
+        max_pending_ops: Rückstand je Abonnent, ab dem ein Snapshot gesendet wird
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, max_pending_ops: int = MAX_PENDING_OPS):
+        self.host = host
+        self.port = port
+        self.max_pending_ops = max_pending_ops
+        self.lists: Dict[str, SharedList] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def shared_list(self, name: str) -> SharedList:
+        """Liefert die Liste `name` und legt sie bei Bedarf an."""
+        shared = self.lists.get(name)
+        if shared is None:
+            shared = self.lists[name] = SharedList(name)
+        return shared
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_LINE)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:  # type: ignore[union-attr]
+            await self._server.serve_forever()  # type: ignore[union-attr]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = _Connection(writer, self.max_pending_ops)
+        writer_task = asyncio.ensure_future(connection.run_writer())
+        try:
+            while not connection.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                self._dispatch(connection, line)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            for shared in self.lists.values():
+                shared.subscribers.discard(connection)
+            writer_task.cancel()
+            writer.close()
+
+    def _dispatch(self, connection: _Connection, line: bytes) -> None:
+        request_id = None
+        try:
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise SyncError("Nachricht ist kein Objekt")
+            request_id = message.get("id")
+            kind = message.get("type")
+            name = message.get("list")
+            if not isinstance(name, str):
+                raise SyncError("„list“ fehlt")
+            # Listen entstehen nur durch ein Abo oder einen erfolgreichen Batch.
+            shared = self.lists.get(name)
+            if kind == "batch":
+                target = shared if shared is not None else SharedList(name)
+                seq = target.apply(message.get("ops"))
+                self.lists.setdefault(name, target)
+            elif kind == "subscribe":
+                shared = self.shared_list(name)
+                shared.subscribers.add(connection)
+                connection.send_snapshot(shared)
+                seq = shared.seq
+            elif kind == "unsubscribe":
+                if shared is not None:
+                    shared.subscribers.discard(connection)
+                seq = shared.seq if shared is not None else 0
+            else:
+                raise SyncError(f"Unbekannter Nachrichtentyp: {kind!r}")
+        except (ValueError, ArithmeticError, TypeError) as e:
+            # Eine fehlerhafte Nachricht darf die Verbindung nicht beenden.
+            connection.send({"type": "error", "id": request_id, "message": str(e)})
+            return
+        connection.send({"type": "ack", "id": request_id, "seq": seq})
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+class SyncClient:
+    """Client für den SyncServer: Batches senden und abonnierte Listen spiegeln.
+
+    Erzeugt wird er mit `await SyncClient.connect(host, port)`.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._waiting: Dict[int, asyncio.Future] = {}
+        # Gespiegelte Listen und ihr Stand (seq)
+        self.lists: Dict[str, ShoppingList] = {}
+        self.seqs: Dict[str, int] = {}
+        # Empfangene Delta-Nachrichten (weniger als Batches = Server hat zusammengefasst)
+        self.deltas_received = 0
+        self._changed = asyncio.Condition()
+        self._reader_task = asyncio.ensure_future(self._read())
+
+    @classmethod
+    async def connect(cls, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> "SyncClient":
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        return cls(reader, writer)
+
+    async def close(self) -> None:
+        self._reader_task.cancel()
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def request(self, message: Message) -> int:
+        """Sendet eine Nachricht und wartet auf die Bestätigung; liefert die seq."""
+        self._next_id += 1
+        message = dict(message, id=self._next_id)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[self._next_id] = future
+        self._writer.write(encode(message))
+        await self._writer.drain()
+        return await future
+
+    async def batch(self, list_name: str, ops: List[Op]) -> int:
+        return await self.request({"type": "batch", "list": list_name, "ops": ops})
+
+    async def merge(self, list_name: str, rows: List[list]) -> int:
+        return await self.batch(list_name, [{"op": "merge", "items": rows}])
+
+    async def remove(self, list_name: str, names: List[str]) -> int:
+        return await self.batch(list_name, [{"op": "remove", "names": names}])
+
+    async def subscribe(self, list_name: str, mirror: bool = True) -> Optional[ShoppingList]:
+        """Abonniert eine Liste; die zurückgegebene ShoppingList folgt dem Server.
+
+        Mit `mirror=False` wird nur der Stand (seq) verfolgt, z.B. im Lasttest.
+        """
+        items = self.lists.setdefault(list_name, ShoppingList()) if mirror else None
+        await self.request({"type": "subscribe", "list": list_name})
+        return items
+
+    async def unsubscribe(self, list_name: str) -> None:
+        await self.request({"type": "unsubscribe", "list": list_name})
+
+    async def wait_for(self, list_name: str, seq: int) -> None:
+        """Wartet, bis die gespiegelte Liste mindestens den Stand `seq` hat."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.seqs.get(list_name, -1) >= seq)
+
+    async def _read(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                kind = message.get("type")
+                if kind == "delta":
+                    self.deltas_received += 1
+                    await self._apply_delta(message)
+                    continue
+                future = self._waiting.pop(message.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if kind == "ack":
+                    future.set_result(message["seq"])
+                else:
+                    future.set_exception(SyncError(message.get("message", "Unbekannter Fehler")))
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Verbindung zum Sync-Server getrennt"))
+            self._waiting.clear()
+
+    async def _apply_delta(self, message: Message) -> None:
+        name = message["list"]
+        items = self.lists.get(name)
+        if items is not None:
+            for op in message["ops"]:
+                apply_item_op(items, op)
+        async with self._changed:
+            self.seqs[name] = message["seq"]
+            self._changed.notify_all()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m shopping_list.sync", description="Sync-Server für Einkaufslisten")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Adresse (Standard: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (Standard: {DEFAULT_PORT})")
+    args = parser.parse_args(argv)
+
+    server = SyncServer(args.host, args.port)
+
+    async def run() -> None:
+        await server.start()
+        print(f"Sync-Server läuft auf {server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except OSError as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import threading
+import time
+
+import pytest
+
+from shopping_list.background import BackgroundJob, JobCancelled
+
+
+def _wait_until_finished(job, collected):
+    deadline = time.monotonic() + 5
+    while not job.finished:
+        collected.extend(job.drain(10))
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    collected.extend(job.drain(10))
+
+
+def test_results_arrive_in_order():
+    def work(job):
+        for batch in range(20):
+            job.emit([batch])
+        return "fertig"
+
+    job = BackgroundJob(work)
+    collected = []
+    _wait_until_finished(job, collected)
+    assert collected == [[i] for i in range(20)]
+    assert job.result() == "fertig"
+
+
+def test_cancel_unblocks_worker():
+    started = threading.Event()
+
+    def work(job):
+        started.set()
+        while True:
+            job.emit("batch")  # Queue läuft voll, Worker muss trotzdem abbrechen können
+
+    job = BackgroundJob(work)
+    started.wait(5)
+    job.cancel()
+    _wait_until_finished(job, [])
+    with pytest.raises(JobCancelled):
+        job.result()
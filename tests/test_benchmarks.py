@@ -0,0 +1,36 @@
+import asyncio
+
+from benchmarks.bench_compression import compare_formats
+from benchmarks.bench_sync import load_test
+from benchmarks.run import compare, main
+
+
+def test_compare_reports_only_values_above_threshold():
+    baseline = [{"benchmark": "txt.load", "size": 1000, "seconds": 1.0, "peak_bytes": 1000}]
+    results = [{"benchmark": "txt.load", "size": 1000, "seconds": 1.1, "peak_bytes": 1500}]
+
+    regressions = compare(results, baseline, time_threshold=0.2, memory_threshold=0.2)
+
+    assert len(regressions) == 1
+    assert "peak_bytes" in regressions[0]
+
+
+def test_run_writes_baseline_and_compares(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    args = ["--sizes", "50", "--repeat", "1", "--only", "factory.create_item", "--baseline", str(baseline)]
+
+    assert main(args + ["--update-baseline"]) == 0
+    assert baseline.exists()
+    assert main(args + ["--time-threshold", "1000", "--memory-threshold", "1000"]) == 0
+
+
+def test_compression_benchmark_reports_every_format():
+    results = compare_formats(200, repeat=1)
+    assert [label for label, *_rest in results] == ["txt", "gzip", "bz2", "lzma"]
+    assert all(size < results[0][1] for _label, size, *_rest in results[1:])
+
+
+def test_sync_load_test_keeps_mirrors_consistent():
+    result = asyncio.run(load_test(clients=20, batches=3, batch_size=5, lists=2))
+    assert result["consistent"]
+    assert result["batches"] == 60 and result["ops"] >= 300
@@ -0,0 +1,86 @@
+import os
+
+from shopping_list import instrumentation
+from shopping_list.cache import CachingFileHandler, ParsedFileCache
+from shopping_list.factories import ItemFactory
+from shopping_list.persistence import TxtFileHandler
+
+
+class CountingTxtHandler(TxtFileHandler):
+    loads = 0
+
+    def iter_load(self, filename):
+        self.loads += 1
+        yield from super().iter_load(filename)
+
+
+def _rows(items):
+    return [(type(item).__name__, item.name, item.calculate_total()) for item in items]
+
+
+def test_repeat_import_skips_parsing_and_invalidates_on_change(tmp_path):
+    path = str(tmp_path / "katalog.txt")
+    TxtFileHandler().save(
+        [ItemFactory.create_item("Milch", False, 2, 0.99), ItemFactory.create_item("Äpfel", True, 1.5, 2.49)], path
+    )
+    inner = CountingTxtHandler()
+    handler = CachingFileHandler(inner, ParsedFileCache(str(tmp_path / "cache")))
+
+    first = handler.load(path)
+    second = handler.load(path)
+    assert inner.loads == 1
+    assert _rows(second) == _rows(first) and second[0] is not first[0]
+
+    # Neuer Prozess: Treffer aus dem Plattencache, auch wenn die Datei nur angefasst wurde.
+    os.utime(path, ns=(1, 1))
+    fresh = CachingFileHandler(inner, ParsedFileCache(str(tmp_path / "cache")))
+    assert _rows(fresh.load(path)) == _rows(first)
+    assert inner.loads == 1
+
+    TxtFileHandler().save([ItemFactory.create_item("Brot", False, 1, 2.5)], path)
+    assert _rows(fresh.load(path)) == [("CountedItem", "Brot", 2.5)]
+    assert inner.loads == 2
+
+
+def test_memory_budget_evicts_least_recently_used(tmp_path):
+    cache = ParsedFileCache(memory_budget=60)
+    for name in ("a", "b", "c"):
+        path = str(tmp_path / f"{name}.txt")
+        TxtFileHandler().save([ItemFactory.create_item(name, False, 1, 1.0)], path)
+        CachingFileHandler(TxtFileHandler(), cache).load(path)
+
+    instrumentation.enable()
+    try:
+        instrumentation.reset()
+        assert cache.get(str(tmp_path / "a.txt")) is None
+        assert list(cache.get(str(tmp_path / "c.txt")).rows()) == [(False, "c", 1.0, 1.0)]
+        counters = instrumentation.snapshot()["counters"]
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+    assert counters == {"cache.miss": 1, "cache.memory_hit": 1}
+
+
+def test_disk_pruning_also_prunes_index(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = ParsedFileCache(str(cache_dir))
+    for name in ("a", "b", "c"):
+        path = str(tmp_path / f"{name}.txt")
+        TxtFileHandler().save([ItemFactory.create_item(name, False, 1, 1.0)], path)
+        CachingFileHandler(TxtFileHandler(), cache).load(path)
+        if name == "a":
+            (blob,) = [entry for entry in os.listdir(cache_dir) if entry.endswith(".slb")]
+            cache.disk_budget = os.path.getsize(cache_dir / blob)
+
+    # Das Budget hält nur einen Eintrag; der Index folgt den Blobs.
+    (blob,) = [entry for entry in os.listdir(cache_dir) if entry.endswith(".slb")]
+    index = ParsedFileCache(str(cache_dir))._index
+    assert [entry[2] + ".slb" for entry in index.values()] == [blob]
+
+    cache.disk_budget = 1 << 30
+    for kept in index:
+        os.remove(kept)
+    path = str(tmp_path / "d.txt")
+    TxtFileHandler().save([ItemFactory.create_item("d", False, 1, 1.0)], path)
+    CachingFileHandler(TxtFileHandler(), cache).load(path)
+    assert sorted(ParsedFileCache(str(cache_dir))._index) == [os.path.abspath(path)]
@@ -0,0 +1,59 @@
+import threading
+
+from shopping_list.catalog import CatalogEntry, PriceCatalog
+from shopping_list.factories import ItemFactory
+from shopping_list.persistence import BinaryFileHandler, TxtFileHandler
+
+
+def test_catalog_learns_only_recorded_items(tmp_path):
+    path = str(tmp_path / "catalog.sqlite")
+    export = str(tmp_path / "liste.txt")
+    old_list = str(tmp_path / "alt.slb")
+    TxtFileHandler().save([ItemFactory.create_item("Äpfel", True, 1.5, 2.49)], export)
+    BinaryFileHandler().save([ItemFactory.create_item("Milch", False, 1, 0.99)], old_list)
+
+    catalog = PriceCatalog(path)
+    catalog.record([ItemFactory.create_item("Milch", False, 1, 1.19)])
+    catalog.record([ItemFactory.create_item("milch", False, 2, 1.29)])
+    catalog.record(TxtFileHandler().load(export))
+    # Laden eines alten Stands (Tab, Journal, Compactor) ändert den Katalog nicht.
+    for _ in range(3):
+        BinaryFileHandler().load(old_list)
+    assert catalog.lookup("MILCH ") == CatalogEntry("milch", False, 1.29, 2)
+    catalog.close()
+
+    reopened = PriceCatalog(path)
+    assert reopened.lookup("Milch") == CatalogEntry("milch", False, 1.29, 2)
+    assert reopened.lookup("äpfel") == CatalogEntry("Äpfel", True, 2.49, 1)
+    assert reopened.lookup("Brot") is None
+    assert len(reopened) == 2
+
+
+def test_completion_prefers_frequent_products_and_memory_is_bounded():
+    catalog = PriceCatalog(capacity=2, flush_threshold=3)
+    catalog.record(ItemFactory.create_items(["Tomaten", "Tofu", "Tomaten", "Tee"], [1, 0, 1, 0], [1] * 4, [3, 2, 4, 1]))
+    catalog.flush()
+
+    assert [entry.name for entry in catalog.complete("to")] == ["Tomaten", "Tofu"]
+    assert catalog.complete("to", limit=1)[0].price == 4.0
+    assert catalog.complete("") == []
+
+    for name in ("Tee", "Tofu", "Tomaten", "Zucker"):
+        catalog.lookup(name)
+    assert len(catalog._hot) == 2
+    catalog.record([ItemFactory.create_item("Tomaten", True, 1, 5.0)])
+    assert catalog.lookup("tomaten") == CatalogEntry("Tomaten", True, 5.0, 3)
+    catalog.close()
+
+
+def test_lookup_does_not_write_on_the_calling_thread():
+    catalog = PriceCatalog(flush_delay=60)
+    catalog.record([ItemFactory.create_item(f"Artikel {i}", False, 1, 1.0) for i in range(1000)])
+    writers = []
+    original = catalog._write
+    catalog._write = lambda rows: (writers.append(threading.current_thread()), original(rows))[1]
+
+    assert catalog.lookup("artikel 7").price == 1.0
+    assert catalog.complete("artikel") == [] and writers == []
+    catalog.close()
+    assert len(writers) == 1
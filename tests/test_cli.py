@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+from shopping_list import cli
+from shopping_list.factories import ItemFactory
+from shopping_list.persistence import CompressedTxtFileHandler, TxtFileHandler
+
+
+def _write(path, entries):
+    TxtFileHandler().save([ItemFactory.create_item(*entry) for entry in entries], str(path))
+
+
+def test_merge_applies_gui_rules(tmp_path, capsys):
+    first, second, out = tmp_path / "a.txt", tmp_path / "b.txt", tmp_path / "out.txt"
+    _write(first, [("Milch", False, 1, 0.99), ("Äpfel", True, 1.5, 2.99)])
+    _write(second, [("Milch", False, 2, 0.99), ("Milch", False, 1, 1.19), ("Äpfel", True, 0.5, 2.99)])
+
+    assert cli.main(["merge", str(out), str(first), str(second), "--workers", "2"]) == 0
+    assert "Items/s" in capsys.readouterr().out
+
+    merged = TxtFileHandler().load(str(out))
+    assert [(i.name, round(i.calculate_total(), 2)) for i in merged] == [
+        ("Milch", 2.97),
+        ("Äpfel", 5.98),
+        ("Milch #2", 1.19),
+    ]
+
+
+def test_merge_reports_broken_inputs(tmp_path, capsys):
+    good, out = tmp_path / "a.txt", tmp_path / "out.txt"
+    _write(good, [("Milch", False, 1, 0.99)])
+    truncated = tmp_path / "kaputt.txt.xz"
+    truncated.write_bytes(b"\xfd7zXZ\x00" + b"\x00" * 10)
+    not_a_db = tmp_path / "kaputt.db"
+    not_a_db.write_bytes(b"keine Datenbank" * 100)
+    corrupted = tmp_path / "kaputt.txt.gz"
+    CompressedTxtFileHandler("gzip").save(
+        [ItemFactory.create_item(f"Artikel {i}", False, i, 0.5) for i in range(200)], str(corrupted)
+    )
+    data = bytearray(corrupted.read_bytes())
+    data[100:200] = bytes(b ^ 0xFF for b in data[100:200])
+    corrupted.write_bytes(bytes(data))
+
+    for broken in (truncated, not_a_db, corrupted):
+        assert cli.main(["merge", str(out), str(good), str(broken), "--workers", "1"]) == 1
+        assert capsys.readouterr().err.startswith("Fehler:")
+
+
+def test_cli_does_not_import_tkinter():
+    code = "import sys, shopping_list.cli; sys.exit('tkinter' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
@@ -0,0 +1,51 @@
+import random
+
+from shopping_list.consolidation import Consolidator, _SortedKeys
+from shopping_list.models import INSERT, REMOVE, CountedItem, ShoppingList, WeightedItem
+
+
+def test_sorted_keys_positions_match_sorted_list():
+    rng = random.Random(1)
+    keys = _SortedKeys()
+    keys.LOAD = 4
+    reference = []
+    for _ in range(2000):
+        if reference and rng.random() < 0.4:
+            key = rng.choice(reference)
+            assert keys.remove(key) == reference.index(key)
+            reference.remove(key)
+        else:
+            key = rng.random()
+            reference.append(key)
+            reference.sort()
+            assert keys.add(key) == reference.index(key)
+    assert list(keys) == reference
+    assert [keys[i] for i in range(len(reference))] == reference
+
+
+def test_consolidator_merges_sources_and_follows_changes():
+    store, market = ShoppingList(), ShoppingList()
+    consolidator = Consolidator()
+    consolidator.attach("store", store)
+    consolidator.attach("market", market)
+    events = []
+    consolidator.subscribe(events.append)
+
+    milk = CountedItem("Milch", 1.0, 2)
+    store.append(milk)
+    market.append(CountedItem("Milch", 1.0005, 3))
+    market.append(WeightedItem("Bananen", 2.0, 0.5))
+    store.add_amount(milk, 1)
+
+    assert [item.name for item in consolidator] == ["Bananen", "Milch"]
+    assert consolidator[1].quantity == 6
+    assert sorted(consolidator.row(1).breakdown()) == [("market", 3), ("store", 3)]
+    assert abs(consolidator.total() - 7.0) < 1e-9
+    assert [(e.kind, e.index) for e in events][:3] == [(INSERT, 0), ("update", 0), (INSERT, 0)]
+
+    market.pop(1)
+    assert events[-1].kind == REMOVE and events[-1].index == 0
+    consolidator.detach("store")
+    assert consolidator.row(0).breakdown() == [("market", 3)]
+    market.reset()
+    assert len(consolidator) == 0 and consolidator.total() == 0.0
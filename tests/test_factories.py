@@ -0,0 +1,38 @@
+import pytest
+
+from shopping_list.factories import ItemFactory, ItemValidationError
+from shopping_list.models import CountedItem, WeightedItem
+from shopping_list.store import ItemStore
+
+
+def test_create_items_matches_create_item():
+    items = ItemFactory.create_items(["Milch", "Äpfel"], [False, True], ["2", 1.5], [0.99, "2.49"])
+    assert [type(item) for item in items] == [CountedItem, WeightedItem]
+    assert items[0].quantity == 2 and items[1].weight == 1.5
+    assert items[0].name is ItemFactory.create_item("Milch", False, 1, 1.0).name
+
+
+def test_create_items_reports_every_bad_row():
+    with pytest.raises(ItemValidationError) as info:
+        ItemFactory.create_items(
+            ["A", "B", "C"], [False, False, True], ["1", "viel", "nan"], ["1", "2", "?"], row_numbers=[10, 11, 12]
+        )
+    assert [row for row, _message in info.value.errors] == [11, 12]
+    assert isinstance(info.value, ValueError)
+
+    store = ItemStore()
+    with pytest.raises(ItemValidationError):
+        ItemFactory.create_store(["A", "B"], [False, False], [1, "x"], [1, 1], store=store)
+    assert len(store) == 0
+
+
+def test_create_items_reports_overflowing_price():
+    with pytest.raises(ItemValidationError) as info:
+        ItemFactory.create_items(["A", "B"], [False, False], [1, 1], [1.0, 10**400])
+    assert info.value.errors == [(2, f"Preis {10**400!r} ist keine Zahl")]
+
+
+def test_create_store_fills_columns():
+    store = ItemFactory.create_store(["Milch", "Äpfel"], [False, True], [2.7, 1.5], [0.99, 2.0])
+    assert list(store.rows()) == [(False, "Milch", 2.0, 0.99), (True, "Äpfel", 1.5, 2.0)]
+    assert abs(store.total() - 4.98) < 1e-9
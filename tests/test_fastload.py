@@ -0,0 +1,50 @@
+import pytest
+
+from shopping_list.factories import ItemValidationError
+from shopping_list.fastload import ParallelTxtFileHandler, chunk_boundaries
+from shopping_list.persistence import TxtFileHandler
+
+CONTENT = (
+    "Typ|Name                     |     Menge| Einzelpreis\r\n"
+    "C  |Brot                     |         2|        1.49\r\n"
+    "W  |Äpfel                    |     1,500|        2,99\r\n"
+    "\r\n"
+    "nur|drei|spalten\n"
+    + "".join(f"C  |Artikel {i:<17}|{i:>10}|{i / 100:>12.2f}\n" for i in range(500))
+    + "# Gesamtpreis|123.45\n"
+)
+
+
+def _rows(items):
+    return [(type(i).__name__, i.name, i.calculate_total()) for i in items]
+
+
+def test_chunks_end_on_newlines(tmp_path):
+    path = tmp_path / "export.txt"
+    path.write_bytes(CONTENT.encode("utf-8"))
+    boundaries = chunk_boundaries(str(path), chunk_size=100)
+    data = path.read_bytes()
+    assert boundaries[0][0] == 0 and boundaries[-1][1] == len(data)
+    for (_start, end), (next_start, _end) in zip(boundaries, boundaries[1:]):
+        assert end == next_start and data[end - 1:end] == b"\n"
+
+
+def test_parallel_load_matches_sequential(tmp_path):
+    path = tmp_path / "export.txt"
+    path.write_bytes(CONTENT.encode("utf-8"))
+
+    handler = ParallelTxtFileHandler(workers=2, chunk_size=256, min_parallel_size=0)
+    assert _rows(handler.load(str(path))) == _rows(TxtFileHandler().load(str(path)))
+
+
+def test_parallel_load_reports_all_bad_rows_like_sequential(tmp_path):
+    path = tmp_path / "kaputt.txt"
+    path.write_text("C|Brot|x|1,49\n" + CONTENT + "C|Milch|zwei|0.99\n", encoding="utf-8")
+
+    handler = ParallelTxtFileHandler(workers=2, chunk_size=256, min_parallel_size=0)
+    with pytest.raises(ItemValidationError) as parallel:
+        handler.load(str(path))
+    with pytest.raises(ItemValidationError) as sequential:
+        TxtFileHandler().load(str(path))
+    assert parallel.value.errors == sequential.value.errors
+    assert [row for row, _message in parallel.value.errors] == [1, CONTENT.count("\n") + 2]
@@ -0,0 +1,66 @@
+from shopping_list.factories import ItemFactory
+from shopping_list.history import History
+from shopping_list.merge import MergeService
+from shopping_list.models import REMOVE, ShoppingList
+
+
+def _state(items):
+    return [(item.name, item.calculate_total()) for item in items], round(items.total(), 6)
+
+
+def test_undo_redo_import_is_one_bulk_event():
+    items = ShoppingList([ItemFactory.create_item("Milch", False, 1, 0.99)])
+    merger = MergeService(items)
+    history = History(items)
+    before = _state(items)
+
+    with history.transaction("Import"):
+        for start in range(0, 100_000, 5000):
+            merger.merge(
+                [ItemFactory.create_item(f"Artikel {i}", False, 1, 0.5) for i in range(start, start + 5000)]
+                + [ItemFactory.create_item("Milch", False, 2, 0.99)]
+            )
+    after = _state(items)
+
+    events = []
+    items.subscribe(events.append)
+    assert history.undo_label() == "Import" and history.undo()
+    assert _state(items) == before
+    assert [e.kind for e in events].count(REMOVE) == 1
+
+    assert history.redo()
+    assert _state(items) == after
+    assert merger.index.find_match(items[-1]) is items[-1]
+
+
+def test_removed_item_comes_back_with_its_amount():
+    items = ShoppingList()
+    merger = MergeService(items)
+    history = History(items)
+    merger.merge([ItemFactory.create_item("Äpfel", True, 1.0, 2.0)])
+    merger.merge([ItemFactory.create_item("Äpfel", True, 0.5, 2.0)])
+    with history.transaction("Entfernen"):
+        merger.remove(0)
+
+    history.undo()
+    assert _state(items) == ([("Äpfel", 3.0)], 3.0)
+    history.undo()
+    history.undo()
+    assert len(items) == 0 and not history.can_undo
+    history.redo()
+    history.redo()
+    assert _state(items) == ([("Äpfel", 3.0)], 3.0)
+
+    merger.merge([ItemFactory.create_item("Brot", False, 1, 2.5)])
+    assert not history.can_redo
+
+
+def test_history_is_bounded():
+    items = ShoppingList()
+    history = History(items, limit=3, max_items=10)
+    for i in range(5):
+        items.append(ItemFactory.create_item(f"Artikel {i}", False, 1, 1.0))
+    assert [history.undo() for _ in range(4)] == [True, True, True, False]
+
+    items.extend(ItemFactory.create_item(f"Neu {i}", False, 1, 1.0) for i in range(11))
+    assert not history.can_undo
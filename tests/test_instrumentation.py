@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from shopping_list import instrumentation
+from shopping_list.factories import ItemFactory
+from shopping_list.persistence import TxtFileHandler
+
+
+@pytest.fixture
+def measuring():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disabled_records_nothing():
+    instrumentation.reset()
+    instrumentation.disable()
+    ItemFactory.create_item("Milch", False, 1, 1.0)
+    instrumentation.count("x")
+    assert instrumentation.snapshot()["timings"] == {}
+    assert instrumentation.snapshot()["counters"] == {}
+
+
+def test_timed_functions_and_iterators(measuring, tmp_path):
+    path = str(tmp_path / "liste.txt")
+    items = [ItemFactory.create_item(f"Item {i}", i % 2 == 0, 1, 1.5) for i in range(20)]
+    TxtFileHandler().save(items, path)
+    loaded = TxtFileHandler().load(path)
+    streamed = list(TxtFileHandler().iter_load(path))
+
+    timings = instrumentation.snapshot()["timings"]
+    assert len(loaded) == len(streamed) == 20
+    assert timings["ItemFactory.create_item"]["calls"] == 20
+    assert timings["ItemFactory.create_items"]["calls"] == 2
+    assert timings["TxtFileHandler.save"]["calls"] == 1
+    assert timings["TxtFileHandler.iter_load"]["calls"] == 1
+    entry = timings["TxtFileHandler.load"]
+    assert 0 <= entry["p50_ms"] <= entry["p95_ms"] <= entry["max_ms"]
+
+
+def test_percentiles_and_dump(measuring, tmp_path):
+    for ms in range(1, 101):
+        instrumentation.record("span", ms / 1000)
+    instrumentation.count("items", 5)
+
+    path = tmp_path / "diag.json"
+    instrumentation.dump(str(path))
+    data = json.loads(path.read_text(encoding="utf-8"))
+
+    assert data["timings"]["span"]["p50_ms"] == pytest.approx(50)
+    assert data["timings"]["span"]["p95_ms"] == pytest.approx(95)
+    assert data["counters"] == {"items": 5}
+
+
+def test_profiling_on_demand(tmp_path):
+    path = tmp_path / "run.prof"
+    instrumentation.start_profiling()
+    assert instrumentation.profiling_active()
+    ItemFactory.create_item("Brot", False, 1, 2.0)
+    stats = instrumentation.stop_profiling(str(path))
+    assert not instrumentation.profiling_active()
+    assert stats is not None and path.exists()
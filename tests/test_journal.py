@@ -0,0 +1,66 @@
+import os
+
+from shopping_list.factories import ItemFactory
+from shopping_list.journal import Journal, Workspace
+from shopping_list.merge import MergeService
+from shopping_list.models import ShoppingList
+
+
+def _rows(items):
+    return [(type(item).__name__, item.name, item.calculate_total()) for item in items]
+
+
+def test_journal_coalesces_appends_and_survives_torn_tail(tmp_path):
+    journal = Journal(str(tmp_path), commit_delay=0.05)
+    journal.append({"op": "create_tab", "tab": "a", "name": "Rewe", "position": None})
+    journal.append({"op": "insert", "tab": "a", "index": 0, "items": [[False, "Milch", 1, 0.99]]})
+    journal.append({"op": "insert", "tab": "a", "index": 1, "items": [[True, "Äpfel", 0.5, 2.5]]})
+    assert journal.sync() == 2
+    journal.close()
+
+    (_first, path), = journal.segments()
+    with open(path, "ab") as f:
+        f.write(b'{"seq": 3, "op": "rem')
+
+    reopened = Journal(str(tmp_path))
+    ops = list(reopened.read())
+    assert [op["seq"] for op in ops] == [1, 2]
+    assert ops[1]["items"] == [[False, "Milch", 1, 0.99], [True, "Äpfel", 0.5, 2.5]]
+    assert reopened.append({"op": "close_tab", "tab": "a"}) == 3
+    reopened.close()
+
+
+def test_workspace_replays_lazily_and_compacts(tmp_path):
+    session_path = str(tmp_path / "session.json")
+    workspace = Workspace(session_path, commit_delay=0)
+    rewe = workspace.create_tab("Rewe")
+    markt = workspace.create_tab("Markt")
+    items = ShoppingList()
+    workspace.track(rewe.tab_id, items)
+    merger = MergeService(items)
+    merger.merge([ItemFactory.create_item(f"Artikel {i}", i % 2 == 0, 1, 0.5) for i in range(100)])
+    merger.merge([ItemFactory.create_item("Artikel 3", False, 2, 0.5)])
+    merger.remove(0)
+    workspace.rename_tab(markt.tab_id, "Wochenmarkt")
+    workspace.select_tab(markt.tab_id)
+    # Absturz: kein compact(), nur das Journal liegt auf der Platte
+    workspace.close()
+
+    restored = Workspace(session_path)
+    assert [(r.tab_id, r.name) for r in restored.tabs] == [(rewe.tab_id, "Rewe"), (markt.tab_id, "Wochenmarkt")]
+    assert restored.selected_tab_id == markt.tab_id
+    replayed = ShoppingList()
+    restored.load_tab(rewe.tab_id, replayed)
+    assert _rows(replayed) == _rows(items)
+
+    replayed.pop()
+    assert restored.compact()
+    assert os.listdir(restored.journal_dir) == [os.path.basename(restored.journal._path)]
+    restored.close()
+
+    final = Workspace(session_path)
+    assert final.session.journal_seq > 0 and final.session.tabs[0].backing_file
+    reloaded = ShoppingList()
+    final.load_tab(rewe.tab_id, reloaded)
+    assert _rows(reloaded) == _rows(items)[:-1]
+    final.close()
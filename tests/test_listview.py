@@ -0,0 +1,150 @@
+import random
+import tkinter as tk
+
+import pytest
+
+from shopping_list.listview import VirtualListView
+
+VISIBLE_ROWS = 5
+
+
+class StubListbox:
+    """Nimmt die Listbox-Aufrufe der View entgegen (ohne Display)."""
+
+    def __init__(self):
+        self.rows = []
+
+    def _index(self, index):
+        return len(self.rows) if index == tk.END else index
+
+    def insert(self, index, row):
+        self.rows.insert(self._index(index), row)
+
+    def delete(self, first, last=None):
+        first = self._index(first)
+        last = first if last is None else self._index(last)
+        del self.rows[first:last + 1]
+
+    def selection_clear(self, *_args):
+        pass
+
+    def selection_set(self, *_args):
+        pass
+
+    def activate(self, *_args):
+        pass
+
+    def yview_moveto(self, *_args):
+        pass
+
+
+class StubScrollbar:
+    def set(self, *_args):
+        pass
+
+
+def _make_view(items, offset=10, selected=12):
+    view = object.__new__(VirtualListView)
+    view._items = items
+    view._formatter = str
+    view._cache = {}
+    view._shown = []
+    view._offset = offset
+    view._visible_rows = VISIBLE_ROWS
+    view._selected = selected
+    view._render_id = None
+    view.listbox = StubListbox()
+    view._scrollbar = StubScrollbar()
+    view.after_idle = lambda _callback: "render"
+    view.after_cancel = lambda _id: None
+    view._render()
+    return view
+
+
+def _check(view, items):
+    """Listbox und Zeilen-Spiegel stimmen überein, vor und nach dem gesammelten Abgleich."""
+    assert view.listbox.rows == view._shown
+    assert len(view._shown) <= VISIBLE_ROWS
+    view._render()
+    assert view._shown == [str(item) for item in items[view._offset:view._offset + VISIBLE_ROWS]]
+
+
+_counter = iter(range(10**9))
+
+
+def _insert(items, index, count):
+    items[index:index] = [f"Neu {next(_counter)}" for _ in range(count)]
+
+
+@pytest.mark.parametrize(
+    "index, count, offset, selected",
+    [
+        (3, 2, 12, 14),  # oberhalb: gleiche Items bleiben sichtbar
+        (10, 1, 10, 13),  # am Anfang des Viewports
+        (11, 2, 10, 14),  # mitten im Viewport
+        (14, 3, 10, 12),  # letzte sichtbare Zeile, Überlauf nach unten
+        (20, 2, 10, 12),  # unterhalb: nichts zu tun
+    ],
+)
+def test_insert_keeps_offset_and_selection(index, count, offset, selected):
+    items = [f"Artikel {i}" for i in range(30)]
+    view = _make_view(items)
+    _insert(items, index, count)
+    view.inserted(index, count)
+
+    assert (view._offset, view._selected) == (offset, selected)
+    _check(view, items)
+
+
+@pytest.mark.parametrize(
+    "index, count, offset, selected",
+    [
+        (2, 3, 7, 9),  # oberhalb
+        (8, 4, 8, 8),  # ragt von oben in den Viewport
+        (11, 1, 10, 11),  # im Viewport, vor der Auswahl
+        (11, 3, 10, None),  # im Viewport, inklusive Auswahl
+        (13, 5, 10, 12),  # ragt unten aus dem Viewport
+        (20, 4, 10, 12),  # unterhalb
+        (5, 20, 5, None),  # über den ganzen Viewport hinweg
+    ],
+)
+def test_removed_range_keeps_offset_and_selection(index, count, offset, selected):
+    items = [f"Artikel {i}" for i in range(30)]
+    view = _make_view(items)
+    removed = items[index:index + count]
+    del items[index:index + count]
+    view.removed(index, removed)
+
+    assert (view._offset, view._selected) == (offset, selected)
+    _check(view, items)
+
+
+def test_random_edits_follow_the_items():
+    rng = random.Random(3)
+    items = [f"Artikel {i}" for i in range(40)]
+    view = _make_view(items)
+    for step in range(300):
+        first_visible = items[view._offset] if view._offset < len(items) else None
+        selected = items[view._selected] if view._selected is not None else None
+        if step % 2 and len(items) > 1:
+            index = rng.randrange(len(items))
+            count = rng.randint(1, 4)
+            removed = items[index:index + count]
+            del items[index:index + count]
+            view.removed(index, removed)
+        else:
+            index = rng.randrange(len(items) + 1)
+            count = rng.randint(1, 3)
+            _insert(items, index, count)
+            view.inserted(index, count)
+            removed = []
+
+        if first_visible is not None and first_visible in items and index < view._offset:
+            assert items[view._offset] == first_visible
+        if view._selected is not None:
+            assert items[view._selected] == selected
+        else:
+            assert selected is None or selected in removed
+        _check(view, items)
+        if rng.random() < 0.2:
+            view._selected = rng.randrange(len(items)) if items else None
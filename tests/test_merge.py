@@ -0,0 +1,85 @@
+import random
+
+from shopping_list.models import CountedItem, ShoppingList, WeightedItem
+from shopping_list.merge import MergeIndex, MergeService, price_bucket
+
+
+def _naive_match(items, new_item):
+    for existing in items:
+        if (
+            existing.name == new_item.name
+            and abs(existing.price_per_unit - new_item.price_per_unit) < 0.001
+            and type(existing) == type(new_item)
+        ):
+            return existing
+    return None
+
+
+def _naive_unique_name(items, name):
+    existing_names = [i.name for i in items]
+    if name not in existing_names:
+        return name
+    counter = 2
+    while f"{name} #{counter}" in existing_names:
+        counter += 1
+    return f"{name} #{counter}"
+
+
+def test_index_matches_linear_scan():
+    rng = random.Random(42)
+    items = []
+    index = MergeIndex(items)
+
+    for _ in range(3000):
+        if items and rng.random() < 0.2:
+            removed = items.pop(rng.randrange(len(items)))
+            index.discard(removed)
+            continue
+
+        cls = rng.choice([CountedItem, WeightedItem])
+        price = rng.choice([0.999, 1.0, 1.0004, 1.0009, 1.5, float("nan"), 1e306, -1e306, 1.7e308])
+        name = rng.choice(["Milch", "Brot", "Milch #2", "Käse"])
+        new_item = cls(name, price, 1)
+
+        expected = _naive_match(items, new_item)
+        assert index.find_match(new_item) is expected
+        if expected is None:
+            expected_name = _naive_unique_name(items, new_item.name)
+            new_item.name = index.unique_name(new_item.name)
+            assert new_item.name == expected_name
+            items.append(new_item)
+            index.add(new_item)
+
+
+def test_unique_name_reuses_freed_suffix():
+    items = [CountedItem("Brot", 1.0, 1), CountedItem("Brot #2", 2.0, 1), CountedItem("Brot #3", 3.0, 1)]
+    index = MergeIndex(items)
+    assert index.unique_name("Brot") == "Brot #4"
+
+    index.discard(items.pop(1))
+    assert index.unique_name("Brot") == "Brot #2"
+
+
+def test_merge_service_follows_list_changes():
+    items = ShoppingList()
+    service = MergeService(items)
+    service.merge([CountedItem("Milch", 1.0, 1), CountedItem("Milch", 1.0, 2)])
+    assert len(items) == 1 and items[0].quantity == 3 and items.total() == 3.0
+
+    # Änderungen an der Liste an MergeService vorbei halten den Index trotzdem aktuell.
+    items.pop(0)
+    items.append(CountedItem("Brot", 2.0, 1))
+    result = service.merge([CountedItem("Brot", 2.0, 1), CountedItem("Milch", 1.0, 1)])
+    assert [item.name for item in items] == ["Brot", "Milch"]
+    assert result.updated == [items[0]] and result.total_delta == 3.0
+
+
+def test_huge_finite_prices_merge_like_linear_scan():
+    assert price_bucket(1e306) is None and price_bucket(-1e306) is None
+    assert isinstance(price_bucket(1e300), int)
+
+    service = MergeService()
+    service.merge(
+        [CountedItem("Milch", 1e306, 1), CountedItem("Milch", 1e306, 2), CountedItem("Milch", float("inf"), 1)]
+    )
+    assert [(item.name, item.quantity) for item in service.items] == [("Milch", 3), ("Milch #2", 1)]
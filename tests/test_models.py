@@ -1,4 +1,4 @@
-from shopping_list.models import CountedItem, WeightedItem
+from shopping_list.models import INSERT, REMOVE, UPDATE, CountedItem, ShoppingList, WeightedItem
 
 
 def test_counted_total():
@@ -9,3 +9,46 @@ def test_counted_total():
 def test_weighted_total():
     item = WeightedItem("Äpfel", 2.0, 1.25)
     assert abs(item.calculate_total() - 2.5) < 1e-9
+
+
+def test_shopping_list_keeps_aggregates_and_emits_events():
+    items = ShoppingList([CountedItem("Gurke", 1.5, 2)])
+    events = []
+    items.subscribe(events.append)
+
+    apples = WeightedItem("Äpfel", 2.0, 1.25)
+    items.append(apples)
+    delta = items.add_amount(apples, 0.75)
+    items.pop(0)
+
+    assert [(e.kind, e.index) for e in events] == [(INSERT, 1), (UPDATE, 1), (REMOVE, 0)]
+    assert events[1].amount_delta == 0.75 and abs(delta - 1.5) < 1e-9
+    assert abs(items.total() - 4.0) < 1e-9
+    assert items.counts() == {"C": 0, "W": 1}
+    assert items.subtotals()["C"] == 0.0
+    assert items.index_of(apples) == 0
+
+    items.pop()
+    assert len(items) == 0 and items.total() == 0.0
+
+
+def test_index_of_follows_inserts_and_removals_without_rebuild():
+    random = __import__("random").Random(7)
+    items = ShoppingList(CountedItem(f"Artikel {i}", 1.0, 1) for i in range(200))
+    reference = list(items)
+    counter = 200
+    for step in range(2000):
+        if step % 3 == 0 and len(reference) > 1:
+            index = random.randrange(len(reference))
+            count = random.randint(1, 3)
+            items.delete(index, count)
+            del reference[index:index + count]
+        else:
+            index = random.randrange(len(reference) + 1)
+            new = [CountedItem(f"Neu {counter + k}", 1.0, 1) for k in range(random.randint(1, 2))]
+            counter += len(new)
+            items.insert_many(index, new)
+            reference[index:index] = new
+        probe = random.choice(reference)
+        assert items.index_of(probe) == reference.index(probe)
+    assert [items.index_of(item) for item in reference] == list(range(len(reference)))
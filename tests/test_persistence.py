@@ -0,0 +1,167 @@
+import os
+import sqlite3
+
+import pytest
+
+from shopping_list.factories import ItemFactory, ItemValidationError
+from shopping_list.persistence import (
+    BinaryFileHandler,
+    CompressedTxtFileHandler,
+    SqliteFileHandler,
+    TxtFileHandler,
+    detect_compression,
+    handler_for_file,
+    iter_batches,
+)
+
+
+def _generate_items(count):
+    for i in range(count):
+        yield ItemFactory.create_item(f"Artikel {i}", i % 2 == 1, 1.5 if i % 2 else 2, 0.5)
+
+
+def test_save_stream_single_pass_footer(tmp_path):
+    path = tmp_path / "stream.txt"
+    handler = TxtFileHandler()
+    handler.save_stream(_generate_items(2500), str(path))
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2500 + 2
+    assert lines[-1] == "# Gesamtpreis|2187.50"
+
+
+def test_iter_load_is_lazy(tmp_path):
+    path = tmp_path / "stream.txt"
+    handler = TxtFileHandler()
+    handler.save_stream(_generate_items(10), str(path))
+
+    stream = handler.iter_load(str(path))
+    first = next(stream)
+    assert first.name == "Artikel 0"
+    assert [len(batch) for batch in iter_batches(stream, 4)] == [4, 4, 1]
+
+
+def test_load_accepts_decimal_comma(tmp_path):
+    path = tmp_path / "komma.txt"
+    path.write_text("Typ|Name|Menge|Einzelpreis\nW|Äpfel|1,5|2,00\nkaputt\n# Gesamtpreis|3,00\n", encoding="utf-8")
+    items = TxtFileHandler().load(str(path))
+    assert len(items) == 1
+    assert abs(items[0].calculate_total() - 3.0) < 1e-9
+
+
+def test_binary_round_trip_matches_txt(tmp_path):
+    items = list(_generate_items(300)) + [ItemFactory.create_item("Äpfel", True, 1.25, 2.99)]
+    txt_path, bin_path = tmp_path / "liste.txt", tmp_path / "liste.slb"
+    TxtFileHandler().save(items, str(txt_path))
+    BinaryFileHandler().save(items, str(bin_path))
+
+    def rows(loaded):
+        return [(type(i), i.name, round(i.calculate_total(), 2)) for i in loaded]
+
+    from_txt = TxtFileHandler().load(str(txt_path))
+    from_bin = BinaryFileHandler().load(str(bin_path))
+    assert rows(from_bin) == rows(from_txt)
+
+    # Binär -> Txt -> Binär bleibt stabil
+    TxtFileHandler().save(from_bin, str(txt_path))
+    assert rows(TxtFileHandler().load(str(txt_path))) == rows(from_txt)
+
+
+def test_binary_random_access(tmp_path):
+    path = tmp_path / "liste.slb"
+    handler = BinaryFileHandler()
+    handler.save_stream(_generate_items(1000), str(path))
+
+    with handler.open(str(path)) as reader:
+        assert len(reader) == 1000
+        assert reader[777].name == "Artikel 777"
+        assert reader.row(-1) == (True, "Artikel 999", 1.5, 0.5)
+        assert abs(reader.total - 875.0) < 1e-9
+
+
+def test_binary_rejects_txt_file(tmp_path):
+    path = tmp_path / "liste.txt"
+    TxtFileHandler().save(list(_generate_items(3)), str(path))
+    with pytest.raises(ValueError):
+        BinaryFileHandler().load(str(path))
+
+
+def test_sqlite_stores_lists_separately(tmp_path):
+    db = str(tmp_path / "listen.sqlite")
+    rewe = SqliteFileHandler("Rewe")
+    rewe.save(list(_generate_items(50)), db)
+    SqliteFileHandler("Markt").save([ItemFactory.create_item("Eier", False, 10, 0.3)], db)
+
+    assert rewe.list_names(db) == ["Markt", "Rewe"]
+    assert [i.name for i in rewe.load(db)] == [f"Artikel {i}" for i in range(50)]
+    assert [i.name for i in rewe.with_list("Markt").load(db)] == ["Eier"]
+
+
+def test_sqlite_save_only_touches_changed_rows(tmp_path):
+    db = str(tmp_path / "listen.sqlite")
+    handler = SqliteFileHandler("Rewe")
+    items = list(_generate_items(1000))
+    handler.save(items, db)
+    assert handler.last_save_stats == (1000, 0, 0)
+
+    items[10].add_amount(1)
+    del items[500]
+    items.insert(200, ItemFactory.create_item("Neu", False, 1, 1.0))
+    handler.save(items, db)
+    assert handler.last_save_stats == (1, 1, 1)
+    assert [i.name for i in handler.load(db)] == [i.name for i in items]
+
+
+def test_sqlite_merge_follows_merge_service_rules(tmp_path):
+    db = str(tmp_path / "listen.sqlite")
+    handler = SqliteFileHandler("Rewe")
+    handler.save([ItemFactory.create_item("Milch", False, 1, 0.9995)], db)
+    handler.merge(
+        [ItemFactory.create_item("Milch", False, 2, 1.0004), ItemFactory.create_item("Milch", False, 1, 1.19)], db
+    )
+
+    loaded = handler.load(db)
+    assert [(i.name, i.quantity, i.price_per_unit) for i in loaded] == [("Milch", 3, 0.9995), ("Milch #2", 1, 1.19)]
+
+
+def test_sqlite_reading_leaves_foreign_database_untouched(tmp_path):
+    db = str(tmp_path / "fremd.db")
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE notizen (text TEXT)")
+    conn.commit()
+    conn.close()
+
+    handler = SqliteFileHandler("Rewe")
+    assert handler.list_names(db) == []
+    with pytest.raises(ValueError):
+        handler.load(db)
+
+    conn = sqlite3.connect(db)
+    try:
+        assert [name for (name,) in conn.execute("SELECT name FROM sqlite_master")] == ["notizen"]
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    finally:
+        conn.close()
+
+
+def test_load_reports_all_invalid_lines(tmp_path):
+    path = tmp_path / "fehler.txt"
+    path.write_text("Typ|Name|Menge|Einzelpreis\nC|Milch|x|0,99\nC|Brot|1|2,50\nW|Käse|0,3|teuer\n", encoding="utf-8")
+    with pytest.raises(ItemValidationError) as info:
+        TxtFileHandler().load(str(path))
+    assert [row for row, _message in info.value.errors] == [2, 4]
+
+
+@pytest.mark.parametrize("suffix, compression", [(".txt.gz", "gzip"), (".txt.bz2", "bz2"), (".txt.xz", "lzma")])
+def test_compressed_round_trip_detected_by_magic(tmp_path, suffix, compression):
+    path = str(tmp_path / f"archiv{suffix}")
+    handler = handler_for_file(path, TxtFileHandler())
+    assert isinstance(handler, CompressedTxtFileHandler) and handler.compression == compression
+    handler.save_stream(_generate_items(3000), path)
+
+    renamed = str(tmp_path / "falsche-endung.txt")
+    os.replace(path, renamed)
+    assert detect_compression(renamed) == compression
+    items = TxtFileHandler().load(renamed)
+    assert len(items) == 3000 and items[-1].name == "Artikel 2999"
+    assert os.path.getsize(renamed) < 3000 * 20
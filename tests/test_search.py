@@ -0,0 +1,52 @@
+import random
+
+from shopping_list.merge import MergeService
+from shopping_list.models import CountedItem, ShoppingList
+from shopping_list.search import SearchIndex
+
+
+def _naive(lists, query):
+    needle = query.casefold()
+    prefix = sorted((item.name.casefold(), id(item)) for items in lists for item in items
+                    if item.name.casefold().startswith(needle))
+    contains = sorted((item.name.casefold(), id(item)) for items in lists for item in items
+                      if len(needle) >= 3 and needle in item.name.casefold()
+                      and not item.name.casefold().startswith(needle))
+    return [name for name, _ in prefix + contains]
+
+
+def test_search_matches_naive_scan_under_changes():
+    rng = random.Random(7)
+    words = ["Tomaten", "Kirschtomaten", "Milch", "Hafermilch", "Brot", "Butter", "Straße"]
+    lists = [ShoppingList(), ShoppingList()]
+    index = SearchIndex()
+    for source, items in enumerate(lists):
+        index.attach(source, items)
+
+    for _ in range(400):
+        items = rng.choice(lists)
+        if items and rng.random() < 0.3:
+            items.pop(rng.randrange(len(items)))
+        else:
+            items.append(CountedItem(f"{rng.choice(words)} {rng.randrange(20)}", 1.0, 1))
+
+    for query in ["t", "TOM", "milch", "aten 1", "strasse", "xyz"]:
+        hits = index.search(query, limit=10_000)
+        assert [hit.item.name.casefold() for hit in hits] == _naive(lists, query)
+
+
+def test_search_follows_merge_renames_and_detach():
+    items = ShoppingList()
+    index = SearchIndex()
+    index.attach("tab", items)
+    service = MergeService(items)
+    service.merge([CountedItem("Milch", 1.0, 1), CountedItem("Milch", 2.0, 1)])
+
+    assert sorted(hit.item.name for hit in index.search("milch")) == ["Milch", "Milch #2"]
+    assert all(hit.source == "tab" for hit in index.search("milch"))
+
+    items.reset([CountedItem("Brot", 1.0, 1)])
+    assert index.search("milch") == [] and len(index.search("bro")) == 1
+
+    index.detach("tab", items)
+    assert index.search("bro") == [] and len(index) == 0
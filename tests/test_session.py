@@ -0,0 +1,122 @@
+import shutil
+import time
+import tkinter as tk
+
+import pytest
+
+from shopping_list.factories import ItemFactory
+from shopping_list.persistence import BinaryFileHandler, TxtFileHandler
+from shopping_list.session import Session, TabRecord
+
+
+def test_session_round_trip(tmp_path):
+    path = str(tmp_path / "session.json")
+    session = Session(path, [TabRecord("Rewe"), TabRecord("Markt", backing_file="/tmp/markt.slb")], selected=1)
+    session.save()
+
+    loaded = Session.load(path)
+    assert [(t.tab_id, t.name, t.backing_file) for t in loaded.tabs] == [
+        (t.tab_id, t.name, t.backing_file) for t in session.tabs
+    ]
+    assert loaded.selected == 1
+
+
+def test_missing_or_broken_session_is_empty(tmp_path):
+    assert Session.load(str(tmp_path / "fehlt.json")).tabs == []
+    broken = tmp_path / "kaputt.json"
+    broken.write_text("{kein json", encoding="utf-8")
+    assert Session.load(str(broken)).tabs == []
+
+
+def test_save_removes_orphaned_backing_files(tmp_path):
+    session = Session(str(tmp_path / "session.json"))
+    kept = TabRecord("Rewe")
+    kept.backing_file = session.backing_file_for(kept.tab_id)
+    orphan = session.backing_file_for("alt")
+    (tmp_path / "lists").mkdir()
+    for path in (kept.backing_file, orphan):
+        BinaryFileHandler().save([], path)
+
+    session.tabs = [kept]
+    session.save()
+    assert sorted(p.name for p in (tmp_path / "lists").iterdir()) == [f"tab-{kept.tab_id}.slb"]
+
+
+@pytest.fixture
+def tk_root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("Kein Display für Tk verfügbar")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+def test_cold_start_50_tabs_of_10k_items(tmp_path, tk_root):
+    from shopping_list.gui import ShoppingListApp
+
+    template = tmp_path / "vorlage.slb"
+    BinaryFileHandler().save(
+        [ItemFactory.create_item(f"Artikel {i}", i % 2 == 0, 1 + i % 5, 0.99) for i in range(10_000)],
+        str(template),
+    )
+    session = Session(str(tmp_path / "session.json"), selected=3)
+    for n in range(50):
+        backing = tmp_path / f"liste-{n}.slb"
+        shutil.copyfile(template, backing)
+        session.tabs.append(TabRecord(f"Liste {n}", str(backing)))
+    session.save()
+
+    start = time.perf_counter()
+    app = ShoppingListApp(tk_root, TxtFileHandler(), session_path=session.path)
+    tk_root.update()
+    elapsed = time.perf_counter() - start
+
+    tabs = app.tabs()
+    assert len(tabs) == 50
+    assert [tab.is_loaded for tab in tabs].count(True) == 1
+    assert tabs[3].is_built and len(tabs[3].items) == 10_000
+    assert elapsed < 2.0
+
+    app.notebook.select(tabs[10])
+    tk_root.update()
+    assert tabs[10].is_loaded and len(tabs[10].items) == 10_000
+
+
+def test_failed_load_keeps_tab_read_only_until_retry(tk_root, monkeypatch):
+    from shopping_list import gui
+
+    monkeypatch.setattr(gui.messagebox, "showerror", lambda *args, **kwargs: None)
+    attempts = []
+
+    def loader():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            raise IOError("kaputt")
+        return [ItemFactory.create_item("Milch", False, 1, 0.99)]
+
+    tab = gui.ShoppingListTab(tk_root, TxtFileHandler(), loader)
+    assert not tab.is_loaded and len(tab.items) == 0
+    assert all(str(b["state"]) == "disabled" for b in tab._edit_buttons + tab._io_buttons)
+
+    tab._retry_load()
+    assert tab.is_loaded and [i.name for i in tab.items] == ["Milch"]
+    assert all(str(b["state"]) == "normal" for b in tab._edit_buttons + tab._io_buttons)
+
+
+def test_background_load_fills_tab_without_building_it(tk_root):
+    from shopping_list import gui
+
+    tracked = []
+    tab = gui.ShoppingListTab(
+        tk_root, TxtFileHandler(), lambda: [ItemFactory.create_item("Brot", False, 1, 2.5)], tracked.append, lazy=True
+    )
+    assert tab.start_background_load()
+    deadline = time.monotonic() + 5
+    while tab.poll_background_load():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert tab.is_loaded and not tab.is_built
+    assert [i.name for i in tab.items] == ["Brot"] and tracked == [tab.items]
+    assert not tab.start_background_load()
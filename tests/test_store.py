@@ -0,0 +1,45 @@
+from shopping_list.models import CountedItem, WeightedItem
+from shopping_list.persistence import TxtFileHandler
+from shopping_list.store import ItemStore
+
+
+def _sample_store():
+    return ItemStore([
+        CountedItem("Brot", 1.5, 2),
+        WeightedItem("Äpfel", 2.0, 1.25),
+        CountedItem("Milch", 0.99, 3),
+    ])
+
+
+def test_totals_match_item_totals():
+    store = _sample_store()
+    expected = sum(item.calculate_total() for item in store)
+    assert abs(store.total() - expected) < 1e-9
+
+    subtotals = store.subtotals()
+    assert abs(subtotals["C"] - (3.0 + 2.97)) < 1e-9
+    assert abs(subtotals["W"] - 2.5) < 1e-9
+
+    assert abs(store.filtered_total(weighted=False, min_price=1.0) - 3.0) < 1e-9
+    assert abs(store.filtered_total(name_prefix="Mi") - 2.97) < 1e-9
+
+
+def test_views_write_through():
+    store = _sample_store()
+    view = store[0]
+    assert isinstance(view, CountedItem)
+    view.add_amount(2.7)
+    assert store.row(0) == (False, "Brot", 4.0, 1.5)
+
+    weighted = store[1]
+    assert isinstance(weighted, WeightedItem)
+    weighted.add_amount(0.25)
+    assert abs(weighted.calculate_total() - 3.0) < 1e-9
+
+
+def test_save_accepts_store(tmp_path):
+    path = tmp_path / "liste.txt"
+    TxtFileHandler().save(_sample_store(), str(path))
+    loaded = TxtFileHandler().load(str(path))
+    assert [item.name for item in loaded] == ["Brot", "Äpfel", "Milch"]
+    assert path.read_text(encoding="utf-8").splitlines()[-1] == "# Gesamtpreis|8.47"
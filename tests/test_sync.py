@@ -0,0 +1,117 @@
+import asyncio
+import json
+
+import pytest
+
+from shopping_list.factories import ItemFactory
+from shopping_list.journal import apply_item_op
+from shopping_list.models import ShoppingList
+from shopping_list.persistence import iter_rows
+from shopping_list.sync import SharedList, SyncClient, SyncError, SyncServer, _Connection, coalesce
+
+
+def test_coalesce_keeps_result_and_shrinks_ops():
+    ops = [
+        {"op": "insert", "index": 1, "items": [[False, "Brot", 1, 2.5]]},
+        {"op": "update", "index": 0, "amount": 2},
+        {"op": "insert", "index": 2, "items": [[False, "Eier", 6, 0.3]]},
+        {"op": "update", "index": 2, "amount": 4},
+        {"op": "update", "index": 0, "amount": 1},
+        {"op": "update", "index": 3, "amount": 1},
+        {"op": "insert", "index": 3, "items": [[True, "Äpfel", 1.5, 2.0]]},
+        {"op": "remove", "index": 1, "count": 1},
+    ]
+    start = [ItemFactory.create_item("Milch", False, 1, 0.99), ItemFactory.create_item("Reis", False, 1, 1.0)]
+    direct = ShoppingList(start)
+    coalesced = ShoppingList(ItemFactory.create_item(item.name, False, 1, item.price_per_unit) for item in start)
+    for op in ops:
+        apply_item_op(direct, op)
+    short = coalesce(ops)
+    for op in short:
+        apply_item_op(coalesced, op)
+
+    assert list(iter_rows(coalesced)) == list(iter_rows(direct))
+    assert len(short) < len(ops)
+    assert ops[2]["items"] == [[False, "Eier", 6, 0.3]]
+
+
+def test_clients_share_list_with_merge_semantics():
+    async def scenario():
+        server = SyncServer(port=0)
+        await server.start()
+        alice = await SyncClient.connect(port=server.port)
+        bob = await SyncClient.connect(port=server.port)
+        try:
+            mirror = await bob.subscribe("Familie")
+            await alice.merge("Familie", [[False, "Milch", 2, 0.99], [True, "Äpfel", 1.5, 2.0]])
+            await bob.batch(
+                "Familie",
+                [
+                    {"op": "add", "item": [False, "Milch", 1, 0.99]},
+                    {"op": "merge", "items": [[False, "Milch", 1, 1.49]]},
+                ],
+            )
+            seq = await alice.remove("Familie", ["Äpfel", "gibt es nicht"])
+
+            with pytest.raises(SyncError):
+                await alice.merge("Familie", [[False, "Brot", "zwei", 2.5]])
+            await bob.wait_for("Familie", seq)
+            return list(iter_rows(server.lists["Familie"].items)), list(iter_rows(mirror)), seq
+        finally:
+            await alice.close()
+            await bob.close()
+            await server.close()
+
+    on_server, mirrored, seq = asyncio.run(scenario())
+    assert on_server == [(False, "Milch", 3, 0.99), (False, "Milch #2", 1, 1.49)]
+    assert mirrored == on_server
+    assert seq == 3
+
+
+def test_failed_requests_keep_connection_and_create_no_lists(monkeypatch):
+    async def scenario():
+        server = SyncServer(port=0)
+        await server.start()
+        client = await SyncClient.connect(port=server.port)
+        try:
+            with pytest.raises(SyncError):
+                await client.merge("Tippfehler", [[False, "Brot", "zwei", 2.5]])
+            await client.unsubscribe("Nie abonniert")
+
+            monkeypatch.setattr(SharedList, "_merge", lambda self, items: 1 / 0)
+            with pytest.raises(SyncError):
+                await client.merge("Familie", [[False, "Milch", 1, 0.99]])
+            monkeypatch.undo()
+
+            seq = await client.merge("Familie", [[False, "Milch", 1, 0.99]])
+            return sorted(server.lists), seq
+        finally:
+            await client.close()
+            await server.close()
+
+    names, seq = asyncio.run(scenario())
+    assert names == ["Familie"]
+    assert seq == 1
+
+
+def test_stale_pending_delta_does_not_truncate_other_subscribers():
+    shared = SharedList("Familie")
+    alice = _Connection(None, max_pending_ops=100)
+    bob = _Connection(None, max_pending_ops=100)
+    shared.subscribers.update((alice, bob))
+
+    shared.apply([{"op": "add", "item": [False, "Milch", 1, 0.99]}])
+    shared.subscribers.discard(alice)
+    shared.apply([{"op": "add", "item": [False, "Brot", 1, 2.5]}])
+
+    (stale,) = alice._outbox
+    (current,) = bob._outbox
+    stale_message = json.loads(stale.encode())
+    current_message = json.loads(current.encode())
+
+    assert stale_message["seq"] == 1
+    assert current_message["seq"] == 2
+    mirror = ShoppingList()
+    for op in current_message["ops"]:
+        apply_item_op(mirror, op)
+    assert [item.name for item in mirror] == ["Milch", "Brot"]